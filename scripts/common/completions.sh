@@ -2,46 +2,49 @@
 # scripts/common/completions.sh
 # Bash completion for KOSAIO
 
-__KOSAIO_CACHE_DIR="${TMPDIR:-/tmp}/kosaio-completions"
-__KOSAIO_CACHE_FILE="${__KOSAIO_CACHE_DIR}/targets"
-__KOSAIO_CACHE_TTL=60  # seconds
+# Targets come from plain word lists the engine writes under
+# data/cache/completion (<kind>, one id per line), next to <kind>.dirs: the
+# directories whose changes invalidate them. A TAB only stats those
+# directories; Python runs only when one is newer than the list.
+function _kosaio_words_stale() {
+	local words="$1" dir
+	[ -f "$words" ] && [ -f "${words}.dirs" ] || return 0
+	while IFS= read -r dir; do
+		[ "$dir" -nt "$words" ] && return 0
+	done < "${words}.dirs"
+	return 1
+}
 
-function _kosaio_build_target_cache() {
+function _kosaio_complete_targets() {
+	local prefix="$1" action="$2" kind="all" word
 	local python_engine="${KOSAIO_DIR}/scripts/engine/py/main.py"
-	if [ ! -f "$python_engine" ] || ! command -v python3 >/dev/null 2>&1; then
-		return 1
-	fi
-	mkdir -p "$__KOSAIO_CACHE_DIR" 2>/dev/null || return 1
-	python3 "$python_engine" update_cache 2>/dev/null | cut -d'|' -f1 > "$__KOSAIO_CACHE_FILE"
-}
+	case "$action" in
+		uninstall|update|rebuild) kind="installed" ;;
+	esac
+	local words="${KOSAIO_CACHE_DIR:-${KOSAIO_DIR}/data/cache}/completion/${kind}"
 
-function _kosaio_get_targets() {
-	local cache_age
-	if [ -f "$__KOSAIO_CACHE_FILE" ]; then
-		local now mtime
-		now=$(date +%s)
-		mtime=$(stat -c %Y "$__KOSAIO_CACHE_FILE" 2>/dev/null || echo 0)
-		cache_age=$(( now - mtime ))
-		if [ "$cache_age" -lt "$__KOSAIO_CACHE_TTL" ]; then
-			cat "$__KOSAIO_CACHE_FILE" 2>/dev/null
-			return
+	if _kosaio_words_stale "$words"; then
+		if [ ! -f "$python_engine" ] || ! command -v python3 >/dev/null 2>&1; then
+			return 1
 		fi
+		python3 "$python_engine" complete --kind "$kind" --write-words >/dev/null 2>&1 || return 1
 	fi
-	_kosaio_build_target_cache
-	cat "$__KOSAIO_CACHE_FILE" 2>/dev/null
+
+	local -a all_words
+	mapfile -t all_words < "$words" 2>/dev/null || return 1
+	for word in "${all_words[@]}"; do
+		[[ "${word,,}" == "${prefix,,}"* ]] && printf '%s\n' "$word"
+	done
 }
 
 function _kosaio_completions() {
-	local cur prev opts targets
+	local cur prev opts
 	COMPREPLY=()
 	cur="${COMP_WORDS[COMP_CWORD]}"
 	prev="${COMP_WORDS[COMP_CWORD-1]}"
 
 	# Main actions (Updated to match driver_manager capabilities)
-	opts="list search dev-switch create-project self-update info install uninstall update diagnose apply build"
-
-	# Dynamic Target Discovery via Python Engine (cached)
-	targets=$(_kosaio_get_targets)
+	opts="list search dev-switch create-project self-update info install uninstall update diagnose apply build cache gc"
 
 	case "${prev}" in
 		kosaio)
@@ -49,14 +52,22 @@ function _kosaio_completions() {
 			return 0
 			;;
 		dev-switch|install|uninstall|update|diagnose|apply|build|info|clone|checkout|reset|clean)
-			mapfile -t COMPREPLY < <(compgen -W "${targets}" -- "${cur}")
+			mapfile -t COMPREPLY < <(_kosaio_complete_targets "${cur}" "${prev}")
+			return 0
+			;;
+		cache)
+			mapfile -t COMPREPLY < <(compgen -W "stats prune" -- "${cur}")
+			return 0
+			;;
+		gc)
+			mapfile -t COMPREPLY < <(compgen -W "--dry-run" -- "${cur}")
 			return 0
 			;;
 		list|search)
 			if [[ "${cur}" == -* ]]; then
 				mapfile -t COMPREPLY < <(compgen -W "--installed -i" -- "${cur}")
 			else
-				mapfile -t COMPREPLY < <(compgen -W "${targets}" -- "${cur}")
+				mapfile -t COMPREPLY < <(_kosaio_complete_targets "${cur}" "${prev}")
 			fi
 			return 0
 			;;
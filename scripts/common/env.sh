@@ -42,6 +42,7 @@ if [ -f "${KOSAIO_DIR}/kosaio.cfg" ]; then
 		
 		case "$key" in
 			PROJECTS_HOST_DIR) export PROJECTS_HOST_DIR="${value%/}" ;;
+			IO_WORKERS) export KOSAIO_IO_WORKERS="${KOSAIO_IO_WORKERS:-$value}" ;;
 		esac
 	done < "${KOSAIO_DIR}/kosaio.cfg"
 fi
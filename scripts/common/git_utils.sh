@@ -223,18 +223,32 @@ function kosaio_standard_update_flow() {
 function kosaio_git_clone() {
 	# Parse arguments
 	local target=""
+	local repo=""
 	local is_recursive=0
 	local args_copy=("$@")
 
-	# First pass: find flags and target
+	# First pass: find flags, repository and target (the last two positionals)
 	for arg in "${args_copy[@]}"; do
 		if [[ "$arg" == "--recursive" ]]; then
 			is_recursive=1
 		elif [[ "$arg" != -* ]]; then
+			repo="$target"
 			target="$arg"
 		fi
 	done
 
+	# A local bare mirror (data/mirrors, KOSAIO_MIRRORS=off disables) supplies the objects;
+	# with it, a full clone costs no more than a shallow one.
+	local mirror=""
+	if [[ -n "$repo" ]]; then
+		mirror=$(python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" mirror_path --ensure "$repo" 2>/dev/null) || mirror=""
+	fi
+	if [[ -n "$mirror" ]]; then
+		log_info "Cloning with reference mirror..."
+		git clone --reference-if-able "$mirror" "$@"
+		return
+	fi
+
 	local full_clone=0
 
 	if [ "${KOSAIO_DEV_MODE:-}" == "1" ]; then
@@ -5,3 +5,11 @@
 kosaio_make_build() {
 	make -j"$(nproc)" "$@"
 }
+
+# Runs one build command and records its duration in the build history
+# (data/history/builds.jsonl). Usage: kosaio_timed <id> <port|tool> cmd [args...]
+kosaio_timed() {
+	local id="$1" kind="$2"
+	shift 2
+	python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" history_run --kind "$kind" "$id" -- "$@"
+}
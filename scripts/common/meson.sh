@@ -39,5 +39,5 @@ kosaio_meson_build() {
 	done
 
 	log_info "Building with Meson..."
-	meson compile -C "$build_dir" "$@"
+	kosaio_timed "${ID:-meson}" tool meson compile -C "$build_dir" "$@"
 }
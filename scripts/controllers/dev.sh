@@ -64,10 +64,12 @@ function controller_dev_handle() {
 			fi
 
 			kosaio_state_set host "$target"
+			_dev_link_distfiles "$target"
 			log_success "${C_BLUE}${target}${C_RESET} switched to ${C_YELLOW}HOST${C_RESET} mode."
 			;;
 		"container"|"c"|"system"|"disable"|"cont"|"sys")
 			kosaio_state_unset host "$target"
+			_dev_link_distfiles "$target"
 			log_success "${C_BLUE}${target}${C_RESET} switched to ${C_CYAN}CONTAINER${C_RESET} mode."
 			;;
 		*)
@@ -75,3 +77,10 @@ function controller_dev_handle() {
 			;;
 	esac
 }
+
+# Downloads already fetched by the other kos-ports tree are linked into the
+# newly active one, so the next install skips the fetch step.
+function _dev_link_distfiles() {
+	[ "$1" == "kos-ports" ] || return 0
+	python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" distfiles link >/dev/null 2>&1 || true
+}
@@ -69,6 +69,14 @@ function kosaio_router_dispatch() {
 			_router_handle_self_update
 			;;
 
+		"cache")
+			_router_handle_cache "$TARGET" "${ARGS[@]}"
+			;;
+
+		"gc")
+			python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" distfiles gc ${TARGET:+"$TARGET"} "${ARGS[@]}"
+			;;
+
 		"tool")
 			source "${KOSAIO_DIR}/scripts/controllers/tool.sh"
 			kosaio_cmd_tool "$TARGET" "${ARGS[@]}"
@@ -224,6 +232,19 @@ function _router_handle_deps() {
 	fi
 }
 
+function _router_handle_cache() {
+	local sub="${1:-stats}"; shift || true
+	case "$sub" in
+		stats|prune)
+			python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" cache "$sub" "$@"
+			;;
+		*)
+			log_error "Usage: kosaio cache stats|prune [--max-mb N]"
+			return 1
+			;;
+	esac
+}
+
 function _router_handle_self_update() {
 	log_info --draw-line "Updating KOSAIO..."
 	kosaio_git_fix_permissions
@@ -233,30 +254,65 @@ function _router_handle_self_update() {
 function _router_handle_update_all() {
 	log_info --draw-line "Updating all installed tools and ports..."
 	
-	# Get list of installed IDs from Python engine
-	local installed_ids
-	installed_ids=$(python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" get_installed_ids) || {
-		log_error "Failed to retrieve installed targets."
-		return 1
-	}
-
-	if [ -z "$installed_ids" ]; then
-		log_warn "No installed targets found to update."
-		return 0
-	fi
+	local python_engine="${KOSAIO_DIR}/scripts/engine/py/main.py"
 
 	# Force non-interactive mode for bulk update
 	export KOSAIO_NON_INTERACTIVE=1
 	export KOSAIO_BULK_UPDATE=1
-	
-	local results=()
 
-	for id in $installed_ids; do
-		log_info "Updating: $id"
-		local status=0
-		_router_handle_lifecycle "update" "$id" "$@" || status=$?
-		results+=("${id}:${status}")
+	local results=()
+	local planned=0
+
+	# Fetch every git mirror concurrently first: the per-tool fetches below
+	# then only transfer what the local mirrors do not have yet.
+	log_info "Refreshing git mirrors..."
+	python3 "$python_engine" mirror_sync --jobs "${KOSAIO_MIRROR_JOBS:-4}" >/dev/null 2>&1 \
+		|| log_warn "Some git mirrors could not be refreshed; updates will fetch from origin."
+
+	# Tools first (kos / kos-ports lead), then ports, planned against the refreshed recipes.
+	# Only BUMP / CHECK items go through the update lifecycle; OK is already current.
+	# --remote settles git-tracked ports with concurrent, cached ls-remote calls.
+	local kind
+	for kind in tools ports; do
+		local plan=() plan_out
+		plan_out=$(python3 "$python_engine" update_plan --kind "$kind" --all --remote) || {
+			unset KOSAIO_NON_INTERACTIVE
+			unset KOSAIO_BULK_UPDATE
+			log_error "Failed to retrieve installed targets."
+			return 1
+		}
+		[ -n "$plan_out" ] && mapfile -t plan <<< "$plan_out"
+		local line
+		for line in "${plan[@]}"; do
+			local state item_kind id detail
+			read -r state item_kind id detail <<< "$line"
+			[ -z "$id" ] && continue
+			planned=$((planned + 1))
+
+			case "$state" in
+				OK)
+					results+=("${id}:10")
+					;;
+				BROKEN)
+					log_warn "Skipping $id: $detail"
+					results+=("${id}:broken")
+					;;
+				*)
+					log_info "Updating: $id ($detail)"
+					local status=0
+					_router_handle_lifecycle "update" "$id" "$@" || status=$?
+					results+=("${id}:${status}")
+					;;
+			esac
+		done
 	done
+
+	if [ "$planned" -eq 0 ]; then
+		unset KOSAIO_NON_INTERACTIVE
+		unset KOSAIO_BULK_UPDATE
+		log_warn "No installed targets found to update."
+		return 0
+	fi
 	
 	# Restore interactive mode
 	unset KOSAIO_NON_INTERACTIVE
@@ -299,6 +355,10 @@ function _router_handle_update_all() {
 				printf "  ${C_GRAY}[SUCCESS]   ${C_RESET}  %-15s %s\n" "$id" "Completed."
 				count_uptodate=$((count_uptodate + 1))
 				;;
+			broken)
+				printf "  ${C_RED}[BROKEN]    ${C_RESET}  %-15s %s\n" "$id" "Not updated, run 'kosaio rebuild $id'."
+				count_error=$((count_error + 1))
+				;;
 			*)
 				printf "  ${C_RED}[ERROR]     ${C_RESET}  %-15s %s\n" "$id" "Failed with code $code"
 				count_error=$((count_error + 1))
@@ -35,6 +35,9 @@ function kosaio_manager_execute() {
 		source "$MANIFEST"
 	fi
 
+	# Every build step of this action counts towards one build in the history
+	export KOSAIO_BUILD_SESSION="${TARGET_ID}-$$-$(date +%s%N)"
+
 	case "$COMMAND" in
 		"install")
 			if [ -n "${DEPS:-}" ]; then
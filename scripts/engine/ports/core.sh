@@ -11,20 +11,17 @@ function ports_info() {
 
 	log_info --draw-line "Information: ${lib_name}"
 
-	# Fetch metadata through Python
-	local metadata=$(python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" port_info "${lib_name}" 2>/dev/null)
+	# Metadata and installed version in one engine call (declares PORT_INFO)
+	local -A PORT_INFO=() PORT_INFO_NAMES=()
+	eval "$(python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" port_info --format shell "${lib_name}" 2>/dev/null)"
+	local port="${PORT_INFO_NAMES[${lib_name}]:-$lib_name}"
 
-	# Parse variables from python output
-	local PORTNAME=$(echo "$metadata" | grep "^PORTNAME=" | cut -d'=' -f2-)
-	local SHORT_DESC=$(echo "$metadata" | grep "^SHORT_DESC=" | cut -d'=' -f2-)
-	local DEPENDENCIES=$(echo "$metadata" | grep "^DEPENDENCIES=" | cut -d'=' -f2-)
+	printf "Port Name:    %s\n" "${PORT_INFO[${port},PORTNAME]:-$lib_name}"
+	printf "Description:  %s\n" "${PORT_INFO[${port},SHORT_DESC]:-No description}"
+	printf "Dependencies: %s\n" "${PORT_INFO[${port},DEPENDENCIES]:-None}"
 
-	printf "Port Name:    %s\n" "${PORTNAME:-$lib_name}"
-	printf "Description:  %s\n" "${SHORT_DESC:-No description}"
-	printf "Dependencies: %s\n" "${DEPENDENCIES:-None}"
-
-	local installed_version=$(ports_get_installed_version "${lib_name}")
-	if [ $? -eq 0 ]; then
+	local installed_version="${PORT_INFO[${port},INSTALLED]}"
+	if [ -n "${installed_version}" ]; then
 		log_success "Installed: ${installed_version}"
 	else
 		log_info "Not installed"
@@ -39,12 +36,15 @@ function _ports_parse_args() {
 	for arg in "$@"; do
 		if [ "$arg" == "--reinstall" ]; then
 			eval "${force_reinstall_ref}=true"
+		elif [[ "$arg" == --jobs=* ]]; then
+			export KOSAIO_JOBS="${arg#--jobs=}"
 		else
 			eval "${targets_ref}+=(\"$arg\")"
 		fi
 	done
 }
 
+# Returns 1 when the user cancels, 2 when the dependencies cannot be resolved.
 function _ports_resolve_dependencies() {
 	local python_engine="$1"
 	local targets_ref="$2"
@@ -57,7 +57,11 @@ function _ports_resolve_dependencies() {
 
 	if [ -f "$python_engine" ]; then
 		local resolved_string
-		resolved_string=$(python3 "$python_engine" resolve_deps "${targets_val[@]}")
+		# Non-zero exit means a dependency cycle (details already on stderr)
+		resolved_string=$(python3 "$python_engine" resolve_deps "${targets_val[@]}") || {
+			log_error "Cannot resolve dependencies for: ${targets_val[*]}"
+			return 2
+		}
 		read -r -a final_targets_val <<< "$resolved_string"
 		
 		for t in "${final_targets_val[@]}"; do
@@ -86,20 +90,18 @@ function _ports_resolve_dependencies() {
 	return 0
 }
 
+# Reads the port's record from PORT_INFO (and its remote head from
+# PORT_REMOTE), filled once per bulk operation by ports_install.
 function _ports_check_update_status() {
 	local lib_name="$1"
 	local python_engine="$2"
 	local force_reinstall_ref="$3"
 
-	local metadata
-	metadata=$(python3 "${python_engine}" port_info "${lib_name}" 2>/dev/null)
-	
-	local installed_ver
-	installed_ver=$(ports_get_installed_version "${lib_name}") || installed_ver=""
-	
-	local current_ver=$(echo "$metadata" | grep "^PORTVERSION=" | cut -d'=' -f2-)
-	local git_repo=$(echo "$metadata" | grep "^GIT_REPOSITORY=" | cut -d'=' -f2-)
-	local git_branch=$(echo "$metadata" | grep "^GIT_BRANCH=" | cut -d'=' -f2-)
+	local installed_ver="${PORT_INFO[${lib_name},INSTALLED]}"
+	local current_ver="${PORT_INFO[${lib_name},PORTVERSION]}"
+	local git_repo="${PORT_INFO[${lib_name},GIT_REPOSITORY]}"
+	local git_branch="${PORT_INFO[${lib_name},GIT_BRANCH]}"
+	local local_hash="${PORT_INFO[${lib_name},HASH]}"
 
 	if [ -n "$installed_ver" ]; then
 		if [ "$installed_ver" != "$current_ver" ] && [ "$current_ver" != "unknown" ]; then
@@ -107,8 +109,7 @@ function _ports_check_update_status() {
 			eval "${force_reinstall_ref}=true"
 		elif [ -n "$git_repo" ] && [[ "${FUNCNAME[2]}" == "ports_update" ]]; then
 			if [[ "$current_ver" =~ ^[0-9] ]] && [ "${!force_reinstall_ref}" = false ] && [ "${KOSAIO_BULK_UPDATE:-0}" = "1" ]; then
-				local hash_file="${KOS_PORTS}/lib/.kos-ports/${lib_name}.hash"
-				if [ -f "$hash_file" ]; then
+				if [ -n "$local_hash" ]; then
 					echo ""
 					log_success "${lib_name} is already installed (${installed_ver}) and is a stable version. Skipping git check in bulk update."
 					return 10 # SKIP
@@ -116,13 +117,15 @@ function _ports_check_update_status() {
 			fi
 
 			log_info "Checking remote Git hash for ${lib_name}..."
-			local remote_hash local_hash
-			local ref_match="HEAD"
-			[ -n "$git_branch" ] && ref_match="refs/heads/${git_branch}"
-			
-			remote_hash=$(git ls-remote "$git_repo" "$ref_match" 2>/dev/null | awk '{print $1}')
-			local hash_file="${KOS_PORTS}/lib/.kos-ports/${lib_name}.hash"
-			[ -f "$hash_file" ] && local_hash=$(cat "$hash_file")
+			local remote_hash
+			if [ -n "${PORT_REMOTE[${lib_name}]+set}" ]; then
+				# Already fetched concurrently by ports_install
+				remote_hash="${PORT_REMOTE[${lib_name}]}"
+			else
+				local ref_match="HEAD"
+				[ -n "$git_branch" ] && ref_match="refs/heads/${git_branch}"
+				remote_hash=$(git ls-remote "$git_repo" "$ref_match" 2>/dev/null | awk '{print $1}')
+			fi
 
 			if [ -n "$remote_hash" ] && [ "$remote_hash" != "$local_hash" ]; then
 				[ -n "$local_hash" ] && log_info "New commits found on Git remote for ${lib_name} (branch: ${git_branch:-default})."
@@ -158,6 +161,8 @@ function _ports_execute_install() {
 	local git_repo="$2"
 	local git_branch="$3"
 
+	local python_engine="${KOSAIO_DIR}/scripts/engine/py/main.py"
+
 	log_info --draw-line "Installing ${lib_name}..."
 	
 	export KOS_BASE="${KOS_DIR}"
@@ -175,6 +180,12 @@ function _ports_execute_install() {
 	mkdir -p "${manifest_dir}"
 	local manifest_file="${manifest_dir}/${lib_name}.manifest"
 
+	# Same fingerprint built before (here or on a shared cache): unpack it instead of compiling
+	if python3 "$python_engine" cache restore "${lib_name}" >/dev/null 2>&1; then
+		log_success "${lib_name} installed (restored from artifact cache)."
+		return 0
+	fi
+
 	_ports_snapshot "${pre_snap}"
 	
 	if ! check_dir_soft "${KOS_PORTS}/${lib_name}"; then
@@ -182,7 +193,10 @@ function _ports_execute_install() {
 		return 1
 	fi
 
-	if (cd "${KOS_PORTS}/${lib_name}" && ${KOS_MAKE} ${make_targets}); then
+	# Tarballs already fetched (by either kos-ports tree) are linked into dist/
+	python3 "$python_engine" distfiles link "${lib_name}" >/dev/null 2>&1 || true
+
+	if (cd "${KOS_PORTS}/${lib_name}" && KOSAIO_BUILD_SESSION="${lib_name}-$$-$(date +%s%N)" kosaio_timed "${lib_name}" port ${KOS_MAKE} ${make_targets}); then
 		_ports_snapshot "${post_snap}"
 		comm -13 "${pre_snap}" "${post_snap}" > "${manifest_file}"
 
@@ -197,6 +211,10 @@ function _ports_execute_install() {
 		mkdir -p "${KOS_PORTS}/lib/.kos-ports"
 		echo "${LAST_PORT_VERSION:-unknown}" > "${KOS_PORTS}/lib/.kos-ports/${lib_name}"
 
+		# Best effort: keep the installed files for the next install with this fingerprint
+		python3 "$python_engine" cache store "${lib_name}" >/dev/null 2>&1 || true
+		python3 "$python_engine" distfiles add "${lib_name}" >/dev/null 2>&1 || true
+
 		log_success "${lib_name} installed."
 		rm -f "${pre_snap}" "${post_snap}"
 		return 0
@@ -207,6 +225,35 @@ function _ports_execute_install() {
 	fi
 }
 
+# Builds several ports at once through the engine's parallel executor.
+# Independent ports run concurrently; all makes share one jobserver capped at
+# KOSAIO_JOBS. A failed port only skips the ports that depend on it.
+# Per-port logs: ${KOSAIO_DIR}/data/logs/ports/<port>.log
+function _ports_execute_parallel() {
+	local python_engine="$1"
+	local success_ref="$2"
+	shift 2
+	local -n success_val="$success_ref"
+
+	log_info --draw-line "Building $# ports in parallel (${KOSAIO_JOBS} jobs)..."
+
+	export KOS_BASE="${KOS_DIR}"
+	[ -f "${KOS_BASE}/environ.sh" ] && source "${KOS_BASE}/environ.sh"
+	export KOS_PORTS="${KOS_PORTS}"
+
+	local make_targets="install"
+	[ "${KOSAIO_CLEAN_AFTER:-false}" = true ] && make_targets="install clean"
+
+	local status port detail
+	while read -r status port detail; do
+		case "$status" in
+			OK)      log_success "${port} installed (${detail})."; success_val+=("${port}") ;;
+			FAILED)  log_error "${port} failed: ${detail}" ;;
+			SKIPPED) log_warn "${port} skipped: ${detail}" ;;
+		esac
+	done < <(python3 "$python_engine" build_ports --only --jobs "${KOSAIO_JOBS}" --targets "${make_targets}" "$@")
+}
+
 function ports_install() {
 	_ports_check_exists
 	_ports_check_requirements
@@ -217,14 +264,44 @@ function ports_install() {
 	local final_targets=()
 	local dependencies=()
 	local success_libs=()
+	local parallel_libs=()
 
 	_ports_parse_args force_reinstall targets "$@"
-	_ports_resolve_dependencies "$python_engine" targets final_targets dependencies || return 0
+	local resolve_status=0
+	_ports_resolve_dependencies "$python_engine" targets final_targets dependencies || resolve_status=$?
+	case "$resolve_status" in
+		0) ;;
+		1) return 0 ;;  # Cancelled by the user
+		*) return 1 ;;
+	esac
+
+	# Canonical names, metadata, installed versions and hashes for every
+	# target in one engine call
+	local -A PORT_INFO=() PORT_INFO_NAMES=()
+	eval "$(python3 "$python_engine" port_info --format shell "${final_targets[@]}" 2>/dev/null)"
+
+	# Updates: remote heads of every git-tracked target in one concurrent,
+	# cached engine call instead of one ls-remote per port (declares PORT_REMOTE)
+	local -A PORT_REMOTE=()
+	if [[ "${FUNCNAME[1]}" == "ports_update" ]]; then
+		local remote_targets=() port
+		for port in "${PORT_INFO_NAMES[@]}"; do
+			[ -z "${PORT_INFO[${port},GIT_REPOSITORY]}" ] && continue
+			# Pinned releases with a hash skip the git check in bulk updates
+			if [ "${KOSAIO_BULK_UPDATE:-0}" = "1" ] && [[ "${PORT_INFO[${port},PORTVERSION]}" =~ ^[0-9] ]] \
+				&& [ -n "${PORT_INFO[${port},HASH]}" ]; then
+				continue
+			fi
+			remote_targets+=("$port")
+		done
+		if [ ${#remote_targets[@]} -gt 0 ]; then
+			eval "$(python3 "$python_engine" remote_heads --format shell "${remote_targets[@]}" 2>/dev/null)"
+		fi
+	fi
 
 	for lib_name in "${final_targets[@]}"; do
-		local resolved_name
-		if resolved_name=$(ports_resolve_name "${lib_name}"); then
-			lib_name="${resolved_name}"
+		if [ -n "${PORT_INFO_NAMES[${lib_name}]}" ]; then
+			lib_name="${PORT_INFO_NAMES[${lib_name}]}"
 		else
 			log_error "Library '${lib_name}' not found."
 			continue
@@ -237,8 +314,18 @@ function ports_install() {
 			break
 		}
 
+		# Parallel mode: queue the port, everything is built at once below
+		if [ "${KOSAIO_JOBS:-1}" -gt 1 ]; then
+			parallel_libs+=("${lib_name}")
+			continue
+		fi
+
 		_ports_execute_install "${lib_name}" "$LAST_GIT_REPO" "$LAST_GIT_BRANCH" && success_libs+=("${lib_name}") || break
 	done
+
+	if [ ${#parallel_libs[@]} -gt 0 ]; then
+		_ports_execute_parallel "$python_engine" success_libs "${parallel_libs[@]}"
+	fi
 	_ports_print_summary "Installation" "${success_libs[@]}"
 }
 
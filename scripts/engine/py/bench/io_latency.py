@@ -0,0 +1,121 @@
+"""
+io_latency.py - Status table timings with artificial filesystem latency.
+
+Simulates a slow bind mount by sleeping before every stat/scandir, then
+times list_ports and search --installed for several KOSAIO_IO_WORKERS
+values. Sleeping releases the GIL exactly like a blocking syscall, so the
+thread pool overlaps the delays the same way it would on NFS.
+
+Usage: python3 bench/io_latency.py [--ports 300] [--latency-ms 2] [--workers 1,4,16]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.catalog import catalog  # noqa: E402
+from core.config import cfg  # noqa: E402
+
+PORT_MAKEFILE = "PORTNAME = {name}\nPORTVERSION = 1.0\nSHORT_DESC = Port {name}\n"
+
+
+def build_tree(root: Path, ports: int) -> None:
+    for tree in (root / "sdk" / "kos-ports", root / "projects" / "kosaio-dev" / "kos-ports"):
+        markers = tree / "lib" / ".kos-ports"
+        markers.mkdir(parents=True)
+        for i in range(ports):
+            port = tree / f"port{i:04d}"
+            port.mkdir()
+            (port / "Makefile").write_text(PORT_MAKEFILE.format(name=port.name))
+            if i % 3 == 0:
+                (markers / port.name).write_text("1.0\n")
+            if i % 5 == 0:
+                (port / "dist").mkdir()
+    (root / "kosaio" / "scripts" / "registry" / "tools").mkdir(parents=True)
+    (root / "kosaio" / "data" / "states" / "host").mkdir(parents=True)
+
+
+def point_cfg(root: Path) -> None:
+    cfg.kosaio_dir = root / "kosaio"
+    cfg.sdk_root = root / "sdk"
+    cfg.projects_root = root / "projects"
+    cfg.dev_root = root / "projects" / "kosaio-dev"
+    cfg.state_dir = cfg.kosaio_dir / "data" / "states"
+    cfg.dev_mode = "0"
+    cfg.kos_ports_dir_override = None
+    cfg.cache_dir_override = str(root / "cache")
+
+
+@contextlib.contextmanager
+def slow_fs(latency: float):
+    """Adds `latency` seconds to every stat and scandir in this process."""
+    real_stat, real_scandir = os.stat, os.scandir
+
+    def stat(*args, **kwargs):
+        time.sleep(latency)
+        return real_stat(*args, **kwargs)
+
+    def scandir(*args, **kwargs):
+        time.sleep(latency)
+        return real_scandir(*args, **kwargs)
+
+    os.stat, os.scandir = stat, scandir
+    try:
+        yield
+    finally:
+        os.stat, os.scandir = real_stat, real_scandir
+
+
+def time_command(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ports", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--workers", default="1,4,16")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from services.presenter import Presenter
+    from services.searcher import SearchService
+
+    commands = {
+        "list_ports": Presenter.render_ports_table,
+        "search --installed": lambda: Presenter.render_search_table(SearchService.search_all(""), True),
+    }
+
+    with tempfile.TemporaryDirectory(prefix="kosaio-bench-") as tmp:
+        root = Path(tmp)
+        build_tree(root, args.ports)
+        point_cfg(root)
+        catalog.invalidate()
+        SearchService.search_all("")  # Warm the catalog; only status probing is measured
+
+        print(f"{args.ports} ports, {args.latency_ms:g} ms per stat/scandir")
+        baseline = {}
+        with slow_fs(args.latency_ms / 1000.0):
+            for workers in (int(w) for w in args.workers.split(",")):
+                cfg.io_workers = workers
+                for name, fn in commands.items():
+                    elapsed = time_command(fn, args.repeat)
+                    baseline.setdefault(name, elapsed)
+                    print(f"  {name:<20} workers={workers:<3} {elapsed * 1000:8.1f} ms"
+                          f"  x{baseline[name] / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+layout.py - Synthetic KOSAIO trees for benchmarks.
+
+build_layout() writes a self-contained installation under root:
+
+    kosaio/scripts/registry/tools/*.tool     M registry tools
+    kosaio/scripts/engine/diagnostics/*.sh   core targets (system, self)
+    kosaio/data/states/{host,container,broken}/...
+    kosaio/data/repos/<tool>                 cloned tool sources
+    sdk/kos-ports/<port>/Makefile            N ports, random acyclic DEPENDENCIES
+    sdk/kos-ports/lib/.kos-ports/<port>      container install markers
+    projects/kosaio-dev/kos-ports/...        host tree (half the ports)
+
+The same seed always produces the same tree, so timings are comparable
+between runs and machines.
+"""
+import random
+from pathlib import Path
+from typing import Dict, List
+
+TOOL_TEMPLATE = """KOSAIO_TOOL_ID="{id}"
+KOSAIO_TOOL_NAME="{name}"
+KOSAIO_TOOL_DESC="{desc}"
+KOSAIO_TOOL_TAGS=({tags})
+KOSAIO_TOOL_TYPE=("{type}")
+"""
+
+PORT_TEMPLATE = """PORTNAME = {name}
+PORTVERSION = {version}
+MAINTAINER = Bench <bench@example.com>
+LICENSE = MIT
+SHORT_DESC = {desc}
+{deps}
+GIT_REPOSITORY = https://example.com/{name}.git
+GIT_BRANCH = master
+
+TARGET = {name}.a
+INSTALLED_HDRS = include/{name}.h
+
+include ${{KOS_PORTS}}/scripts/kos-ports.mk
+"""
+
+WORDS = ("audio", "image", "network", "graphics", "compression", "font", "physics", "script",
+         "input", "video", "math", "container", "parser", "codec", "vorbis", "png", "gl")
+TOOL_TYPES = ("tool", "emulator", "loader", "lib")
+
+
+def build_layout(root: Path, ports: int, tools: int, seed: int = 1) -> Dict[str, List[str]]:
+    """Writes the tree and returns {"ports": [...], "tools": [...], "deepest": [port]}."""
+    rng = random.Random(seed)
+    kosaio = root / "kosaio"
+    registry = kosaio / "scripts" / "registry"
+    states = kosaio / "data" / "states"
+    sys_ports = root / "sdk" / "kos-ports"
+    dev_ports = root / "projects" / "kosaio-dev" / "kos-ports"
+
+    for d in (registry / "tools", registry / "cfg", kosaio / "scripts" / "engine" / "diagnostics",
+              states / "host", states / "container", states / "broken", kosaio / "data" / "repos",
+              sys_ports / "lib" / ".kos-ports", dev_ports / "lib" / ".kos-ports", sys_ports / "scripts"):
+        d.mkdir(parents=True, exist_ok=True)
+    (registry / "process-standard.sh").write_text("#!/bin/bash\n")
+    for core in ("system", "self"):
+        (kosaio / "scripts" / "engine" / "diagnostics" / f"{core}.sh").write_text("#!/bin/bash\n")
+
+    tool_ids = [f"tool{i:03d}" for i in range(tools)]
+    for i, tool_id in enumerate(tool_ids):
+        words = rng.sample(WORDS, 3)
+        (registry / "tools" / f"{tool_id}.tool").write_text(TOOL_TEMPLATE.format(
+            id=tool_id, name=tool_id.upper(), desc=f"Synthetic {' '.join(words)} tool",
+            tags=" ".join(f'"{w}"' for w in words[:2]), type=TOOL_TYPES[i % len(TOOL_TYPES)]))
+        if i % 2 == 0:
+            (kosaio / "data" / "repos" / tool_id).mkdir()
+        if i % 3 == 0:
+            (states / "container" / tool_id).write_text("")
+        if i % 5 == 0:
+            (states / "host" / tool_id).write_text("")
+        if i % 4 == 0:
+            (registry / "cfg" / f"{tool_id}.cfg.default").write_text("")
+
+    port_ids = [f"port{i:04d}" for i in range(ports)]
+    depth = {}
+    for i, port in enumerate(port_ids):
+        # Dependencies only point at earlier ports, so the graph stays acyclic
+        deps = rng.sample(port_ids[:i], min(i, rng.randint(0, 3)))
+        depth[port] = 1 + max((depth[d] for d in deps), default=0)
+        makefile = PORT_TEMPLATE.format(
+            name=port, version=f"1.{i % 10}", desc=f"Synthetic {' '.join(rng.sample(WORDS, 2))} library",
+            deps=f"DEPENDENCIES = {' '.join(deps)}" if deps else "")
+        for tree, every in ((sys_ports, 1), (dev_ports, 2)):
+            if i % every:
+                continue
+            (tree / port).mkdir()
+            (tree / port / "Makefile").write_text(makefile)
+            if rng.random() < 0.3:
+                (tree / "lib" / ".kos-ports" / port).write_text("1.0\n")
+            if rng.random() < 0.2:
+                (tree / port / "dist").mkdir()
+
+    deepest = max(port_ids, key=lambda p: depth[p]) if port_ids else ""
+    return {"ports": port_ids, "tools": tool_ids, "deepest": [deepest]}
+
+
+def layout_env(root: Path) -> Dict[str, str]:
+    """Environment that points main.py at the synthetic tree."""
+    return {
+        "KOSAIO_DIR": str(root / "kosaio"),
+        "DREAMCAST_SDK": str(root / "sdk"),
+        "PROJECTS_DIR": str(root / "projects"),
+        "KOSAIO_CACHE_DIR": str(root / "cache"),
+        "KOSAIO_DEV_MODE": "0",
+        "KOSAIO_NO_DAEMON": "1",
+    }
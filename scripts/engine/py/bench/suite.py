@@ -0,0 +1,139 @@
+"""
+suite.py - End-to-end engine timings on synthetic trees, with baselines.
+
+For every scale a fresh tree is generated (bench/layout.py) and each
+command runs as its own `python3 main.py ...` process, exactly like the
+shell front-end calls it (daemon disabled):
+
+    cold  cache directory wiped before each run (catalog + name index rebuilt)
+    warm  cache left in place from the previous run
+
+Results are written as JSON ({"runs": {"<cmd>@<ports>/<cold|warm>": {...}}}).
+With --compare, any case whose median is slower than the baseline by more
+than --threshold (relative) and --min-delta-ms (absolute, to ignore noise
+on fast commands) is reported and the exit status is 1.
+
+Usage:
+    python3 bench/suite.py [--scales 50,200,800] [--repeat 5] [--output out.json]
+    python3 bench/suite.py --compare baseline.json [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ENGINE_DIR))
+
+from bench.layout import build_layout, layout_env  # noqa: E402
+
+
+def commands(layout: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Benchmark name -> main.py argv for one generated tree."""
+    return {
+        "search": ["search", "audio", "--no-color"],
+        "list_ports": ["list_ports", "--no-color"],
+        "get_installed_ids": ["get_installed_ids"],
+        "resolve_deps": ["resolve_deps"] + layout["deepest"],
+        "validate_target": ["validate_target", layout["tools"][0], "--action", "info"],
+        "get_tool_path": ["get_tool_path", layout["tools"][0]],
+    }
+
+
+def run_once(argv: List[str], env: Dict[str, str], cache_dir: Path, cold: bool) -> float:
+    if cold:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, str(ENGINE_DIR / "main.py")] + argv, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py {' '.join(argv)} failed: {result.stderr.strip()}")
+    return elapsed * 1000
+
+
+def bench_scale(ports: int, repeat: int, seed: int) -> Dict[str, dict]:
+    runs = {}
+    with tempfile.TemporaryDirectory(prefix="kosaio-bench-") as tmp:
+        root = Path(tmp)
+        layout = build_layout(root, ports=ports, tools=max(10, ports // 10), seed=seed)
+        env = {k: v for k, v in os.environ.items() if k != "KOS_PORTS"}
+        env.update(layout_env(root))
+        cache_dir = root / "cache"
+
+        for name, argv in commands(layout).items():
+            for phase in ("cold", "warm"):
+                if phase == "warm":
+                    run_once(argv, env, cache_dir, cold=False)
+                samples = [run_once(argv, env, cache_dir, cold=(phase == "cold")) for _ in range(repeat)]
+                key = f"{name}@{ports}/{phase}"
+                runs[key] = {
+                    "median_ms": round(statistics.median(samples), 2),
+                    "min_ms": round(min(samples), 2),
+                    "samples": len(samples),
+                }
+                print(f"  {key:<32} median {runs[key]['median_ms']:8.1f} ms   min {runs[key]['min_ms']:8.1f} ms")
+    return runs
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_delta: float) -> List[str]:
+    """Human-readable regression lines (empty when nothing regressed)."""
+    regressions = []
+    for key, run in sorted(current.items()):
+        base = baseline.get(key)
+        if not base:
+            continue
+        delta = run["median_ms"] - base["median_ms"]
+        if delta > min_delta and delta > threshold * base["median_ms"]:
+            regressions.append(f"{key}: {base['median_ms']:.1f} -> {run['median_ms']:.1f} ms "
+                               f"(+{delta / base['median_ms']:.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", default="50,200,800", help="Comma-separated port counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=25.0, help="Ignore slowdowns below this")
+    args = parser.parse_args()
+
+    runs: Dict[str, dict] = {}
+    for ports in (int(s) for s in args.scales.split(",") if s.strip()):
+        print(f"{ports} ports:")
+        runs.update(bench_scale(ports, args.repeat, args.seed))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "runs": runs,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text()).get("runs", {})
+        regressions = compare(runs, baseline, args.threshold, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+ui_width.py - render_table micro-benchmark against the previous width code.
+
+LegacyUI below is the pre-fast-path implementation (regex compiled per call,
+unicodedata lookups per character, separate strlen/truncate/pad passes).
+The benchmark renders the same 1,000-row table with emoji status pills
+through both, checks the output is byte-identical and reports the speedup.
+
+Usage: python3 bench/ui_width.py [--rows 1000] [--repeat 5] [--min-speedup 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ui import UI  # noqa: E402
+
+
+class LegacyUI:
+    @staticmethod
+    def visual_len(s: str) -> int:
+        import unicodedata
+        clean = re.sub(r'\033\[[0-9;]*[a-zA-Z]', '', s)
+        vlen = 0
+        last_char = None
+        for char in clean:
+            if unicodedata.category(char) == 'Mn':
+                if char == '\ufe0f' and last_char != '\u2139':
+                    vlen += 1
+                continue
+            last_char = char
+            if unicodedata.east_asian_width(char) in ('W', 'F', 'A'):
+                vlen += 2
+            else:
+                vlen += 1
+        return vlen
+
+    @staticmethod
+    def pad(s: str, width: int) -> str:
+        return s + " " * max(0, width - LegacyUI.visual_len(s))
+
+    @staticmethod
+    def _char_width(char: str) -> int:
+        import unicodedata
+        if unicodedata.category(char) == 'Mn':
+            return 0
+        if unicodedata.east_asian_width(char) in ('W', 'F', 'A'):
+            return 2
+        return 1
+
+    @staticmethod
+    def truncate(s: str, width: int) -> str:
+        if LegacyUI.visual_len(s) <= width:
+            return s
+        result_chars = []
+        vis = 0
+        target = width - 3
+        in_ansi = False
+        ansi_buf = ""
+        for c in s:
+            if in_ansi:
+                ansi_buf += c
+                if c == 'm':
+                    result_chars.append(ansi_buf)
+                    ansi_buf = ""
+                    in_ansi = False
+                continue
+            if c == '\033':
+                in_ansi = True
+                ansi_buf = c
+                continue
+            cw = LegacyUI._char_width(c)
+            if vis + cw > target:
+                break
+            result_chars.append(c)
+            vis += cw
+        result = "".join(result_chars)
+        last_space = result.rfind(' ')
+        if last_space > 3:
+            result = result[:last_space]
+        return result + "..."
+
+    @staticmethod
+    def render_table(headers, rows) -> str:
+        header_line = ""
+        sep_line = ""
+        for i, (label, width, color) in enumerate(headers):
+            header_line += color + LegacyUI.pad(label, width) + UI.RESET
+            sep_line += UI.GRAY + ("-" * width) + UI.RESET
+            if i < len(headers) - 1:
+                header_line += " | "
+                sep_line += "-+-"
+        output = [header_line, sep_line]
+        for row in rows:
+            row_line = ""
+            for i, (val, color) in enumerate(row):
+                val = str(val)
+                width = headers[i][1]
+                if LegacyUI.visual_len(val) > width:
+                    val = LegacyUI.truncate(val, width)
+                row_line += color + LegacyUI.pad(val, width) + UI.RESET
+                if i < len(row) - 1:
+                    row_line += " | "
+            output.append(row_line)
+        return "\n".join(output)
+
+
+HEADERS = [("TYPE", 12, UI.B_CYAN), ("ID", 20, UI.B_CYAN), ("CFG", 4, UI.B_CYAN),
+           ("STATUS", 5, UI.B_CYAN), ("DESCRIPTION", 40, UI.B_CYAN)]
+STATES = ("o", "c", "x", "!")
+
+
+def sample_rows(count: int):
+    rows = []
+    for i in range(count):
+        state = STATES[i % len(STATES)]
+        rows.append([
+            ("[PORT]" if i % 3 else "[EMULATOR]", UI.CYAN),
+            (f"lib-{i:04d}-{'ü' if i % 7 == 0 else 'x'}", UI.BLUE),
+            (UI.cfg_pill(("default", "override", "none")[i % 3]), ""),
+            (UI.active_pill(state, "H" if i % 2 else "C"), ""),
+            (f"Port number {i} ✅ with a description long enough to be truncated ⚠️ here", UI.RESET),
+        ])
+    return rows
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rows = sample_rows(args.rows)
+    legacy_out = LegacyUI.render_table(HEADERS, rows)
+    new_out = UI.render_table(HEADERS, rows)
+    if legacy_out.encode() != new_out.encode():
+        print("FAIL: output differs from the legacy renderer")
+        return 1
+
+    legacy = best_of(lambda: LegacyUI.render_table(HEADERS, rows), args.repeat)
+    new = best_of(lambda: UI.render_table(HEADERS, rows), args.repeat)
+    speedup = legacy / new
+    print(f"render_table, {args.rows} rows: legacy {legacy * 1000:.1f} ms, "
+          f"current {new * 1000:.1f} ms, x{speedup:.1f} (byte-identical)")
+    if speedup < args.min_speedup:
+        print(f"FAIL: expected at least x{args.min_speedup:g}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+catalog.py - Persistent index of registry manifests and port Makefiles.
+
+The index lives in data/cache/catalog.json. Every entry is keyed by the
+file it was parsed from and carries that file's mtime/size, so a refresh
+only reparses manifests that actually changed. A missing or corrupt index
+degrades to a full scan and is rewritten on the way out.
+"""
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core.config import cfg
+from core import fs
+from core.fs import atomic_write, stat_many
+from core.profiling import span
+from core.manifest import Manifest, ManifestParser
+
+# Directories inside kos-ports that are infrastructure, not ports
+PORT_SKIP_DIRS = {"utils", "scripts", "include", "lib", "examples", "kos-ports"}
+
+
+class Catalog:
+    VERSION = 2
+    FILENAME = "catalog.json"
+
+    def __init__(self):
+        # section -> { file path -> {"mtime", "size", "manifest"} }
+        self._sections: Optional[Dict[str, Dict[str, dict]]] = None
+        self._dirty = False
+        # Bumped whenever a refresh or rebuild changes an entry (for derived caches)
+        self.generation = 0
+
+    @property
+    def path(self) -> Path:
+        return cfg.cache_dir / Catalog.FILENAME
+
+    # --- Public API ---
+
+    def tools(self) -> List[Manifest]:
+        """All registry tool manifests (*.tool)."""
+        with span("registry scan"):
+            paths = Catalog._scan_tools()
+            return self._refresh("tools", paths, ManifestParser.parse_config_file)
+
+    def ports(self, ports_dir: Optional[Path] = None) -> List[Manifest]:
+        """All port manifests under ports_dir (defaults to the system kos-ports tree)."""
+        if ports_dir is None:
+            ports_dir = cfg.system_kos_ports_dir
+        if not ports_dir or not fs.exists(ports_dir):
+            return []
+        with span("ports scan"):
+            paths = Catalog._scan_ports(ports_dir)
+            return self._refresh(f"ports:{ports_dir}", paths, ManifestParser.parse_port_makefile)
+
+    def rebuild(self) -> Dict[str, int]:
+        """Discard every cached entry and reparse the registry and ports trees."""
+        self._sections = {}
+        self._dirty = True
+        self.generation += 1
+        counts = {"tools": len(self.tools()), "ports": len(self.ports())}
+        if cfg.kos_ports_dir != cfg.system_kos_ports_dir:
+            self.ports(cfg.kos_ports_dir)
+        self.save()
+        return counts
+
+    def invalidate(self) -> None:
+        """Forget the in-memory copy; the next query reloads from disk."""
+        self._sections = None
+        self._dirty = False
+
+    # --- Persistence ---
+
+    def load(self) -> None:
+        import json
+
+        self._sections = {}
+        self._dirty = False
+        try:
+            data = json.loads(fs.read_text(self.path))
+            if data.get("version") != Catalog.VERSION or not isinstance(data.get("sections"), dict):
+                raise ValueError("stale catalog format")
+            self._sections = data["sections"]
+        except FileNotFoundError:
+            self._dirty = True
+        except Exception:
+            # Corrupt or foreign file: fall back to a full scan and overwrite it
+            self._sections = {}
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty or self._sections is None:
+            return
+        import json
+
+        data = json.dumps({"version": Catalog.VERSION, "sections": self._sections}, separators=(",", ":"))
+        # Read-only data dir: the in-memory index still serves this process
+        if atomic_write(self.path, data):
+            self._dirty = False
+
+    # --- Internal helpers ---
+
+    def _refresh(self, section: str, paths: Iterable[str],
+                 parser: Callable[[Path], Optional[Manifest]]) -> List[Manifest]:
+        if self._sections is None:
+            self.load()
+
+        old = self._sections.get(section, {})
+        new: Dict[str, dict] = {}
+        results: List[Manifest] = []
+
+        paths = list(paths)
+        for path, st in zip(paths, stat_many(paths, cfg.io_workers)):
+            if st is None:
+                continue
+
+            entry = old.get(path)
+            if entry is None or entry["mtime"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                m = parser(Path(path))
+                entry = {
+                    "mtime": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "manifest": m.to_dict() if m else None,
+                }
+                self._dirty = True
+                self.generation += 1
+
+            new[path] = entry
+            if entry["manifest"]:
+                results.append(Manifest.from_dict(entry["manifest"]))
+
+        if len(new) != len(old):
+            self._dirty = True
+            self.generation += 1
+        self._sections[section] = new
+        self.save()
+        return results
+
+    @staticmethod
+    def _scan_tools() -> List[str]:
+        if not fs.exists(cfg.registry_dir):
+            return []
+        paths = [str(p) for p in fs.rglob(cfg.registry_dir, "*.tool")]
+        # Template-covered tools outside the registry tree (avoids dups)
+        if cfg.config_tools_dir != cfg.registry_dir / "tools" and fs.exists(cfg.config_tools_dir):
+            known = {Path(p).stem for p in paths}
+            for p in fs.glob(cfg.config_tools_dir, "*.tool"):
+                if p.stem not in known:
+                    paths.append(str(p))
+        return paths
+
+    @staticmethod
+    def _scan_ports(ports_dir: Path) -> List[str]:
+        paths = []
+        with fs.scandir(ports_dir) as it:
+            for entry in it:
+                if entry.name.startswith(".") or entry.name in PORT_SKIP_DIRS:
+                    continue
+                if entry.is_dir():
+                    paths.append(os.path.join(entry.path, "Makefile"))
+        return paths
+
+
+catalog = Catalog()
@@ -0,0 +1,156 @@
+"""
+completion.py - Prefix completion from a precomputed, sorted target list.
+
+NameIndex writes data/cache/targets.idx next to names.json whenever it
+rebuilds: a header with the directories the names came from (and their
+mtimes), then one "lowercase<TAB>id<TAB>kind" line per target, sorted.
+complete() validates the header with a handful of stats and answers with a
+binary search over the lines, so a TAB never parses a manifest, Makefile or
+JSON document. Only --kind installed looks further, and then only at the
+matching candidates' status.
+
+The shell never starts Python on TAB: completions.sh reads plain word lists
+(data/cache/completion/<kind>, one id per line) and the directories whose
+mtimes invalidate them (<kind>.dirs). The "all" list is rewritten with every
+name index rebuild; `complete --kind K --write-words` rewrites a stale one.
+"""
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core import fs
+from core.config import cfg
+
+FILENAME = "targets.idx"
+MAGIC = "# kosaio targets 1"
+WORDS_DIR = "completion"
+
+# --kind value -> name index kinds it covers (installed filters "all")
+KIND_FILTERS = {
+    "all": ("tool", "core", "port"),
+    "tools": ("tool", "core"),
+    "ports": ("port",),
+    "installed": ("tool", "core", "port"),
+}
+
+# Actions that only make sense for installed targets
+ACTION_KINDS = {
+    "uninstall": "installed",
+    "update": "installed",
+    "rebuild": "installed",
+}
+
+
+def targets_path() -> Path:
+    return cfg.cache_dir / FILENAME
+
+
+def format_targets(roots: List[str], stamps: Dict[str, Optional[int]],
+                   entries: Iterable[Tuple[str, str]]) -> str:
+    """File body for (kind, name) entries (written by NameIndex)."""
+    lines = [MAGIC]
+    lines += [f"root\t{root}" for root in roots]
+    lines += [f"stamp\t{'-' if mtime is None else mtime}\t{path}" for path, mtime in stamps.items()]
+    lines.append("")
+    lines += sorted(f"{name.lower()}\t{name}\t{kind}" for kind, name in entries)
+    return "\n".join(lines) + "\n"
+
+
+def words_path(kind: str) -> Path:
+    return cfg.cache_dir / WORDS_DIR / kind
+
+
+def write_words(kind: str, names: Iterable[str], dirs: Iterable[str]) -> None:
+    """Shell word list for `kind`, written after its .dirs file so it is never older than it."""
+    path = words_path(kind)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return
+    fs.atomic_write(path.with_name(f"{kind}.dirs"), "".join(f"{d}\n" for d in dirs))
+    fs.atomic_write(path, "".join(f"{name}\n" for name in names))
+
+
+def refresh_words(kind: str) -> List[str]:
+    """Rewrites the word list for `kind` from the current target list; returns its names."""
+    from core.names import names
+
+    found = complete("", kind)
+    dirs = [d for d, _ in names.generation()[1]]
+    if kind == "installed":
+        dirs += [str(d) for d in _status_dirs()]
+    write_words(kind, found, dirs)
+    return found
+
+
+def kind_for_action(action: Optional[str]) -> str:
+    return ACTION_KINDS.get(action or "", "all")
+
+
+def complete(prefix: str, kind: str = "all") -> List[str]:
+    """Target ids starting with prefix (case-insensitive), sorted."""
+    lines = _load()
+    if lines is None:
+        from core.names import names
+        names.rebuild()
+        lines = _load() or []
+
+    key = prefix.lower()
+    kinds = KIND_FILTERS[kind]
+    matches: List[Tuple[str, str]] = []
+    for line in lines[bisect_left(lines, key):]:
+        if not line.startswith(key):
+            break
+        _, name, item_kind = line.split("\t")
+        if item_kind in kinds:
+            matches.append((name, item_kind))
+
+    if kind == "installed":
+        matches = _installed(matches)
+    return [name for name, _ in matches]
+
+
+# --- Internal helpers ---
+
+def _load() -> Optional[List[str]]:
+    """Sorted target lines, or None when the file is missing or out of date."""
+    try:
+        text = fs.read_text(targets_path())
+    except OSError:
+        return None
+    header, sep, body = text.partition("\n\n")
+    rows = header.split("\n")
+    if not sep or rows[0] != MAGIC:
+        return None
+
+    from core.names import NameIndex
+    roots, stamps = [], {}
+    for row in rows[1:]:
+        field, _, value = row.partition("\t")
+        if field == "root":
+            roots.append(value)
+        elif field == "stamp":
+            mtime, _, path = value.partition("\t")
+            stamps[path] = None if mtime == "-" else int(mtime)
+    if not NameIndex.is_current(roots, stamps):
+        return None
+    return body.splitlines()
+
+
+def _status_dirs() -> List[Path]:
+    """Directories whose entries change when a target is installed or removed."""
+    trees = [cfg.get_tool_dir("kos-ports", force_mode=mode) for mode in ("0", "1")]
+    dirs = [cfg.state_dir / state for state in ("host", "container", "broken")]
+    dirs += [tree / "lib" / ".kos-ports" for tree in trees]
+    dirs += [cfg.sdk_root, cfg.dev_root, cfg.kosaio_dir / "data" / "repos"]
+    return list(dict.fromkeys(dirs))
+
+
+def _installed(matches: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    from core.fs import FsSnapshot
+    from services.status import StatusService
+
+    items = [(name, "port" if kind == "port" else "tool") for name, kind in matches]
+    statuses = StatusService.get_status_bulk(items, FsSnapshot())
+    return [m for m, status in zip(matches, statuses)
+            if status["c_inst"] == "o" or status["h_inst"] == "o"]
@@ -2,6 +2,12 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from core import fs
+
+# SDK components that live directly under DREAMCAST_SDK (never ports or registry repos)
+SDK_COMPONENTS = frozenset({"kos", "kos-ports", "sh-elf", "arm-eabi", "aicaos", "bin"})
+
+
 class Config:
     def __init__(self):
         self.kosaio_dir = Path(os.environ.get("KOSAIO_DIR", "/opt/kosaio"))
@@ -11,6 +17,16 @@ class Config:
         self.state_dir = self.kosaio_dir / "data" / "states"
         self.dev_mode = os.environ.get("KOSAIO_DEV_MODE")
         self.kos_ports_dir_override = os.environ.get("KOS_PORTS")
+        self.cache_dir_override = os.environ.get("KOSAIO_CACHE_DIR")
+        # Concurrent directory reads for status tables (IO_WORKERS in kosaio.cfg)
+        try:
+            self.io_workers = max(1, int(os.environ.get("KOSAIO_IO_WORKERS", "1")))
+        except ValueError:
+            self.io_workers = 1
+
+    def reload(self) -> None:
+        """Re-read the environment (used by the engine daemon between requests)."""
+        self.__init__()
 
     def get_tool_dir(self, tool: str, force_mode: Optional[str] = None) -> Path:
         mode = force_mode if force_mode is not None else self.dev_mode
@@ -27,14 +43,13 @@ class Config:
             is_dev = True
         elif mode == "0":
             is_dev = False
-        elif state_file.exists():
+        elif fs.exists(state_file):
             is_dev = True
 
         if is_dev:
             return self.dev_root / tool
 
-        holy_list = {"kos", "kos-ports", "sh-elf", "arm-eabi", "aicaos", "bin"}
-        if tool in holy_list:
+        if tool in SDK_COMPONENTS:
             return self.sdk_root / tool
         else:
             return self.kosaio_dir / "data" / "repos" / tool
@@ -46,7 +61,7 @@ class Config:
     @property
     def system_kos_ports_dir(self) -> Path:
         sys_path = self.sdk_root / "kos-ports"
-        if sys_path.exists():
+        if fs.exists(sys_path):
             return sys_path
         if self.kos_ports_dir_override:
             return Path(self.kos_ports_dir_override)
@@ -72,6 +87,16 @@ class Config:
     def user_cfg_dir(self) -> Path:
         return self.kosaio_dir / "data" / "cfg"
 
+    @property
+    def cache_dir(self) -> Path:
+        if self.cache_dir_override:
+            return Path(self.cache_dir_override)
+        return self.kosaio_dir / "data" / "cache"
+
+    @property
+    def log_dir(self) -> Path:
+        return self.kosaio_dir / "data" / "logs"
+
     @property
     def template_path(self) -> Path:
         return self.registry_dir / "process-standard.sh"
@@ -79,9 +104,9 @@ class Config:
     def get_installed_version(self, lib_name: str, mode: Optional[str] = None) -> Optional[str]:
         ports_dir = self.get_tool_dir("kos-ports", force_mode=mode)
         version_file = ports_dir / "lib" / ".kos-ports" / lib_name
-        if version_file.exists():
+        if fs.exists(version_file):
             try:
-                return version_file.read_text().strip()
+                return fs.read_text(version_file).strip()
             except:
                 return None
 
@@ -90,15 +115,15 @@ class Config:
         resolved = PortService.resolve_port_name(lib_name)
         if resolved and resolved != lib_name:
             resolved_file = ports_dir / "lib" / ".kos-ports" / resolved
-            if resolved_file.exists():
+            if fs.exists(resolved_file):
                 try:
-                    return resolved_file.read_text().strip()
+                    return fs.read_text(resolved_file).strip()
                 except:
                     return None
             resolved_hash = ports_dir / "lib" / ".kos-ports" / f"{resolved}.hash"
-            if resolved_hash.exists():
+            if fs.exists(resolved_hash):
                 try:
-                    return resolved_hash.read_text().strip()
+                    return fs.read_text(resolved_hash).strip()
                 except:
                     return None
 
@@ -0,0 +1,244 @@
+"""
+daemon.py - Opt-in resident engine process over a local Unix socket.
+
+The daemon runs main.py commands in-process so the parsed catalog and other
+per-process caches stay warm between calls. The client half (forward) is
+deliberately tiny: when no daemon answers, main.py simply runs the command
+itself. Once the daemon has accepted a request the client never falls back,
+so a slow or failed request is reported instead of being run twice.
+
+Wire format (one request per connection):
+    client -> {"argv": [...], "env": {...}, "cwd": str}   then shutdown(SHUT_WR)
+    daemon -> {"code": int, "stdout": str, "stderr": str}
+Control requests use {"op": "status"} / {"op": "stop"} instead of argv.
+The daemon runs each command with the client's full environment and cwd.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import cfg
+
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 120.0
+DEFAULT_IDLE_TIMEOUT = 900
+
+
+def socket_path() -> Path:
+    override = os.environ.get("KOSAIO_ENGINE_SOCKET")
+    if override:
+        return Path(override)
+    return cfg.kosaio_dir / "data" / "run" / "engine.sock"
+
+
+def _connect():
+    """A socket connected to the daemon, or None when nobody is listening."""
+    path = socket_path()
+    if not path.exists():
+        return None
+
+    import socket
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.settimeout(CONNECT_TIMEOUT)
+        s.connect(str(path))
+    except OSError:
+        s.close()
+        return None
+    return s
+
+
+def _roundtrip(s, payload: dict, timeout: float) -> dict:
+    """Sends one request on a connected socket and reads the reply (OSError/ValueError on failure)."""
+    import json
+    import socket
+
+    with s:
+        s.settimeout(timeout)
+        s.sendall(json.dumps(payload).encode("utf-8"))
+        s.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    resp = json.loads(b"".join(chunks).decode("utf-8"))
+    if not isinstance(resp, dict):
+        raise ValueError("malformed daemon response")
+    return resp
+
+
+def _exchange(payload: dict, timeout: float = REQUEST_TIMEOUT) -> Optional[dict]:
+    """Sends one request to the daemon. Returns None when nobody is listening or it fails."""
+    s = _connect()
+    if s is None:
+        return None
+    try:
+        return _roundtrip(s, payload, timeout)
+    except (OSError, ValueError):
+        return None
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """
+    Runs argv on the daemon (with this process's environment and cwd) and
+    replays its output. Returns the exit code, or None if no daemon accepted
+    the request and the caller should run in-process.
+    """
+    s = _connect()
+    if s is None:
+        return None
+    try:
+        resp = _roundtrip(s, {"argv": argv, "env": dict(os.environ), "cwd": os.getcwd()}, REQUEST_TIMEOUT)
+    except (OSError, ValueError) as e:
+        resp = {"stderr": f"Engine daemon failed to answer '{' '.join(argv)}': {e}\n"}
+    sys.stdout.write(resp.get("stdout", ""))
+    sys.stderr.write(resp.get("stderr", ""))
+    sys.stdout.flush()
+    return int(resp.get("code", 1))
+
+
+def status() -> Optional[dict]:
+    return _exchange({"op": "status"}, timeout=CONNECT_TIMEOUT * 4)
+
+
+def stop() -> bool:
+    return _exchange({"op": "stop"}, timeout=CONNECT_TIMEOUT * 4) is not None
+
+
+def start(idle_timeout: int = DEFAULT_IDLE_TIMEOUT, wait: float = 5.0) -> Optional[dict]:
+    """Spawns a detached daemon (if none is running) and waits until it answers."""
+    current = status()
+    if current:
+        return current
+
+    import subprocess
+    main_py = Path(__file__).resolve().parent.parent / "main.py"
+    log_path = socket_path().with_suffix(".log")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, str(main_py), "daemon", "serve", "--idle-timeout", str(idle_timeout)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True, close_fds=True,
+        )
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        current = status()
+        if current:
+            return current
+        time.sleep(0.05)
+    return None
+
+
+class EngineDaemon:
+    """Sequential request loop. Commands share process-global state, so no threads."""
+
+    def __init__(self, runner: Callable[[List[str]], Tuple[int, str, str]],
+                 idle_timeout: int = DEFAULT_IDLE_TIMEOUT):
+        self.runner = runner
+        self.idle_timeout = idle_timeout
+        self.path = socket_path()
+        self.started = time.time()
+        self.requests = 0
+        self._running = False
+
+    def serve_forever(self) -> None:
+        import socket
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            # A live daemon answers status; anything else is a stale socket file
+            if status():
+                raise RuntimeError(f"Engine daemon already running on {self.path}")
+            self.path.unlink()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(self.path))
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(self.idle_timeout if self.idle_timeout > 0 else None)
+
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    break  # Idle timeout
+                with conn:
+                    self._handle(conn)
+        finally:
+            server.close()
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def _handle(self, conn) -> None:
+        import json
+
+        conn.settimeout(REQUEST_TIMEOUT)
+        chunks = []
+        try:
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            req = json.loads(b"".join(chunks).decode("utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(req, dict):
+            return
+
+        op = req.get("op")
+        if op == "status":
+            resp = self.describe()
+        elif op == "stop":
+            self._running = False
+            resp = {"stopped": True}
+        else:
+            self.requests += 1
+            try:
+                self._apply_context(req.get("env", {}), req.get("cwd"))
+                code, out, err = self.runner([str(a) for a in req.get("argv", [])])
+            except Exception as e:
+                # A bad env/cwd/argv must still get a reply and never stop the daemon
+                code, out, err = 1, "", f"Engine daemon cannot run the request: {e}\n"
+            resp = {"code": code, "stdout": out, "stderr": err}
+
+        try:
+            conn.sendall(json.dumps(resp).encode("utf-8"))
+        except OSError:
+            pass
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "idle_timeout": self.idle_timeout,
+        }
+
+    @staticmethod
+    def _apply_context(env: Dict[str, str], cwd: Optional[str]) -> None:
+        """Runs the next command as the client would: its environment and working directory."""
+        from core.names import names
+
+        env = {str(k): str(v) for k, v in env.items()}
+        os.environ.clear()
+        os.environ.update(env)
+        if cwd:
+            os.chdir(cwd)
+        cfg.reload()
+        # Revalidated against directory mtimes on the next lookup
+        names.invalidate()
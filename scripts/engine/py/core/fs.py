@@ -0,0 +1,332 @@
+"""
+fs.py - Filesystem access for the engine.
+
+Every engine probe (exists, stat, read, listdir/scandir, walk, glob) goes
+through the functions below so it can be accounted: with accounting on
+(`main.py --fs-stats`, KOSAIO_FS_STATS=1, or `with accounting()` in tests)
+each call is counted by kind and by the engine function that made it.
+Accounting off costs one global check per call.
+
+StatusService asks dozens of "does X exist" questions per row. A snapshot
+answers them from directory listings instead: each parent directory is read
+once with os.scandir and every later lookup in it is a set membership test.
+On slow mounts (NFS, Docker Desktop bind mounts) the listings a table needs
+can be read up front through a bounded thread pool (prefetch).
+"""
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Report order; kinds never seen are omitted
+KINDS = ("stat", "read", "list", "glob", "write")
+
+# Frames skipped when attributing a call (the facade itself, thread pools)
+_INTERNAL_MODULES = ("core.fs", "concurrent.futures.thread", "threading")
+
+
+class FsStats:
+    """Operation counts for one accounted run."""
+
+    def __init__(self):
+        # kind -> count
+        self.ops: Dict[str, int] = {}
+        # (kind, "module.function") -> count
+        self.callers: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, caller: str, n: int = 1) -> None:
+        with self._lock:
+            self.ops[kind] = self.ops.get(kind, 0) + n
+            self.callers[(kind, caller)] = self.callers.get((kind, caller), 0) + n
+
+    def __getitem__(self, kind: str) -> int:
+        return self.ops.get(kind, 0)
+
+    @property
+    def total(self) -> int:
+        return sum(self.ops.values())
+
+    def summary(self, label: str) -> str:
+        """e.g. "list_ports: 4,812 stat, 301 read, 3 glob"."""
+        parts = [f"{self.ops[k]:,} {k}" for k in KINDS if self.ops.get(k)]
+        return f"{label}: {', '.join(parts) or 'no filesystem access'}"
+
+    def report(self, label: str, top: int = 10) -> str:
+        lines = [self.summary(label)]
+        ranked = sorted(self.callers.items(), key=lambda kv: (-kv[1], kv[0]))
+        for (kind, caller), count in ranked[:top]:
+            lines.append(f"  {count:>8,} {kind:<5} {caller}")
+        return "\n".join(lines)
+
+
+_stats: Optional[FsStats] = None
+
+
+def start_accounting() -> FsStats:
+    global _stats
+    _stats = FsStats()
+    return _stats
+
+
+def stop_accounting() -> Optional[FsStats]:
+    global _stats
+    stats, _stats = _stats, None
+    return stats
+
+
+@contextmanager
+def accounting() -> Iterator[FsStats]:
+    """Counts filesystem operations inside the block (tests: assert upper bounds)."""
+    stats = start_accounting()
+    try:
+        yield stats
+    finally:
+        stop_accounting()
+
+
+def _record(kind: str, n: int = 1) -> None:
+    stats = _stats
+    if stats is None or n <= 0:
+        return
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__") in _INTERNAL_MODULES:
+        frame = frame.f_back
+    if frame is None:
+        caller = "(worker thread)"
+    else:
+        code = frame.f_code
+        caller = f"{frame.f_globals.get('__name__')}.{getattr(code, 'co_qualname', code.co_name)}"
+    stats.add(kind, caller, n)
+
+
+# --- Accounted operations ---
+
+def exists(path: Path) -> bool:
+    _record("stat")
+    return os.path.exists(path)
+
+
+def is_file(path: Path) -> bool:
+    _record("stat")
+    return os.path.isfile(path)
+
+
+def is_dir(path: Path) -> bool:
+    _record("stat")
+    return os.path.isdir(path)
+
+
+def readable(path: Path) -> bool:
+    """A regular file this process may open for reading (nothing is read)."""
+    _record("stat")
+    return os.path.isfile(path) and os.access(path, os.R_OK)
+
+
+def stat(path) -> os.stat_result:
+    _record("stat")
+    return os.stat(path)
+
+
+def read_text(path, errors: str = "strict") -> str:
+    _record("read")
+    with open(path, "r", encoding="utf-8", errors=errors) as f:
+        return f.read()
+
+
+def listdir(path) -> List[str]:
+    _record("list")
+    return os.listdir(path)
+
+
+def scandir(path):
+    _record("list")
+    return os.scandir(path)
+
+
+def walk(top) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """os.walk, one "list" per directory visited (callers may prune dirnames)."""
+    for entry in os.walk(top):
+        _record("list")
+        yield entry
+
+
+def glob(directory: Path, pattern: str) -> List[Path]:
+    _record("glob")
+    return list(directory.glob(pattern))
+
+
+def rglob(directory: Path, pattern: str) -> List[Path]:
+    _record("glob")
+    return list(directory.rglob(pattern))
+
+
+class LiveFs:
+    """Direct probes, one syscall per question (single-item lookups)."""
+
+    def exists(self, path: Path) -> bool:
+        return exists(path)
+
+    def readable(self, path: Path) -> bool:
+        return readable(path)
+
+    def listing(self, directory: Path) -> FrozenSet[str]:
+        try:
+            return frozenset(listdir(directory))
+        except OSError:
+            return frozenset()
+
+
+class FsSnapshot(LiveFs):
+    """
+    Point-in-time view built from cached directory listings.
+
+    exists(path) lists path.parent on first use, so N lookups inside one
+    directory cost a single scandir. A directory whose parent listing does
+    not contain it is known to be absent and is never read; inside an
+    unreadable directory each path is probed directly. Dangling
+    symlinks are left out of listings to match Path.exists(); a symlink's
+    target is only checked when that entry is asked about.
+    """
+
+    def __init__(self):
+        # path -> names, or None when the directory could not be read
+        self._listings: Dict[str, Optional[FrozenSet[str]]] = {}
+        # path -> names of its symlinks, resolved only when asked about
+        self._links: Dict[str, FrozenSet[str]] = {}
+        self._link_targets: Dict[str, bool] = {}
+        self.reads = 0
+
+    def exists(self, path: Path) -> bool:
+        key = str(path.parent)
+        names = self._lookup(path.parent)
+        if names is None:
+            # Traversable but unlistable parent: only a direct probe can tell
+            return exists(path)
+        return path.name in names and self._resolves(key, path.name)
+
+    def listing(self, directory: Path) -> FrozenSet[str]:
+        key = str(directory)
+        names = self._lookup(directory) or frozenset()
+        if not self._links.get(key):
+            return names
+        return frozenset(name for name in names if self._resolves(key, name))
+
+    def _resolves(self, directory: str, name: str) -> bool:
+        """False only for a dangling symlink (its target is checked once, on demand)."""
+        if name not in self._links.get(directory, ()):
+            return True
+        path = os.path.join(directory, name)
+        if path not in self._link_targets:
+            self._link_targets[path] = exists(path)
+        return self._link_targets[path]
+
+    def _lookup(self, directory: Path) -> Optional[FrozenSet[str]]:
+        key = str(directory)
+        if key in self._listings:
+            return self._listings[key]
+
+        parent = directory.parent
+        if parent != directory:
+            siblings = self._lookup(parent)
+            if siblings is not None and directory.name not in siblings:
+                self._listings[key] = frozenset()
+                return self._listings[key]
+
+        _record("list")
+        self._store(key, FsSnapshot._scan(key))
+        self.reads += 1
+        return self._listings[key]
+
+    def prefetch(self, directories: Iterable[Path], workers: int) -> None:
+        """Lists every directory not read yet, with up to `workers` reads in flight."""
+        pending: Dict[str, None] = {}
+        for directory in directories:
+            key = str(directory)
+            if key in self._listings or key in pending:
+                continue
+            # Parents are few and shared; resolving them first skips absent trees
+            siblings = self._lookup(directory.parent)
+            if siblings is not None and directory.name not in siblings:
+                self._listings[key] = frozenset()
+                continue
+            pending[key] = None
+
+        if not pending:
+            return
+        keys = list(pending)
+        # Counted here, in the calling thread, so the caller is attributed
+        _record("list", len(keys))
+        if workers > 1 and len(keys) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(workers, len(keys))) as pool:
+                results = list(pool.map(FsSnapshot._scan, keys))
+        else:
+            results = [FsSnapshot._scan(key) for key in keys]
+
+        for key, scanned in zip(keys, results):
+            self._store(key, scanned)
+        self.reads += len(keys)
+
+    def _store(self, key: str, scanned: Tuple[Optional[FrozenSet[str]], FrozenSet[str]]) -> None:
+        names, links = scanned
+        self._listings[key] = names
+        if links:
+            self._links[key] = links
+
+    @staticmethod
+    def _scan(directory: str) -> Tuple[Optional[FrozenSet[str]], FrozenSet[str]]:
+        """(entry names, symlink names); names is None when the directory is unreadable."""
+        names, links = set(), set()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    names.add(entry.name)
+                    if entry.is_symlink():
+                        links.add(entry.name)
+        except FileNotFoundError:
+            return frozenset(), frozenset()
+        except OSError:
+            # Unreadable (permissions, not a directory): children must be probed directly
+            return None, frozenset()
+        return frozenset(names), frozenset(links)
+
+
+def stat_many(paths: List[str], workers: int = 1) -> List[Optional[os.stat_result]]:
+    """os.stat for every path (None when missing), with up to `workers` in flight."""
+    _record("stat", len(paths))
+    if workers > 1 and len(paths) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            return list(pool.map(_stat_or_none, paths))
+    return [_stat_or_none(path) for path in paths]
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def atomic_write(path: Path, text: str) -> bool:
+    """Writes text via a temp file + rename. Returns False if the directory is read-only."""
+    _record("write")
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+live_fs = LiveFs()
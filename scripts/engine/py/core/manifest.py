@@ -1,7 +1,8 @@
 import re
 import sys
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
+from core import fs
 from core.config import cfg
 
 class Manifest:
@@ -16,34 +17,58 @@ class Manifest:
     def to_pipe_string(self) -> str:
         return f"{self.id}|{self.name}|{self.desc}|{self.tags}|{self.type}|{self.path}"
 
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.__dict__)
+
+    @staticmethod
+    def from_dict(data: Dict[str, str]) -> "Manifest":
+        m = Manifest(data["id"], data["name"], data["desc"], data["tags"], data["type"], data["path"])
+        # Port extras (version, repo, branch) are attached dynamically
+        for key, value in data.items():
+            if not hasattr(m, key):
+                setattr(m, key, value)
+        return m
+
 class ManifestParser:
-    # Regex patterns for Registry (.sh files)
-    REGISTRY_PATTERNS = {
-        'id': re.compile(r'^[ \t]*ID="([^"]+)"', re.MULTILINE),
-        'name': re.compile(r'^[ \t]*NAME="([^"]+)"', re.MULTILINE),
-        'desc': re.compile(r'^[ \t]*DESC="([^"]+)"', re.MULTILINE),
-        'tags': re.compile(r'^[ \t]*TAGS="([^"]+)"', re.MULTILINE),
-        'type': re.compile(r'^[ \t]*TYPE="([^"]+)"', re.MULTILINE),
+    # Field patterns, compiled on first use so importing the engine stays cheap
+    # Registry (.sh files): ID="..."
+    REGISTRY_FIELDS = {
+        'id': r'^[ \t]*ID="([^"]+)"',
+        'name': r'^[ \t]*NAME="([^"]+)"',
+        'desc': r'^[ \t]*DESC="([^"]+)"',
+        'tags': r'^[ \t]*TAGS="([^"]+)"',
+        'type': r'^[ \t]*TYPE="([^"]+)"',
     }
 
-    # Regex patterns for Config (.conf files)
-    CONFIG_PATTERNS = {
-        'id': re.compile(r'^[ \t]*KOSAIO_TOOL_ID="([^"]+)"', re.MULTILINE),
-        'name': re.compile(r'^[ \t]*KOSAIO_TOOL_NAME="([^"]+)"', re.MULTILINE),
-        'desc': re.compile(r'^[ \t]*KOSAIO_TOOL_DESC="([^"]+)"', re.MULTILINE),
-        'tags': re.compile(r'^[ \t]*KOSAIO_TOOL_TAGS=\(([^)]*)\)', re.MULTILINE),
-        'type': re.compile(r'^[ \t]*KOSAIO_TOOL_TYPE=\(([^)]*)\)', re.MULTILINE),
+    # Config (.tool files): KOSAIO_TOOL_ID="..." / KOSAIO_TOOL_TAGS=(...)
+    CONFIG_FIELDS = {
+        'id': r'^[ \t]*KOSAIO_TOOL_ID="([^"]+)"',
+        'name': r'^[ \t]*KOSAIO_TOOL_NAME="([^"]+)"',
+        'desc': r'^[ \t]*KOSAIO_TOOL_DESC="([^"]+)"',
+        'tags': r'^[ \t]*KOSAIO_TOOL_TAGS=\(([^)]*)\)',
+        'type': r'^[ \t]*KOSAIO_TOOL_TYPE=\(([^)]*)\)',
     }
 
+    _compiled: Dict[str, Dict[str, "re.Pattern"]] = {}
+
+    @staticmethod
+    def _patterns(kind: str) -> Dict[str, "re.Pattern"]:
+        compiled = ManifestParser._compiled.get(kind)
+        if compiled is None:
+            fields = ManifestParser.REGISTRY_FIELDS if kind == "registry" else ManifestParser.CONFIG_FIELDS
+            compiled = {k: re.compile(v, re.MULTILINE) for k, v in fields.items()}
+            ManifestParser._compiled[kind] = compiled
+        return compiled
+
     @staticmethod
     def parse_config_file(path: Path) -> Optional[Manifest]:
         try:
-            content = path.read_text(encoding='utf-8', errors='ignore')
+            content = fs.read_text(path, errors='ignore')
         except Exception:
             return None
 
         data = {}
-        for key, p in ManifestParser.CONFIG_PATTERNS.items():
+        for key, p in ManifestParser._patterns("config").items():
             match = p.search(content)
             if match:
                 raw = match.group(1).strip()
@@ -69,12 +94,12 @@ class ManifestParser:
     @staticmethod
     def parse_registry_file(path: Path) -> Optional[Manifest]:
         try:
-            content = path.read_text(encoding='utf-8', errors='ignore')
+            content = fs.read_text(path, errors='ignore')
         except Exception:
             return None
 
         data = {}
-        for key, p in ManifestParser.REGISTRY_PATTERNS.items():
+        for key, p in ManifestParser._patterns("registry").items():
             match = p.search(content)
             data[key] = match.group(1) if match else ""
 
@@ -95,64 +120,98 @@ class ManifestParser:
             str(path)
         )
 
+    # Per-process cache of parsed port Makefiles: path -> (mtime_ns, size, vars)
+    _port_vars_cache: Dict[str, Tuple[int, int, Dict[str, str]]] = {}
+
     @staticmethod
-    def parse_port_makefile(path: Path) -> Optional[Manifest]:
+    def read_port_vars(path: Path) -> Optional[Dict[str, str]]:
+        """
+        Returns every top-level `NAME = value` assignment of a port Makefile.
+        The file is parsed in a single line-oriented pass and memoized by
+        path + mtime/size, so each Makefile is read at most once per process.
+        """
+        key = str(path)
         try:
-            content = path.read_text(encoding='utf-8', errors='ignore')
-            lib_name = path.parent.name
-
-            # Extract info
-            short_desc = "No description"
-            match_desc = re.search(r'^SHORT_DESC\s*=\s*(.*)$', content, re.MULTILINE)
-            if match_desc:
-                short_desc = match_desc.group(1).strip()
-            short_desc = short_desc.replace('|', ' ')
-
-            # Extract more technical fields for updates
-            version = "unknown"
-            match_ver = re.search(r'^PORTVERSION\s*=\s*(.*)$', content, re.MULTILINE)
-            if match_ver:
-                version = match_ver.group(1).strip()
-            
-            repo = ""
-            match_repo = re.search(r'^GIT_REPOSITORY\s*=\s*(.*)$', content, re.MULTILINE)
-            if match_repo:
-                repo = match_repo.group(1).strip()
-            
-            branch = ""
-            match_branch = re.search(r'^GIT_BRANCH\s*=\s*(.*)$', content, re.MULTILINE)
-            if match_branch:
-                branch = match_branch.group(1).strip()
-
-            m = Manifest(
-                lib_name,
-                lib_name,
-                short_desc,
-                "port,library",
-                "port",
-                str(path)
-            )
-            # Add extra fields (dynamically attached for now to avoid changing __init__ signature)
-            m.version = version
-            m.repo = repo
-            m.branch = branch
-
-            return m
-        except Exception:
+            st = fs.stat(key)
+        except OSError:
             return None
 
-    @staticmethod
-    def get_port_dependencies(lib_name: str) -> List[str]:
-        makefile = cfg.kos_ports_dir / lib_name / "Makefile"
-        if not makefile.exists():
-            return []
+        cached = ManifestParser._port_vars_cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
 
         try:
-            content = makefile.read_text(encoding='utf-8', errors='ignore')
-            match = re.search(r'^DEPENDENCIES\s*=\s*(.*)$', content, re.MULTILINE)
-            if match:
-                return match.group(1).split('#')[0].split()
-        except Exception:
-            pass
-        return []
+            content = fs.read_text(key, errors="ignore")
+        except OSError:
+            return None
+
+        variables = ManifestParser._parse_make_assignments(content)
+        ManifestParser._port_vars_cache[key] = (st.st_mtime_ns, st.st_size, variables)
+        return variables
 
+    @staticmethod
+    def _parse_make_assignments(content: str) -> Dict[str, str]:
+        variables: Dict[str, str] = {}
+        pending = ""
+        for raw in content.splitlines():
+            # Join backslash continuations into one logical line
+            if raw.endswith("\\"):
+                pending += raw[:-1] + " "
+                continue
+            line, pending = pending + raw, ""
+
+            # Only unindented assignments (recipes and conditionals are indented/keywords)
+            if not line or line[0] in " \t#":
+                continue
+            eq = line.find("=")
+            if eq <= 0:
+                continue
+
+            op = line[eq - 1]
+            name = line[:eq - 1] if op in ":?+" else line[:eq]
+            name = name.strip()
+            if not name or not name.replace("_", "").isalnum():
+                continue
+
+            value = line[eq + 1:].strip()
+            if op == "+" and name in variables:
+                variables[name] = f"{variables[name]} {value}".strip()
+            elif name not in variables:
+                # First assignment wins, matching the previous re.search() behaviour
+                variables[name] = value
+        return variables
+
+    @staticmethod
+    def parse_port_makefile(path: Path) -> Optional[Manifest]:
+        variables = ManifestParser.read_port_vars(path)
+        if variables is None:
+            return None
+
+        lib_name = path.parent.name
+        short_desc = variables.get("SHORT_DESC") or "No description"
+
+        m = Manifest(
+            lib_name,
+            lib_name,
+            short_desc.replace('|', ' '),
+            "port,library",
+            "port",
+            str(path)
+        )
+        # Add extra fields (dynamically attached for now to avoid changing __init__ signature)
+        m.version = variables.get("PORTVERSION") or "unknown"
+        m.repo = variables.get("GIT_REPOSITORY", "")
+        m.branch = variables.get("GIT_BRANCH", "")
+        m.deps = ManifestParser._split_deps(variables.get("DEPENDENCIES", ""))
+        return m
+
+    @staticmethod
+    def _split_deps(raw: str) -> List[str]:
+        return raw.split('#')[0].split()
+
+    @staticmethod
+    def get_port_dependencies(lib_name: str) -> List[str]:
+        variables = ManifestParser.read_port_vars(cfg.kos_ports_dir / lib_name / "Makefile")
+        if not variables:
+            return []
+        return ManifestParser._split_deps(variables.get("DEPENDENCIES", ""))
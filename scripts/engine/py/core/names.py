@@ -0,0 +1,206 @@
+"""
+names.py - Case-insensitive name index for registry tools, diagnostics and ports.
+
+Every "what is <name>" / "where is <name>" question (get_type,
+validate_target, get_manifest_path, get_tool_path, resolve_port_name,
+installed-version lookups) is answered from one in-memory table instead of
+walking the registry or listing kos-ports per call. The table is persisted
+in data/cache/names.json next to the catalog and trusted while the mtimes of
+the directories it was built from are unchanged (adding or removing a tool,
+diagnostic or port directory bumps its parent's mtime).
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core import fs
+from core.config import cfg
+
+# User-facing shorthands, applied before any lookup
+ALIASES = {
+    "sys": "system",
+    "kosaio": "self",
+}
+
+# Lookup order for identify(): first kind that knows the name wins
+KINDS = ("tool", "core", "port")
+
+
+def alias(name: str) -> str:
+    """Lowercased name with shorthands expanded (sys -> system, kosaio -> self)."""
+    name = name.lower()
+    return ALIASES.get(name, name)
+
+
+class NameIndex:
+    VERSION = 2
+    FILENAME = "names.json"
+
+    def __init__(self):
+        self._names: Optional[Dict[str, List[str]]] = None
+        # tool id -> manifest path, from the same registry walk
+        self._tool_paths: Dict[str, str] = {}
+        # kind -> (exact names, lowercase -> canonical)
+        self._maps: Dict[str, Tuple[set, Dict[str, str]]] = {}
+        # (roots, directory mtimes) the table was validated against
+        self._generation: tuple = ()
+
+    @property
+    def path(self) -> Path:
+        return cfg.cache_dir / NameIndex.FILENAME
+
+    # --- Public API ---
+
+    def lookup(self, kind: str, name: str) -> Optional[str]:
+        """Canonical spelling of name among `kind` entries, or None."""
+        self._ensure()
+        exact, lower = self._maps[kind]
+        if name in exact:
+            return name
+        return lower.get(name.lower())
+
+    def identify(self, name: str) -> Optional[Tuple[str, str]]:
+        """(kind, canonical name) for a user-supplied target, aliases applied."""
+        name = alias(name)
+        for kind in KINDS:
+            canonical = self.lookup(kind, name)
+            if canonical:
+                return kind, canonical
+        return None
+
+    def manifest_path(self, name: str) -> Optional[Path]:
+        """Manifest for a tool (*.tool) or core target (diagnostics/*.sh), aliases applied."""
+        found = self.identify(name)
+        if not found:
+            return None
+        kind, canonical = found
+        if kind == "tool":
+            return Path(self._tool_paths[canonical])
+        if kind == "core":
+            return cfg.diagnostics_dir / f"{canonical}.sh"
+        return None
+
+    def names(self, kind: str) -> List[str]:
+        self._ensure()
+        return list(self._names[kind])
+
+    def generation(self) -> tuple:
+        """Hashable stamp of the indexed directories; changes when a tool or port is added or removed."""
+        self._ensure()
+        return self._generation
+
+    def invalidate(self) -> None:
+        """Forget the in-memory table; the next lookup revalidates against disk."""
+        self._names = None
+        self._maps = {}
+
+    def rebuild(self) -> None:
+        self._set(self._build())
+
+    # --- Internal helpers ---
+
+    def _ensure(self) -> None:
+        if self._names is not None:
+            return
+        data = self._load()
+        if data is None:
+            from core.profiling import span
+            with span("name index"):
+                data = self._build()
+        self._set(data)
+
+    def _set(self, data: dict) -> None:
+        self._names = {kind: data[kind] for kind in KINDS}
+        self._tool_paths = data["tool_paths"]
+        self._generation = (tuple(data["roots"]), tuple(sorted(data["stamps"].items())))
+        self._maps = {}
+        for kind in KINDS:
+            lower: Dict[str, str] = {}
+            for name in sorted(data[kind]):
+                lower.setdefault(name.lower(), name)
+            self._maps[kind] = (set(data[kind]), lower)
+
+    def _load(self) -> Optional[dict]:
+        import json
+
+        try:
+            data = json.loads(fs.read_text(self.path))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != NameIndex.VERSION:
+            return None
+        if not NameIndex.is_current(data.get("roots"), data.get("stamps", {})):
+            return None
+        return data
+
+    def _build(self) -> dict:
+        import json
+        from core.fs import atomic_write
+
+        stamps: Dict[str, Optional[int]] = {}
+
+        # Registry: one walk, every *.tool file (tools/, nested groups, ...).
+        # Sorted so a duplicated id always resolves to the same manifest.
+        tool_paths: Dict[str, str] = {}
+        for dirpath, dirnames, filenames in fs.walk(cfg.registry_dir):
+            dirnames.sort()
+            stamps[dirpath] = NameIndex._mtime(dirpath)
+            for f in sorted(filenames):
+                if f.endswith(".tool"):
+                    tool_paths.setdefault(f[:-5], os.path.join(dirpath, f))
+        if not stamps:
+            stamps[str(cfg.registry_dir)] = None
+
+        diag_dir = str(cfg.diagnostics_dir)
+        stamps[diag_dir] = NameIndex._mtime(diag_dir)
+        core = [f[:-3] for f in NameIndex._listdir(diag_dir) if f.endswith(".sh")]
+
+        ports_dir = str(cfg.system_kos_ports_dir)
+        stamps[ports_dir] = NameIndex._mtime(ports_dir)
+        ports = [name for name in NameIndex._listdir(ports_dir)
+                 if not name.startswith(".") and fs.is_file(os.path.join(ports_dir, name, "Makefile"))]
+
+        data = {
+            "version": NameIndex.VERSION,
+            "roots": NameIndex._roots(),
+            "stamps": stamps,
+            "tool": sorted(tool_paths),
+            "tool_paths": tool_paths,
+            "core": sorted(core),
+            "port": sorted(ports),
+        }
+        atomic_write(self.path, json.dumps(data, separators=(",", ":")))
+        # Sorted id list for shell completion (core.completion)
+        from core.completion import format_targets, targets_path, write_words
+        entries = [(kind, name) for kind in KINDS for name in data[kind]]
+        atomic_write(targets_path(), format_targets(data["roots"], stamps, entries))
+        write_words("all", sorted({name for _, name in entries}, key=lambda n: (n.lower(), n)), stamps)
+        return data
+
+    @staticmethod
+    def is_current(roots: Optional[List[str]], stamps: Dict[str, Optional[int]]) -> bool:
+        """True when data built from these roots/directory mtimes is still valid."""
+        if roots != NameIndex._roots():
+            return False
+        return all(NameIndex._mtime(d) == mtime for d, mtime in stamps.items())
+
+    @staticmethod
+    def _roots() -> List[str]:
+        return [str(cfg.registry_dir), str(cfg.diagnostics_dir), str(cfg.system_kos_ports_dir)]
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[int]:
+        try:
+            return fs.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _listdir(path: str) -> List[str]:
+        try:
+            return fs.listdir(path)
+        except OSError:
+            return []
+
+
+names = NameIndex()
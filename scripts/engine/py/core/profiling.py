@@ -0,0 +1,145 @@
+"""
+profiling.py - Opt-in profiling for engine commands (--profile / KOSAIO_PROFILE=1).
+
+run_profiled() wraps one command in cProfile, writes the raw stats to
+data/logs/profiles/<command>-<timestamp>.prof (open with pstats or
+snakeviz) and prints the top functions plus per-phase wall-clock spans to
+stderr, so stdout stays parseable for the shell callers.
+
+Phases are marked in the code with `with span("ports scan"): ...`. Spans
+are exclusive: time spent in a nested span is charged to the inner phase
+only, so "rendering" does not double count the status evaluation that a
+streamed table pulls row by row. Outside a profiled run span() returns a
+shared no-op object and costs one attribute check.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from core.config import cfg
+
+# Functions listed in the stderr summary (KOSAIO_PROFILE_TOP overrides)
+DEFAULT_TOP = 25
+
+
+class _Recorder:
+    def __init__(self):
+        self.enabled = False
+        # phase -> [exclusive seconds, calls]
+        self.totals: Dict[str, List[float]] = {}
+        # open spans: [name, start, seconds spent in nested spans]
+        self.stack: List[list] = []
+
+    def reset(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.totals = {}
+        self.stack = []
+
+
+_recorder = _Recorder()
+
+
+class _Span:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        _recorder.stack.append([self.name, time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc):
+        name, start, nested = _recorder.stack.pop()
+        elapsed = time.perf_counter() - start
+        total = _recorder.totals.setdefault(name, [0.0, 0])
+        total[0] += elapsed - nested
+        total[1] += 1
+        if _recorder.stack:
+            _recorder.stack[-1][2] += elapsed
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """Context manager charging its wall-clock time to phase `name` (no-op unless profiling)."""
+    return _Span(name) if _recorder.enabled else _NO_SPAN
+
+
+def spans() -> Dict[str, List[float]]:
+    """phase -> [exclusive seconds, calls] for the current profiled run."""
+    return {name: list(total) for name, total in _recorder.totals.items()}
+
+
+def requested(flag: bool = False) -> bool:
+    return flag or os.environ.get("KOSAIO_PROFILE") == "1"
+
+
+def run_profiled(func: Callable[[], None], label: str, out=None) -> Optional[Path]:
+    """
+    Runs func under cProfile and reports to `out` (stderr by default).
+    SystemExit from the command propagates after the report is written.
+    Returns the .prof path (None if it could not be written).
+    """
+    import cProfile
+
+    out = out or sys.stderr
+    profiler = cProfile.Profile()
+    _recorder.reset(enabled=True)
+    start = time.perf_counter()
+    try:
+        profiler.runcall(func)
+    finally:
+        wall = time.perf_counter() - start
+        _recorder.enabled = False
+        path = _dump(profiler, label)
+        _report(profiler, wall, path, out)
+    return path
+
+
+def _dump(profiler, label: str) -> Optional[Path]:
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = cfg.log_dir / "profiles" / f"{label}-{stamp}-{os.getpid()}.prof"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+    except OSError:
+        return None
+    return path
+
+
+def _report(profiler, wall: float, path: Optional[Path], out) -> None:
+    import io
+    import pstats
+
+    try:
+        top = max(1, int(os.environ.get("KOSAIO_PROFILE_TOP", DEFAULT_TOP)))
+    except ValueError:
+        top = DEFAULT_TOP
+
+    buf = io.StringIO()
+    pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(top)
+    print(f"--- profile: {wall * 1000:.1f} ms wall ---", file=out)
+    print(buf.getvalue().strip("\n"), file=out)
+
+    print("--- phases (exclusive wall-clock) ---", file=out)
+    accounted = 0.0
+    for name, (seconds, calls) in sorted(_recorder.totals.items(), key=lambda kv: -kv[1][0]):
+        accounted += seconds
+        print(f"  {name:<20} {seconds * 1000:9.1f} ms  {calls:6d}x", file=out)
+    print(f"  {'(other)':<20} {max(0.0, wall - accounted) * 1000:9.1f} ms", file=out)
+    print(f"--- stats: {path if path else 'not written (log dir not writable)'} ---", file=out)
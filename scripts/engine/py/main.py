@@ -12,7 +12,7 @@ Bash scripts in the engine/ directory delegate to this module
 via CLI commands (e.g., `python3 main.py validate_target kos`).
 
 Usage:
-    python3 main.py <command> [args...]
+    python3 main.py [--profile] [--fs-stats] <command> [args...]
     
 Commands:
     search          - Search tools and ports
@@ -20,7 +20,21 @@ Commands:
     get_tool_path   - Get resolved path for a tool
     get_manifest_path - Get path to manifest file
     resolve_deps    - Resolve port dependencies
+    rdeps           - List ports that depend on a port
+    build_ports     - Build ports in parallel with a shared jobserver
     port_info       - Get port metadata
+    update_plan     - Decide what update-all has to do
+    remote_heads    - Check git-tracked ports against their remotes (concurrent)
+    cache           - Artifact cache: key/store/restore ports, stats, prune
+    mirror_path     - Bare git mirror used as a clone reference
+    mirror_sync     - Clone/fetch git mirrors concurrently
+    complete        - Prefix completion for targets (shell TAB)
+    rebuild_index   - Rebuild the on-disk catalog index
+    daemon          - Start/stop/query the resident engine (opt-in)
+    batch           - Run newline-delimited JSON requests from stdin
+
+When a daemon is running (`main.py daemon start`), commands are forwarded to
+it over a Unix socket; otherwise they run in this process.
 """
 import sys
 import os
@@ -31,60 +45,382 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-from core.config import cfg
-from core.manifest import ManifestParser
-from services.searcher import SearchService
-from services.resolver import DependencyResolver
-from services.ui import UI
-from services.status import StatusService
-from services.presenter import Presenter
-from services.ports import PortService
-from services.validator import ValidatorService
+# NOTE: services are imported inside each handler. Commands such as
+# get_tool_path and render_banner run on every shell start, so they must only
+# pay for the modules they actually use (see tests/test_startup.py).
 
 
 # --- Handlers ---
 
+def _apply_color(args):
+    """--no-color / NO_COLOR (https://no-color.org) for table output."""
+    from services.ui import UI
+    UI.set_color(not (getattr(args, "no_color", False) or os.environ.get("NO_COLOR")))
+
+def _valid_var(name: str) -> bool:
+    """Shell variable name check for --format shell --var."""
+    import re
+    return re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name) is not None
+
 def cmd_search(args):
-    results = SearchService.search_all(args.query)
-    Presenter.render_search_table(results, args.installed)
+    from services.searcher import SearchService
+    from services.presenter import Presenter
+    _apply_color(args)
+    # With --installed the limit applies after filtering
+    results = SearchService.search_all(args.query, None if args.installed else args.limit)
+    Presenter.render_search_table(results, args.installed, args.limit)
 
 def cmd_update_cache(args):
+    from services.searcher import SearchService
     results = SearchService.search_all("")
     for m in results:
         print(m.to_pipe_string())
 
+def cmd_rebuild_index(args):
+    """
+    Discards the catalog and name indexes and reparses every manifest and Makefile.
+    """
+    from core.catalog import catalog
+    from core.names import names
+
+    counts = catalog.rebuild()
+    names.rebuild()
+    print(f"Indexed {counts['tools']} tools and {counts['ports']} ports -> {catalog.path}")
+    sys.exit(0)
+
 def cmd_list_ports(args):
+    from services.presenter import Presenter
+    _apply_color(args)
     Presenter.render_ports_table()
 
 def cmd_get_type(args):
-    target_type = SearchService.identify_target(args.query)
-    if target_type:
-        print(target_type)
+    from core.names import names
+    found = names.identify(args.query)
+    if found:
+        print(found[0])
         sys.exit(0)
     sys.exit(1)
 
 def cmd_deps(args):
+    from services.resolver import DependencyResolver
     deps = DependencyResolver.resolve(args.query)
     print(" ".join(deps))
 
 def cmd_resolve_deps(args):
+    from services.ports import PortService
+
     # args.query is a list because nargs='+'
-    deps = PortService.resolve_bulk_dependencies(args.query)
+    deps, issues = PortService.resolve_bulk_dependencies(args.query)
+    for issue in issues:
+        prefix = "ERROR" if issue.kind == "cycle" else "WARNING"
+        print(f"{prefix}: {issue}", file=sys.stderr)
     print(" ".join(deps))
+    if any(issue.kind == "cycle" for issue in issues):
+        sys.exit(1)
+
+def cmd_rdeps(args):
+    """
+    Lists the ports that depend on a port (transitively by default),
+    in rebuild order.
+    """
+    from services.graph import PortGraph
+
+    print(" ".join(PortGraph.load().rdeps(args.query, transitive=not args.direct)))
+    sys.exit(0)
+
+def cmd_build_ports(args):
+    """
+    Builds ports in parallel (dependencies first) with a shared make jobserver.
+    Prints one 'STATUS PORT [detail]' line per port; exit 1 if any failed.
+    """
+    from services.builder import ParallelBuilder
+    from services.graph import PortGraph
+
+    graph = PortGraph.load()
+    if args.only:
+        # The executor still orders these by the dependency edges between them
+        ports = list(dict.fromkeys(graph.canonical(q) for q in args.ports))
+    else:
+        ports, issues = graph.resolve(args.ports)
+        for issue in issues:
+            print(f"{'ERROR' if issue.kind == 'cycle' else 'WARNING'}: {issue}", file=sys.stderr)
+        if any(issue.kind == "cycle" for issue in issues):
+            sys.exit(1)
+
+    def progress(port, event):
+        if event == "start":
+            print(f"START {port}", file=sys.stderr, flush=True)
+
+    cache = distfiles = None
+    if "install" in args.targets.split():
+        from services.artifacts import ArtifactCache
+        from services.distfiles import DistStore
+        cache = ArtifactCache.default()
+        # Downloads the other kos-ports tree already fetched: no fetch step
+        distfiles = DistStore.default()
+        distfiles.link(ports)
+    builder = ParallelBuilder(graph, ports, jobs=args.jobs, make_targets=args.targets.split(), on_event=progress,
+                              cache=cache if cache and cache.enabled else None)
+    results = builder.run()
+    built = [r.port for r in results if r.status == "ok" and not r.cached]
+    if cache is not None:
+        # Same as a serial install: keep the new outputs for the next install with this fingerprint
+        for port in built:
+            cache.store(port)
+    if distfiles is not None:
+        distfiles.add(built)
+    failed = False
+    for r in results:
+        if r.cached:
+            print(f"OK {r.port} cached")
+        elif r.status == "ok":
+            print(f"OK {r.port} {r.duration:.1f}s")
+        elif r.status == "failed":
+            failed = True
+            print(f"FAILED {r.port} exit={r.exit_code} log={r.log_path}")
+        else:
+            print(f"SKIPPED {r.port} blocked_by={r.blocked_by}")
+    sys.exit(1 if failed else 0)
+
+def cmd_update_plan(args):
+    """
+    Classifies installed tools/ports for update-all in one pass.
+    Prints 'STATE KIND ID [detail]' lines (BUMP, CHECK, BROKEN; OK with --all),
+    tools first, ports in dependency order.
+    """
+    from services.updates import UpdatePlanner
+
+    kinds = ("tool", "port") if args.kind == "all" else (args.kind.rstrip("s"),)
+    for item in UpdatePlanner.plan(kinds, remote=args.remote):
+        if item.state == "ok" and not args.all:
+            continue
+        print(" ".join(filter(None, (item.state.upper(), item.kind, item.id, item.detail))))
+    sys.exit(0)
+
+def cmd_remote_heads(args):
+    """
+    Remote head of every git-tracked port (installed ports when none given),
+    checked concurrently and cached for --ttl seconds.
+    Text: 'STATE PORT REMOTE LOCAL' lines (CURRENT, BEHIND, UNKNOWN; '-' for
+    an empty hash). Shell: `declare -A <var>=([PORT]=remote-hash)`.
+    """
+    from services.remotes import RemoteChecker
+    from services.updates import UpdatePlanner
+
+    if args.format == "shell" and not _valid_var(args.var):
+        print(f"Invalid variable name: {args.var}", file=sys.stderr)
+        sys.exit(2)
+
+    ports = args.ports or UpdatePlanner.installed_ports()
+    results = RemoteChecker.check(ports, jobs=args.jobs, timeout=args.timeout,
+                                  ttl=0 if args.refresh else args.ttl)
+    if args.format == "shell":
+        from shlex import quote
+        items = " ".join(f"[{quote(r.port)}]={quote(r.remote)}" for r in results)
+        print(f"declare -A {args.var}=({items})")
+    else:
+        for r in results:
+            print(f"{r.state.upper()} {r.port} {r.remote or '-'} {r.local or '-'}")
+    sys.exit(0)
+
+def cmd_cache(args):
+    """
+    Content-addressed cache of built ports (services/artifacts.py).
+      key <port>...      'PORT KEY' ('-' when the port cannot be cached)
+      store <port>...    'STORED PORT KEY' / 'SKIPPED PORT' after an install
+      restore <port>...  'RESTORED PORT KEY' / 'MISS PORT'; exit 1 on any miss
+      stats              location, size, limit, hit/miss counters
+      prune              LRU eviction down to --max-mb (default: the size bound)
+    """
+    from services.artifacts import ArtifactCache
+
+    cache = ArtifactCache.default()
+    if args.action in ("key", "store", "restore") and not args.ports:
+        print(f"cache {args.action}: at least one port is required", file=sys.stderr)
+        sys.exit(2)
+
+    if args.action == "key":
+        for port in args.ports:
+            print(f"{port} {cache.key(port) or '-'}")
+    elif args.action == "store":
+        for port in args.ports:
+            key = cache.store(port)
+            print(f"STORED {port} {key}" if key else f"SKIPPED {port}")
+    elif args.action == "restore":
+        missed = 0
+        for port in args.ports:
+            key = cache.restore(port)
+            missed += key is None
+            print(f"RESTORED {port} {key}" if key else f"MISS {port}")
+        sys.exit(1 if missed else 0)
+    elif args.action == "stats":
+        stats = cache.stats()
+        print(f"Local:    {stats['local']}")
+        print(f"Remote:   {stats['remote']}")
+        print(f"Entries:  {stats['entries']}")
+        print(f"Size:     {stats['bytes'] / 1048576:.1f} MB of {stats['max_bytes'] / 1048576:.0f} MB")
+        print(f"Restores: {stats['hits']} hits, {stats['misses']} misses")
+    elif args.action == "prune":
+        limit = None if args.max_mb is None else args.max_mb << 20
+        removed = cache.prune(limit)
+        print(f"Removed {len(removed)} archive(s); {cache.stats()['bytes'] / 1048576:.1f} MB left")
+    sys.exit(0)
+
+def cmd_distfiles(args):
+    """
+    Shared kos-ports download store (services/distfiles.py).
+      add [port]...   hash dist files of both trees, hardlink duplicates
+      link [port]...  'LINKED|PRESENT|MISSING PORT FILE' into the active tree
+      gc              deduplicate, drop unreferenced objects, report bytes
+      stats           store location, objects, size
+    """
+    from services.distfiles import DistStore
+
+    store = DistStore.default()
+    if args.action == "add":
+        stats = store.add(args.ports or None)
+        print(f"Hashed {stats['files']} file(s): {stats['new']} new, {stats['linked']} linked, "
+              f"{stats['bytes_saved'] / 1048576:.1f} MB saved")
+    elif args.action == "link":
+        for port, name, state in store.link(args.ports or None):
+            print(f"{state.upper()} {port} {name}")
+    elif args.action == "gc":
+        stats = store.gc(dry_run=args.dry_run)
+        verb = "Would reclaim" if args.dry_run else "Reclaimed"
+        print(f"{verb} {stats['bytes_reclaimed'] / 1048576:.1f} MB ({stats['bytes_reclaimed']} bytes): "
+              f"{stats['linked']} duplicate(s) linked, {stats['removed']} unreferenced object(s) removed")
+    elif args.action == "stats":
+        stats = store.stats()
+        print(f"Store:    {stats['root']}")
+        print(f"Objects:  {stats['objects']} ({stats['bytes'] / 1048576:.1f} MB)")
+        print(f"Indexed:  {stats['indexed']} dist file name(s)")
+    sys.exit(0)
+
+def cmd_mirror_path(args):
+    """
+    Directory of the bare mirror for a repository URL (services/mirrors.py).
+    With --ensure a missing mirror is cloned first. Exit 1 when there is none.
+    """
+    from services.mirrors import MirrorSet
+
+    mirrors = MirrorSet.default()
+    if args.ensure:
+        path = mirrors.ensure(args.url, timeout=args.timeout)
+    elif mirrors.enabled and (mirrors.path(args.url) / "HEAD").exists():
+        path = mirrors.path(args.url)
+    else:
+        path = None
+    if path is None:
+        sys.exit(1)
+    print(path)
+    sys.exit(0)
+
+def cmd_mirror_sync(args):
+    """
+    Clones/fetches mirrors concurrently (default: every existing mirror;
+    --tools: every registry tool repository). Prints 'CLONED|FETCHED|FAILED
+    URL [reason]' lines; exit 1 if any failed.
+    """
+    from services.mirrors import MirrorSet
+
+    mirrors = MirrorSet.default()
+    urls = args.urls or (MirrorSet.tool_repos() if args.tools else mirrors.urls())
+    results = mirrors.sync(urls, jobs=args.jobs, timeout=args.timeout)
+    for r in results:
+        print(" ".join(filter(None, (r.state.upper(), r.url, r.detail))))
+    sys.exit(1 if any(r.state == "failed" for r in results) else 0)
+
+def cmd_history(args):
+    """
+    Build duration history (services/history.py): 'ID BUILDS LAST EST' per
+    target, in seconds ('-' when unknown).
+    """
+    from services.history import BuildHistory
+
+    builds = BuildHistory.builds()
+    estimates = BuildHistory.estimates()
+    for item_id in args.ids or sorted(builds):
+        runs = builds.get(item_id, [])
+        last = f"{runs[-1][0]:.1f}" if runs else "-"
+        est = f"{estimates[item_id]:.1f}" if item_id in estimates else "-"
+        print(f"{item_id} {len(runs)} {last} {est}")
+    sys.exit(0)
+
+def cmd_history_run(args):
+    """
+    Runs a build command in the foreground and records its wall/CPU time,
+    peak RSS and exit status under ID. Exits with the command's code.
+    """
+    from services.history import run_recorded
+
+    argv = args.argv[1:] if args.argv[:1] == ["--"] else args.argv
+    if not argv:
+        print("history_run: a command is required after the id", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(run_recorded(args.id, args.kind, argv))
+
+def cmd_build_plan(args):
+    """
+    Estimated build time for ids (default: what update-all would touch).
+    Prints 'ITEM ID KIND EST SOURCE' in start order (highest critical-path
+    priority first), then 'CRITICAL TOTAL ID...' and
+    'ESTIMATE serial=S parallel=P jobs=N known=K/T' (seconds).
+    """
+    from core.catalog import catalog
+    from services.buildplan import BuildPlan
+
+    if args.ids:
+        tools = {m.id for m in catalog.tools()}
+        items = [(i, "tool" if i in tools else "port") for i in args.ids]
+    else:
+        from services.updates import UpdatePlanner
+        items = [(i.id, i.kind) for i in UpdatePlanner.plan() if i.state != "ok"]
+
+    plan = BuildPlan.build(items)
+    for entry in sorted(plan.entries, key=lambda e: -plan.levels[e.id]):
+        print(f"ITEM {entry.id} {entry.kind} {entry.est:.1f} {entry.source}")
+    path = plan.critical_path()
+    print(f"CRITICAL {sum(plan.cost[i] for i in path):.1f} {' '.join(path)}".rstrip())
+    known = sum(e.source == "history" for e in plan.entries)
+    print(f"ESTIMATE serial={plan.serial():.1f} parallel={plan.makespan(args.jobs):.1f} "
+          f"jobs={args.jobs} known={known}/{len(plan.entries)}")
+    sys.exit(0)
 
 def cmd_port_info(args):
-    makefile = cfg.kos_ports_dir / args.query / "Makefile"
-    if makefile.exists():
-        m = ManifestParser.parse_port_makefile(makefile)
-        if m:
-            print(f"PORTNAME={m.id}")
-            print(f"SHORT_DESC={m.desc}")
-            print(f"PORTVERSION={getattr(m, 'version', 'unknown')}")
-            print(f"GIT_REPOSITORY={getattr(m, 'repo', '')}")
-            print(f"GIT_BRANCH={getattr(m, 'branch', '')}")
-            print(f"DEPENDENCIES={' '.join(ManifestParser.get_port_dependencies(args.query))}")
-            sys.exit(0)
-    sys.exit(1)
+    """
+    Port metadata plus installed versions/hashes for one or more ports.
+    Formats: text (KEY=VALUE lines, blank line between ports), json (list of
+    objects with "query" and "found"), nul (KEY=VALUE fields, each followed by
+    NUL; an empty field ends a record) and shell (for eval: `declare -A` keyed
+    "<PORTNAME>,<KEY>", plus <var>_NAMES mapping each found query to its
+    PORTNAME). Exit code 1 if any port was not found.
+    """
+    from services.ports import PortService
+
+    records = PortService.port_info_bulk(args.query)
+    found = [r for r in records if r is not None]
+
+    if args.format == "json":
+        import json
+        print(json.dumps([dict(query=q, found=r is not None, **(r or {})) for q, r in zip(args.query, records)],
+                         indent=2))
+    elif args.format == "nul":
+        for query, record in zip(args.query, records):
+            fields = [f"QUERY={query}", f"FOUND={int(record is not None)}"]
+            fields += [f"{k}={v}" for k, v in (record or {}).items()]
+            sys.stdout.write("".join(f + "\0" for f in fields) + "\0")
+    elif args.format == "shell":
+        from shlex import quote
+        if not _valid_var(args.var):
+            print(f"Invalid variable name: {args.var}", file=sys.stderr)
+            sys.exit(2)
+        items = " ".join(f"[{quote(r['PORTNAME'] + ',' + k)}]={quote(v)}" for r in found for k, v in r.items())
+        names = " ".join(f"[{quote(q)}]={quote(r['PORTNAME'])}" for q, r in zip(args.query, records) if r)
+        print(f"declare -A {args.var}=({items})")
+        print(f"declare -A {args.var}_NAMES=({names})")
+    elif found:
+        print("\n\n".join("\n".join(f"{k}={v}" for k, v in r.items()) for r in found))
+    sys.exit(0 if len(found) == len(records) else 1)
 
 def cmd_validate_target(args):
     """
@@ -93,6 +429,8 @@ def cmd_validate_target(args):
     Errors: printed to stderr
     Exit codes: 0=valid, 1=not found, 3=dependency missing
     """
+    from services.validator import ValidatorService
+
     result = ValidatorService.validate_target(args.target, args.action)
 
     if result.error:
@@ -108,6 +446,8 @@ def cmd_get_tool_path(args):
     Get the resolved path for a tool.
     This is the single source of truth for path resolution.
     """
+    from services.validator import ValidatorService
+
     path = ValidatorService.get_tool_path(args.tool, args.mode)
     print(path)
     sys.exit(0)
@@ -117,7 +457,9 @@ def cmd_get_manifest_path(args):
     Get the path to a manifest file for a tool.
     Returns the absolute path or exits with code 1 if not found.
     """
-    path = SearchService.get_manifest_path(args.target)
+    from core.names import names
+
+    path = names.manifest_path(args.target)
     if path:
         print(path)
         sys.exit(0)
@@ -130,6 +472,8 @@ def cmd_resolve_port_name(args):
     """
     Resolve a fuzzy/case-insensitive port name to its canonical name.
     """
+    from services.ports import PortService
+
     resolved = PortService.resolve_port_name(args.name)
     if resolved:
         print(resolved)
@@ -142,19 +486,40 @@ def cmd_get_installed_ids(args):
     """
     Returns a space-separated list of all installed target IDs.
     """
+    from services.searcher import SearchService
+    from services.status import StatusService
+
     results = SearchService.search_all("")
     installed_ids = []
-    for m in results:
-        status = StatusService.get_status_data(m.id, m.type)
+    statuses = StatusService.get_status_bulk((m.id, m.type) for m in results)
+    for m, status in zip(results, statuses):
         if status["c_inst"] == "o" or status["h_inst"] == "o":
             installed_ids.append(m.id)
     print(" ".join(installed_ids))
     sys.exit(0)
 
+def cmd_complete(args):
+    """
+    Prints target ids starting with a prefix, one per line (shell TAB completion).
+    --action picks the kind for that action (e.g. uninstall -> installed targets).
+    --write-words refreshes the word list completions.sh reads instead of printing.
+    """
+    from core.completion import complete, kind_for_action, refresh_words
+
+    kind = args.kind or kind_for_action(args.action)
+    if args.write_words:
+        refresh_words(kind)
+        sys.exit(0)
+    for name in complete(args.prefix, kind):
+        print(name)
+    sys.exit(0)
+
 def cmd_render_banner(args):
     """
     Renders the HUD banner with perfect alignment.
     """
+    from services.presenter import Presenter
+
     Presenter.render_banner(args.branch, args.commit, args.date)
     sys.exit(0)
 
@@ -162,29 +527,177 @@ def cmd_render_alert(args):
     """
     Renders a visually striking box (Alert/Info/Success).
     """
+    from services.ui import UI
+
     # Fallback to 'alert' if no type provided (legacy compat)
     box_type = getattr(args, "type", "alert") 
     print(UI.render_box(args.title, args.lines, type=box_type))
     sys.exit(0)
 
+def cmd_daemon(args):
+    """
+    Manages the resident engine process (see core/daemon.py).
+    """
+    from core import daemon
+
+    if args.action == "serve":
+        daemon.EngineDaemon(run_captured, idle_timeout=args.idle_timeout).serve_forever()
+        sys.exit(0)
+
+    if args.action == "start":
+        info = daemon.start(idle_timeout=args.idle_timeout)
+        if not info:
+            print("Engine daemon failed to start", file=sys.stderr)
+            sys.exit(1)
+    elif args.action == "stop":
+        if not daemon.stop():
+            print("Engine daemon is not running", file=sys.stderr)
+            sys.exit(1)
+        print("Engine daemon stopped")
+        sys.exit(0)
+    else:
+        info = daemon.status()
+        if not info:
+            print("Engine daemon is not running")
+            sys.exit(1)
+
+    for key, value in info.items():
+        print(f"{key.upper()}={value}")
+    sys.exit(0)
+
+def cmd_batch(args):
+    """
+    Runs many commands in one process. Reads one JSON request per line from
+    stdin and writes one JSON response per line to stdout (flushed per line).
+
+    Request:  {"cmd": "validate_target", "target": "libpng", "id": 7}
+              {"argv": ["port_info", "libpng"]}
+    Response: {"id": 7, "code": 0, "stdout": "port\n", "stderr": ""}
+
+    Parsed manifests and resolved paths stay cached across requests.
+    LOCAL_COMMANDS are refused (code 2): only sys.stdout is captured, so
+    their child processes would write into the response stream.
+    """
+    import json
+
+    parser = build_parser()
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        req = {}
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("request must be a JSON object")
+            if "argv" in req:
+                argv = [str(a) for a in req["argv"]]
+            else:
+                argv = request_to_argv(parser, req)
+            if argv and argv[0] in LOCAL_COMMANDS:
+                raise ValueError(f"'{argv[0]}' cannot run inside a batch")
+            code, out, err = run_captured(argv, parser)
+            resp = {"code": code, "stdout": out, "stderr": err}
+        except (ValueError, KeyError, TypeError) as e:
+            req = req if isinstance(req, dict) else {}
+            resp = {"code": 2, "stdout": "", "stderr": f"Invalid batch request: {e}\n"}
+        if "id" in req:
+            resp["id"] = req["id"]
+        sys.stdout.write(json.dumps(resp) + "\n")
+        sys.stdout.flush()
+    sys.exit(0)
+
 # --- Main Dispatch ---
 
-def main():
+# Commands that must never be forwarded to the daemon or nested in a batch:
+# anything that spawns subprocesses (builds run children in the caller's
+# cwd/terminal, git calls can outlast a daemon request), and cache/distfiles,
+# which probe the toolchain and hash whole trees
+LOCAL_COMMANDS = {"daemon", "batch", "build_ports", "history_run", "cache", "distfiles",
+                  "remote_heads", "update_plan", "mirror_path", "mirror_sync"}
+
+def request_to_argv(parser, req):
+    """
+    Converts a keyed batch request into argv using the subcommand's own
+    argument definitions (positionals first, then flags).
+    """
+    cmd = req["cmd"]
+    sub = None
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            sub = action.choices.get(cmd)
+    if sub is None:
+        raise ValueError(f"unknown command '{cmd}'")
+
+    positionals, flags = [], []
+    for action in sub._actions:
+        if action.dest == "help" or action.dest not in req:
+            continue
+        value = req[action.dest]
+        if not action.option_strings:
+            values = value if isinstance(value, list) else [value]
+            positionals.extend(str(v) for v in values)
+        elif action.nargs == 0:
+            if value:
+                flags.append(action.option_strings[0])
+        elif value is not None:
+            flags.extend([action.option_strings[0], str(value)])
+    return [cmd] + positionals + flags
+
+def run_captured(argv, parser=None):
+    """
+    Runs one engine command in-process, capturing its output.
+    Returns (exit_code, stdout, stderr).
+    """
+    import io
+    import traceback
+    from contextlib import redirect_stdout, redirect_stderr
+
+    # Daemon and batch requests share this process: --no-color lasts one command
+    ui = sys.modules.get("services.ui")
+    if ui is not None:
+        ui.UI.set_color(True)
+
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            args = (parser or build_parser()).parse_args(argv)
+            args.func(args)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return code, out.getvalue(), err.getvalue()
+
+def build_parser():
     parser = argparse.ArgumentParser(description="KOSAIO Engine")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the command (also KOSAIO_PROFILE=1); report on stderr, stats in data/logs/profiles")
+    parser.add_argument("--fs-stats", action="store_true",
+                        help="Count filesystem operations by kind and caller (also KOSAIO_FS_STATS=1); report on stderr")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Search Command
     p_search = subparsers.add_parser("search")
     p_search.add_argument("query", nargs="?", default="")
     p_search.add_argument("--installed", "-i", action="store_true")
+    p_search.add_argument("--limit", "-n", type=int, default=None, help="Show only the best N matches")
+    p_search.add_argument("--no-color", action="store_true", help="Plain output for pipes and logs")
     p_search.set_defaults(func=cmd_search)
 
     # Update Cache Command
     p_cache = subparsers.add_parser("update_cache")
     p_cache.set_defaults(func=cmd_update_cache)
 
+    # Rebuild Index Command
+    p_index = subparsers.add_parser("rebuild_index")
+    p_index.set_defaults(func=cmd_rebuild_index)
+
     # List Ports Command
     p_list = subparsers.add_parser("list_ports")
+    p_list.add_argument("--no-color", action="store_true", help="Plain output for pipes and logs")
     p_list.set_defaults(func=cmd_list_ports)
 
     # Get Type Command
@@ -202,9 +715,88 @@ def main():
     p_resolve.add_argument("query", nargs="+")
     p_resolve.set_defaults(func=cmd_resolve_deps)
 
+    # Reverse Deps Command
+    p_rdeps = subparsers.add_parser("rdeps")
+    p_rdeps.add_argument("query")
+    p_rdeps.add_argument("--direct", action="store_true", help="Only ports that list it in DEPENDENCIES")
+    p_rdeps.set_defaults(func=cmd_rdeps)
+
+    # Build Ports Command (parallel executor)
+    p_build = subparsers.add_parser("build_ports")
+    p_build.add_argument("ports", nargs="+")
+    p_build.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Total make jobs across all ports")
+    p_build.add_argument("--targets", default="install", help="Make targets to run per port (space separated)")
+    p_build.add_argument("--only", action="store_true", help="Build exactly these ports (skip dependency resolution)")
+    p_build.set_defaults(func=cmd_build_ports)
+
+    # Update Plan Command (update-all)
+    p_plan = subparsers.add_parser("update_plan")
+    p_plan.add_argument("--kind", "-k", choices=["all", "tools", "ports"], default="all")
+    p_plan.add_argument("--all", action="store_true", help="Also list up-to-date items (OK)")
+    p_plan.add_argument("--remote", action="store_true", help="Settle git-tracked ports with ls-remote")
+    p_plan.set_defaults(func=cmd_update_plan)
+
+    # Remote Heads Command (git-tracked ports)
+    p_remote = subparsers.add_parser("remote_heads")
+    p_remote.add_argument("ports", nargs="*", help="Ports to check (default: installed)")
+    p_remote.add_argument("--jobs", "-j", type=int, default=8, help="Concurrent ls-remote calls")
+    p_remote.add_argument("--timeout", type=float, default=20.0, help="Seconds per ls-remote call")
+    p_remote.add_argument("--ttl", type=int, default=None, help="Cache lifetime in seconds (default: KOSAIO_REMOTE_TTL or 300)")
+    p_remote.add_argument("--refresh", action="store_true", help="Ignore cached heads")
+    p_remote.add_argument("--format", "-f", choices=["text", "shell"], default="text")
+    p_remote.add_argument("--var", default="PORT_REMOTE", help="Array name for --format shell")
+    p_remote.set_defaults(func=cmd_remote_heads)
+
+    # Artifact Cache Command
+    p_cache = subparsers.add_parser("cache")
+    p_cache.add_argument("action", choices=["key", "store", "restore", "stats", "prune"])
+    p_cache.add_argument("ports", nargs="*")
+    p_cache.add_argument("--max-mb", type=int, default=None, help="prune: size to shrink the local cache to")
+    p_cache.set_defaults(func=cmd_cache)
+
+    # Distfile Store Command
+    p_dist = subparsers.add_parser("distfiles")
+    p_dist.add_argument("action", choices=["add", "link", "gc", "stats"])
+    p_dist.add_argument("ports", nargs="*")
+    p_dist.add_argument("--dry-run", "-n", action="store_true", help="gc: only report")
+    p_dist.set_defaults(func=cmd_distfiles)
+
+    # Git Mirror Commands
+    p_mpath = subparsers.add_parser("mirror_path")
+    p_mpath.add_argument("url")
+    p_mpath.add_argument("--ensure", action="store_true", help="Clone the mirror if missing")
+    p_mpath.add_argument("--timeout", type=float, default=1800.0, help="Seconds for the clone")
+    p_mpath.set_defaults(func=cmd_mirror_path)
+
+    p_msync = subparsers.add_parser("mirror_sync")
+    p_msync.add_argument("urls", nargs="*", help="Repositories (default: every existing mirror)")
+    p_msync.add_argument("--tools", action="store_true", help="Mirror every registry tool repository")
+    p_msync.add_argument("--jobs", "-j", type=int, default=4, help="Concurrent git processes")
+    p_msync.add_argument("--timeout", type=float, default=1800.0, help="Seconds per clone/fetch")
+    p_msync.set_defaults(func=cmd_mirror_sync)
+
+    # Build History Command
+    p_history = subparsers.add_parser("history")
+    p_history.add_argument("ids", nargs="*")
+    p_history.set_defaults(func=cmd_history)
+
+    p_history_run = subparsers.add_parser("history_run")
+    p_history_run.add_argument("--kind", "-k", choices=["port", "tool"], default="tool")
+    p_history_run.add_argument("id")
+    p_history_run.add_argument("argv", nargs=argparse.REMAINDER, help="-- command to execute")
+    p_history_run.set_defaults(func=cmd_history_run)
+
+    # Build Plan Command
+    p_bplan = subparsers.add_parser("build_plan")
+    p_bplan.add_argument("ids", nargs="*", help="Tools/ports to plan (default: update-all work)")
+    p_bplan.add_argument("--jobs", "-j", type=int, default=1, help="Builds running at once")
+    p_bplan.set_defaults(func=cmd_build_plan)
+
     # Port Info Command
     p_info = subparsers.add_parser("port_info")
-    p_info.add_argument("query")
+    p_info.add_argument("query", nargs="+")
+    p_info.add_argument("--format", "-f", choices=["text", "json", "nul", "shell"], default="text")
+    p_info.add_argument("--var", default="PORT_INFO", help="Array name for --format shell")
     p_info.set_defaults(func=cmd_port_info)
 
     # Validate Target Command (NEW - Single Source of Truth)
@@ -234,6 +826,14 @@ def main():
     p_inst_ids = subparsers.add_parser("get_installed_ids")
     p_inst_ids.set_defaults(func=cmd_get_installed_ids)
 
+    # Complete Command (shell TAB completion)
+    p_complete = subparsers.add_parser("complete")
+    p_complete.add_argument("prefix", nargs="?", default="")
+    p_complete.add_argument("--kind", "-k", choices=["all", "tools", "ports", "installed"], default=None)
+    p_complete.add_argument("--action", "-a", default=None, help="Action being completed (uninstall/update -> installed)")
+    p_complete.add_argument("--write-words", action="store_true", help="Rewrite data/cache/completion/<kind> for the shell")
+    p_complete.set_defaults(func=cmd_complete)
+
     # Render Banner Command (NEW)
     p_banner = subparsers.add_parser("render_banner")
     p_banner.add_argument("branch")
@@ -248,13 +848,60 @@ def main():
     p_alert.add_argument("--type", "-t", default="alert", help="Box type: alert, info, success, default")
     p_alert.set_defaults(func=cmd_render_alert)
 
-    # Parse args
+    # Batch Command
+    p_batch = subparsers.add_parser("batch")
+    p_batch.set_defaults(func=cmd_batch)
+
+    # Daemon Command
+    p_daemon = subparsers.add_parser("daemon")
+    p_daemon.add_argument("action", choices=["start", "stop", "status", "serve"])
+    p_daemon.add_argument("--idle-timeout", type=int, default=900, help="Seconds without requests before exiting (0 = never)")
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    return parser
+
+def main():
     if len(sys.argv) == 1:
-        parser.print_help(sys.stderr)
+        build_parser().print_help(sys.stderr)
         sys.exit(1)
 
-    args = parser.parse_args()
-    args.func(args)
+    # Global flags come before the command
+    leading = set()
+    for arg in sys.argv[1:]:
+        if not arg.startswith("-"):
+            break
+        leading.add(arg)
+    profile = "--profile" in leading or "KOSAIO_PROFILE" in os.environ
+    if profile:
+        from core.profiling import requested
+        profile = requested("--profile" in leading)
+    fs_stats = "--fs-stats" in leading or os.environ.get("KOSAIO_FS_STATS") == "1"
+
+    # Prefer a running daemon (warm caches); fall back to in-process execution.
+    # Instrumented runs always stay in-process so they see the real work.
+    if not (profile or fs_stats) and sys.argv[1] not in LOCAL_COMMANDS \
+            and os.environ.get("KOSAIO_NO_DAEMON") != "1":
+        from core.daemon import forward
+        code = forward(sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+
+    args = build_parser().parse_args()
+    run = lambda: args.func(args)
+    if profile:
+        from core.profiling import run_profiled
+        command, run = run, lambda: run_profiled(command, args.command)
+    if not fs_stats:
+        run()
+        return
+
+    from core import fs
+    stats = fs.start_accounting()
+    try:
+        run()
+    finally:
+        fs.stop_accounting()
+        print(stats.report(args.command), file=sys.stderr)
 
 if __name__ == "__main__":
     main()
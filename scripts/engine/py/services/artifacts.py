@@ -0,0 +1,425 @@
+"""
+artifacts.py - Content-addressed cache of installed kos-ports outputs.
+
+A port build is keyed by a fingerprint of everything that can change its
+output: the recipe directory (Makefile, patches, files/), registry/cfg and
+data/cfg overrides for the port and for KOS, the toolchain identity
+(`sh-elf-gcc --version`, KOS commit), KOS_CFLAGS, the upstream commit for
+git-tracked ports and, recursively, the fingerprints of its dependencies.
+
+After a successful install the files listed in the port's .kos-manifest
+plus its lib/.kos-ports markers are packed into <key>.tar.gz (paths stored
+relative to KOS_BASE / KOS_PORTS, so container and host trees share
+entries). A later install with the same key unpacks the archive and writes
+the manifest and markers instead of compiling.
+
+Backends:
+    DirectoryBackend  <dir>/<key[:2]>/<key>.tar.gz, LRU by mtime, size-bounded
+                      (also works as a directory shared between CI nodes)
+    HttpBackend       GET/PUT <url>/<key>.tar.gz on any server that accepts PUT
+
+KOSAIO_ARTIFACT_CACHE    local directory (default data/cache/artifacts, "off" disables)
+KOSAIO_ARTIFACT_REMOTE   optional second tier: directory or http(s):// URL
+KOSAIO_ARTIFACT_CACHE_MB local size bound (default 2048)
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core import fs
+from core.config import cfg
+
+# Bump when the fingerprint inputs or the archive layout change
+FORMAT = "1"
+DEFAULT_MAX_MB = 2048
+# Recipe subdirectories produced by builds, never part of the fingerprint
+BUILD_DIRS = {"dist", "build", "inst"}
+
+
+class DirectoryBackend:
+    """Archives under a local (or shared) directory; last use is the file mtime."""
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def describe(self) -> str:
+        return str(self.root)
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.tar.gz"
+
+    def get(self, key: str, dest: Path) -> bool:
+        src = self.path(key)
+        try:
+            shutil.copyfile(src, dest)
+            os.utime(src)
+        except OSError:
+            return False
+        return True
+
+    def put(self, key: str, src: Path) -> bool:
+        target = self.path(key)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, target)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return False
+        return True
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """(key, size in bytes, last use) for every stored archive."""
+        found = []
+        for path in fs.glob(self.root, "*/*.tar.gz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            found.append((path.name[:-len(".tar.gz")], st.st_size, st.st_mtime))
+        return found
+
+    def delete(self, key: str) -> None:
+        try:
+            self.path(key).unlink()
+        except OSError:
+            pass
+
+
+class HttpBackend:
+    """Remote tier over plain HTTP (GET to fetch, PUT to publish)."""
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def describe(self) -> str:
+        return self.url
+
+    def get(self, key: str, dest: Path) -> bool:
+        from urllib.error import URLError
+        from urllib.request import urlopen
+
+        try:
+            with urlopen(f"{self.url}/{key}.tar.gz", timeout=self.timeout) as resp, open(dest, "wb") as out:
+                shutil.copyfileobj(resp, out)
+        except (URLError, OSError, ValueError):
+            return False
+        return True
+
+    def put(self, key: str, src: Path) -> bool:
+        from urllib.error import URLError
+        from urllib.request import Request, urlopen
+
+        try:
+            data = Path(src).read_bytes()
+            request = Request(f"{self.url}/{key}.tar.gz", data=data, method="PUT",
+                              headers={"Content-Type": "application/gzip"})
+            with urlopen(request, timeout=self.timeout):
+                pass
+        except (URLError, OSError, ValueError):
+            return False
+        return True
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        return []
+
+    def delete(self, key: str) -> None:
+        pass
+
+
+def backend_for(spec: str):
+    """Backend from a KOSAIO_ARTIFACT_* value: http(s):// URL or directory."""
+    if spec.startswith(("http://", "https://")):
+        return HttpBackend(spec)
+    return DirectoryBackend(Path(spec))
+
+
+class ArtifactCache:
+    def __init__(self, local: Optional[DirectoryBackend], remote=None, max_bytes: int = DEFAULT_MAX_MB << 20):
+        self.local = local
+        self.remote = remote
+        self.max_bytes = max_bytes
+        self._keys: Dict[str, Optional[str]] = {}
+        self._toolchain: Optional[Tuple[Optional[str], Optional[str]]] = None
+
+    @staticmethod
+    def default() -> "ArtifactCache":
+        spec = os.environ.get("KOSAIO_ARTIFACT_CACHE", "")
+        local = None if spec == "off" else DirectoryBackend(Path(spec) if spec else cfg.cache_dir / "artifacts")
+        remote_spec = os.environ.get("KOSAIO_ARTIFACT_REMOTE", "")
+        try:
+            max_mb = max(0, int(os.environ.get("KOSAIO_ARTIFACT_CACHE_MB", DEFAULT_MAX_MB)))
+        except ValueError:
+            max_mb = DEFAULT_MAX_MB
+        return ArtifactCache(local, backend_for(remote_spec) if remote_spec else None, max_mb << 20)
+
+    @property
+    def enabled(self) -> bool:
+        return self.local is not None or self.remote is not None
+
+    # --- Fingerprints ---
+
+    def key(self, port: str, _visiting: Tuple[str, ...] = ()) -> Optional[str]:
+        """Fingerprint of a port build (None when it cannot be cached)."""
+        if port in self._keys:
+            return self._keys[port]
+        if port in _visiting:
+            return None
+        inputs = self.inputs(port, _visiting + (port,))
+        digest = None
+        if inputs is not None:
+            h = hashlib.sha256()
+            for name, value in inputs:
+                h.update(f"{name}\0{value}\n".encode())
+            digest = h.hexdigest()
+        self._keys[port] = digest
+        return digest
+
+    def inputs(self, port: str, _visiting: Tuple[str, ...] = ()) -> Optional[List[Tuple[str, str]]]:
+        """(name, value) pairs hashed into the key, or None when uncacheable."""
+        from core.manifest import ManifestParser
+        from services.ports import PortService
+        from services.remotes import RemoteChecker
+
+        recipe = cfg.kos_ports_dir / port
+        m = ManifestParser.parse_port_makefile(recipe / "Makefile")
+        if m is None:
+            return None
+
+        toolchain = self._toolchain_identity()
+        if toolchain is None:
+            # Builds against an unidentified compiler or KOS tree must never share a key
+            return None
+        gcc, kos_commit = toolchain
+        inputs = [("format", FORMAT), ("port", m.id), ("gcc", gcc), ("kos", kos_commit),
+                  ("cflags", os.environ.get("KOS_CFLAGS", ""))]
+
+        for dirpath, dirnames, filenames in fs.walk(recipe):
+            if dirpath == str(recipe):
+                dirnames[:] = [d for d in dirnames if d not in BUILD_DIRS]
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                inputs.append((f"recipe:{path.relative_to(recipe)}", _file_digest(path)))
+
+        for owner in (m.id, "kos"):
+            for cfg_dir in (cfg.registry_cfg_dir, cfg.user_cfg_dir):
+                for path in sorted(fs.glob(cfg_dir, f"{owner}.cfg*")):
+                    inputs.append((f"cfg:{cfg_dir.name}/{path.name}", _file_digest(path)))
+
+        if m.repo:
+            # Branch-tracking sources: the key follows the upstream commit
+            ref = f"refs/heads/{m.branch}" if m.branch else "HEAD"
+            head = RemoteChecker.heads({(m.repo, ref)}, ttl=RemoteChecker.default_ttl()).get((m.repo, ref))
+            if not head:
+                return None
+            inputs.append(("source", head))
+
+        for dep in m.deps:
+            dep_key = self.key(PortService.resolve_port_name(dep) or dep, _visiting)
+            if dep_key is None:
+                return None
+            inputs.append((f"dep:{dep}", dep_key))
+        return inputs
+
+    # --- Store / restore ---
+
+    def store(self, port: str) -> Optional[str]:
+        """Packs the installed outputs of `port`; returns the key (None if not stored)."""
+        key = self.key(port)
+        if key is None or not self.enabled:
+            return None
+        members = self._installed_members(port)
+        if not members:
+            return None
+
+        with tempfile.TemporaryDirectory(prefix="kosaio-artifact-") as tmp:
+            archive = Path(tmp) / f"{key}.tar.gz"
+            meta = {"port": port, "key": key, "created": int(time.time()),
+                    "files": [arcname for arcname, _ in members]}
+            with tarfile.open(archive, "w:gz", dereference=True) as tar:
+                for arcname, path in members:
+                    tar.add(str(path), arcname=arcname, recursive=False)
+                data = json.dumps(meta, indent=1).encode()
+                info = tarfile.TarInfo("meta.json")
+                info.size = len(data)
+                info.mtime = meta["created"]
+                tar.addfile(info, io.BytesIO(data))
+
+            stored = False
+            if self.local is not None:
+                stored = self.local.put(key, archive)
+                self.prune()
+            if self.remote is not None:
+                stored = self.remote.put(key, archive) or stored
+        return key if stored else None
+
+    def restore(self, port: str) -> Optional[str]:
+        """Unpacks a cached build of `port`; returns the key on a hit."""
+        key = self.key(port)
+        if key is None or not self.enabled:
+            return None
+
+        with tempfile.TemporaryDirectory(prefix="kosaio-artifact-") as tmp:
+            archive = Path(tmp) / f"{key}.tar.gz"
+            hit = self.local is not None and self.local.get(key, archive)
+            if not hit and self.remote is not None and self.remote.get(key, archive):
+                hit = True
+                if self.local is not None:
+                    self.local.put(key, archive)
+                    self.prune()
+            self._count("hits" if hit else "misses")
+            if not hit:
+                return None
+            try:
+                files = self._extract(archive)
+            except (OSError, tarfile.TarError, ValueError):
+                return None
+
+        manifest = self._kos_base() / ".kos-manifest" / f"{port}.manifest"
+        markers = {str(self._marker_dir() / port), str(self._marker_dir() / f"{port}.hash")}
+        fs.atomic_write(manifest, "".join(f"{f}\n" for f in sorted(files) if f not in markers))
+        return key
+
+    # --- Maintenance ---
+
+    def stats(self) -> Dict[str, object]:
+        entries = self.local.entries() if self.local is not None else []
+        counters = self._counters()
+        return {
+            "local": self.local.describe() if self.local is not None else "off",
+            "remote": self.remote.describe() if self.remote is not None else "none",
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+        }
+
+    def prune(self, max_bytes: Optional[int] = None) -> List[str]:
+        """Evicts least recently used archives until the local tier fits; returns removed keys."""
+        if self.local is None:
+            return []
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.local.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for key, size, _ in entries:
+            if total <= limit:
+                break
+            self.local.delete(key)
+            total -= size
+            removed.append(key)
+        return removed
+
+    # --- Internal helpers ---
+
+    def _toolchain_identity(self) -> Optional[Tuple[str, str]]:
+        """(first line of sh-elf-gcc --version, KOS commit), None if either is unknown."""
+        if self._toolchain is None:
+            gcc = cfg.get_tool_dir("sh-elf") / "bin" / "sh-elf-gcc"
+            version = _command_output([str(gcc), "--version"])
+            self._toolchain = (version.split("\n")[0] if version else None,
+                               _command_output(["git", "-C", str(self._kos_base()), "rev-parse", "HEAD"]))
+        gcc, kos_commit = self._toolchain
+        return (gcc, kos_commit) if gcc and kos_commit else None
+
+    @staticmethod
+    def _kos_base() -> Path:
+        return Path(os.environ.get("KOS_BASE") or cfg.get_tool_dir("kos"))
+
+    @staticmethod
+    def _marker_dir() -> Path:
+        return cfg.kos_ports_dir / "lib" / ".kos-ports"
+
+    def _roots(self) -> Dict[str, Path]:
+        return {"kos": self._kos_base(), "ports": cfg.kos_ports_dir}
+
+    def _installed_members(self, port: str) -> List[Tuple[str, Path]]:
+        """(archive name, path) for the manifest files and markers of an installed port."""
+        manifest = self._kos_base() / ".kos-manifest" / f"{port}.manifest"
+        try:
+            listed = [line for line in fs.read_text(manifest).splitlines() if line]
+        except OSError:
+            return []
+        listed += [str(self._marker_dir() / port), str(self._marker_dir() / f"{port}.hash")]
+
+        members = []
+        for name in dict.fromkeys(listed):
+            path = Path(name)
+            if not fs.exists(path):
+                continue
+            for root_name, root in self._roots().items():
+                try:
+                    members.append((f"{root_name}/{path.relative_to(root)}", path))
+                    break
+                except ValueError:
+                    continue
+        return members
+
+    def _extract(self, archive: Path) -> List[str]:
+        """Unpacks into the active trees; returns the absolute paths written."""
+        roots = self._roots()
+        written = []
+        with tarfile.open(archive, "r:gz") as tar:
+            for member in tar.getmembers():
+                if member.name == "meta.json":
+                    continue
+                root_name, _, rel = member.name.partition("/")
+                root = roots.get(root_name)
+                target = (root / rel).resolve() if root and rel else None
+                if not member.isfile() or target is None or \
+                        os.path.commonpath([target, root.resolve()]) != str(root.resolve()):
+                    raise ValueError(f"unexpected archive member: {member.name}")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with tar.extractfile(member) as src, open(target, "wb") as out:
+                    shutil.copyfileobj(src, out)
+                os.chmod(target, member.mode & 0o777)
+                written.append(str(root / rel))
+        return written
+
+    def _counters(self) -> Dict[str, int]:
+        try:
+            return json.loads(fs.read_text(self.local.root / "stats.json"))
+        except (AttributeError, OSError, ValueError):
+            return {}
+
+    def _count(self, field: str) -> None:
+        if self.local is None:
+            return
+        counters = self._counters()
+        counters[field] = counters.get(field, 0) + 1
+        fs.atomic_write(self.local.root / "stats.json", json.dumps(counters))
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+    except OSError:
+        return "unreadable"
+    return h.hexdigest()
+
+
+def _command_output(argv: List[str]) -> Optional[str]:
+    """Stripped stdout of a successful command, None if it cannot run or fails."""
+    try:
+        proc = subprocess.run(argv, capture_output=True, text=True, stdin=subprocess.DEVNULL, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.strip() or None
@@ -0,0 +1,322 @@
+"""
+builder.py - Parallel kos-ports build executor.
+
+Ports are started as soon as every dependency inside the requested set has
+built successfully. All child makes share one GNU make jobserver, so the
+total number of compile jobs across every port never exceeds --jobs. A
+failure only cancels that port's downstream subtree; independent ports keep
+building. Each port writes its own log file. With an artifact cache, ports
+whose build is cached are restored before anything is scheduled.
+
+Every successful port gets the same tracking files as a serial install: the
+lib/.kos-ports version marker, the .hash of git-tracked ports and the
+.kos-manifest file list used by uninstall. Concurrent installs land in the
+same directories, so each new file is attributed by its ctime to the port
+whose build window holds it (the earliest finisher when windows overlap).
+
+Ready ports start longest-remaining-chain first (services.buildplan bottom
+levels over the build history), and every build is recorded there.
+"""
+import os
+import queue
+import select
+import statistics
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from core.config import cfg
+from services.graph import PortGraph
+
+# File timestamps come from a coarse kernel clock and can trail time.time() slightly
+CTIME_SLACK = 0.02
+
+
+class BuildResult:
+    """Outcome of one port: status is 'ok', 'failed' or 'skipped'."""
+    def __init__(self, port: str, status: str, exit_code: int = 0, log_path: Optional[Path] = None,
+                 duration: float = 0.0, blocked_by: Optional[str] = None, cached: bool = False):
+        self.port = port
+        self.status = status
+        self.exit_code = exit_code
+        self.log_path = log_path
+        self.duration = duration
+        self.blocked_by = blocked_by
+        # Restored from the artifact cache instead of built
+        self.cached = cached
+
+
+class JobServer:
+    """
+    GNU make jobserver (pipe flavour). The executor owns the implicit slot;
+    the pipe holds jobs - 1 tokens that child makes (and the executor, for
+    every extra concurrent port) must take before starting a job.
+    """
+    def __init__(self, jobs: int):
+        self.jobs = max(1, jobs)
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_inheritable(self.read_fd, True)
+        os.set_inheritable(self.write_fd, True)
+        if self.jobs > 1:
+            os.write(self.write_fd, b"+" * (self.jobs - 1))
+
+    @property
+    def makeflags(self) -> str:
+        if self.jobs == 1:
+            return "-j1"
+        return f"-j{self.jobs} --jobserver-auth={self.read_fd},{self.write_fd}"
+
+    def acquire(self) -> bytes:
+        """Blocks until a token is available."""
+        while True:
+            try:
+                token = os.read(self.read_fd, 1)
+                if token:
+                    return token
+            except BlockingIOError:
+                # GNU make >= 4.3 switches the shared pipe to O_NONBLOCK
+                pass
+            select.select([self.read_fd], [], [])
+
+    def release(self, token: bytes) -> None:
+        os.write(self.write_fd, token)
+
+    def close(self) -> None:
+        for fd in (self.read_fd, self.write_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class ParallelBuilder:
+    def __init__(self, graph: PortGraph, ports: Sequence[str], jobs: int = 1,
+                 make_targets: Sequence[str] = ("install",), log_dir: Optional[Path] = None,
+                 on_event: Optional[Callable[[str, str], None]] = None, cache=None):
+        self.graph = graph
+        self.ports = [graph.canonical(p) for p in ports]
+        self.jobs = max(1, jobs)
+        self.make_targets = list(make_targets)
+        self.log_dir = log_dir or cfg.log_dir / "ports"
+        # on_event(port, "start" | "ok" | "failed" | "skipped") for progress output
+        self.on_event = on_event or (lambda port, event: None)
+        # services.artifacts.ArtifactCache: hits are unpacked up front, never scheduled
+        self.cache = cache
+        # port -> (start, end) wall-clock build window, for manifest attribution
+        self._windows: Dict[str, Tuple[float, float]] = {}
+
+    def run(self) -> List[BuildResult]:
+        selected = set(self.ports)
+        # Only edges inside the requested set matter; anything else is already installed
+        waiting_on = {p: {d for d in map(self.graph.canonical, self.graph.deps(p)) if d in selected and d != p}
+                      for p in self.ports}
+        rank = self._priorities(waiting_on)
+        dependents: Dict[str, List[str]] = {p: [] for p in self.ports}
+        for port, deps in waiting_on.items():
+            for dep in deps:
+                dependents[dep].append(port)
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        jobserver = JobServer(self.jobs)
+        events: "queue.Queue[tuple]" = queue.Queue()
+        token_wanted = threading.Event()
+        stopping = threading.Event()
+
+        def token_reader():
+            while True:
+                token_wanted.wait()
+                if stopping.is_set():
+                    return
+                token_wanted.clear()
+                events.put(("token", jobserver.acquire()))
+
+        threading.Thread(target=token_reader, daemon=True).start()
+
+        results: Dict[str, BuildResult] = {}
+        for port in self.ports:
+            if self.cache is not None and self.cache.restore(port):
+                results[port] = BuildResult(port, "ok", cached=True)
+                self.on_event(port, "cached")
+        for deps in waiting_on.values():
+            deps.difference_update(results)
+        installed_before = _installed_files()
+        ready = sorted((p for p in self.ports if not waiting_on[p] and p not in results), key=rank.get)
+        held: List[bytes] = []
+        running = 0
+        token_pending = False
+
+        try:
+            while len(results) < len(self.ports):
+                # Launch everything we have slots for (implicit slot + held tokens)
+                while ready and running < 1 + len(held):
+                    port = ready.pop(0)
+                    running += 1
+                    self.on_event(port, "start")
+                    threading.Thread(target=self._build_one, args=(port, jobserver, events), daemon=True).start()
+
+                if ready and not token_pending and self.jobs > 1:
+                    token_pending = True
+                    token_wanted.set()
+                elif not ready:
+                    # Give surplus tokens back so running makes can use them
+                    while held and running < 1 + len(held):
+                        jobserver.release(held.pop())
+
+                kind, *payload = events.get()
+                if kind == "token":
+                    token_pending = False
+                    held.append(payload[0])
+                    continue
+
+                result: BuildResult = payload[0]
+                running -= 1
+                results[result.port] = result
+                self.on_event(result.port, result.status)
+
+                if result.status == "ok":
+                    for port in dependents[result.port]:
+                        waiting_on[port].discard(result.port)
+                        if not waiting_on[port] and port not in results:
+                            ready.append(port)
+                    ready.sort(key=rank.get)
+                else:
+                    for port in self.graph.rdeps(result.port):
+                        if port in selected and port not in results:
+                            results[port] = BuildResult(port, "skipped", blocked_by=result.port)
+                            self.on_event(port, "skipped")
+                    ready = [p for p in ready if p not in results]
+        finally:
+            stopping.set()
+            token_wanted.set()
+            for token in held:
+                jobserver.release(token)
+            # Let a pending token read complete (and hand it back) before the pipe goes away
+            while token_pending:
+                try:
+                    kind, *payload = events.get(timeout=5)
+                except queue.Empty:
+                    break
+                if kind == "token":
+                    token_pending = False
+                    jobserver.release(payload[0])
+            jobserver.close()
+
+        self._write_manifests(installed_before, [r.port for r in results.values() if r.status == "ok" and not r.cached])
+        return [results[p] for p in self.ports]
+
+    def _priorities(self, waiting_on: Dict[str, set]) -> Dict[str, tuple]:
+        """Sort key for the ready list: highest bottom level first, then input order."""
+        from services.buildplan import DEFAULT_ESTIMATE, bottom_levels
+        from services.history import BuildHistory
+
+        estimates = BuildHistory.estimates()
+        fallback = statistics.median(estimates.values()) if estimates else DEFAULT_ESTIMATE
+        cost = {p: estimates.get(p, fallback) for p in self.ports}
+        levels = bottom_levels(self.ports, waiting_on, cost)
+        return {p: (-levels[p], i) for i, p in enumerate(self.ports)}
+
+    def _build_one(self, port: str, jobserver: JobServer, events: "queue.Queue[tuple]") -> None:
+        # The run loop waits for one event per started port, whatever happens here
+        try:
+            result = self._make(port, jobserver)
+        except Exception as e:
+            log_path = self.log_dir / f"{port}.log"
+            try:
+                with open(log_path, "a") as log:
+                    log.write(f"kosaio: build of {port} aborted: {e!r}\n")
+            except OSError:
+                pass
+            result = BuildResult(port, "failed", 1, log_path)
+        events.put(("done", result))
+
+    def _make(self, port: str, jobserver: JobServer) -> BuildResult:
+        from services.history import BuildHistory, BuildRecord, run_measured
+
+        port_dir = cfg.kos_ports_dir / port
+        log_path = self.log_dir / f"{port}.log"
+        env = dict(os.environ)
+        env["MAKEFLAGS"] = jobserver.makeflags
+        env.pop("MFLAGS", None)
+        make = env.get("KOS_MAKE", "make").split()
+
+        start = time.time()
+        try:
+            with open(log_path, "wb") as log:
+                code, wall, cpu, rss = run_measured(
+                    make + self.make_targets, cwd=port_dir, env=env,
+                    stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                    pass_fds=(jobserver.read_fd, jobserver.write_fd),
+                )
+        except OSError as e:
+            with open(log_path, "a") as log:
+                log.write(f"kosaio: cannot run make in {port_dir}: {e}\n")
+            code, wall = 127, 0.0
+        else:
+            BuildHistory.record(BuildRecord(port, "port", wall, cpu, rss, code))
+        self._windows[port] = (start, time.time())
+
+        if code == 0:
+            ParallelBuilder._record_installed(port)
+        return BuildResult(port, "ok" if code == 0 else "failed", code, log_path, wall)
+
+    @staticmethod
+    def _record_installed(port: str) -> None:
+        """Writes the lib/.kos-ports version and .hash files, mirroring _ports_execute_install."""
+        from core.manifest import ManifestParser
+        from services.remotes import RemoteChecker
+
+        m = ManifestParser.parse_port_makefile(cfg.kos_ports_dir / port / "Makefile")
+        marker_dir = cfg.kos_ports_dir / "lib" / ".kos-ports"
+        head = ""
+        if m is not None and m.repo:
+            ref = f"refs/heads/{m.branch}" if m.branch else "HEAD"
+            head = RemoteChecker.heads({(m.repo, ref)}, ttl=RemoteChecker.default_ttl()).get((m.repo, ref), "")
+        try:
+            marker_dir.mkdir(parents=True, exist_ok=True)
+            if head:
+                (marker_dir / f"{port}.hash").write_text(f"{head}\n")
+            (marker_dir / port).write_text(f"{(m.version if m else '') or 'unknown'}\n")
+        except OSError:
+            pass
+
+    def _write_manifests(self, before: Set[str], ports: List[str]) -> None:
+        """<KOS_BASE>/.kos-manifest/<port>.manifest for every port built in this run."""
+        if not ports:
+            return
+        owners: Dict[str, List[str]] = {p: [] for p in ports}
+        for path in sorted(_installed_files() - before):
+            try:
+                changed = os.lstat(path).st_ctime
+            except OSError:
+                continue
+            candidates = [p for p in ports if self._windows[p][0] - CTIME_SLACK <= changed <= self._windows[p][1]]
+            if candidates:
+                owners[min(candidates, key=lambda p: self._windows[p][1])].append(path)
+
+        manifest_dir = _kos_base() / ".kos-manifest"
+        try:
+            manifest_dir.mkdir(parents=True, exist_ok=True)
+            for port, files in owners.items():
+                (manifest_dir / f"{port}.manifest").write_text("".join(f"{f}\n" for f in files))
+        except OSError:
+            pass
+
+
+def _kos_base() -> Path:
+    return Path(os.environ.get("KOS_BASE") or cfg.get_tool_dir("kos"))
+
+
+def _installed_files() -> Set[str]:
+    """Files and symlinks under the install roots, as _ports_snapshot lists them (tracking files excluded)."""
+    kos_base = _kos_base()
+    roots = (kos_base / "lib", kos_base / "include", kos_base / "addons",
+             cfg.kos_ports_dir / "lib", cfg.kos_ports_dir / "include")
+    found: Set[str] = set()
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d != ".kos-ports"]
+            found.update(os.path.join(dirpath, n) for n in filenames)
+            found.update(os.path.join(dirpath, d) for d in dirnames if os.path.islink(os.path.join(dirpath, d)))
+    return found
@@ -0,0 +1,153 @@
+"""
+buildplan.py - Build time estimates and the critical path through the build DAG.
+
+Nodes are tools and ports; edges are port DEPENDENCIES plus the SDK chain
+(kos-chain -> kos -> kos-ports -> every port, library tools -> kos). Each
+node costs its history estimate (services.history); ids that never built
+cost the median of the known estimates, or DEFAULT_ESTIMATE without any.
+
+The bottom level of a node is its own cost plus the longest chain of work
+that waits on it. Scheduling the highest bottom level first starts long
+chains (toolchain -> kos -> SDL family) before short independent leaves;
+ParallelBuilder uses the same priority.
+"""
+import heapq
+import statistics
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_ESTIMATE = 60.0
+
+# The SDK chain every port and library tool sits on
+SDK_CHAIN = ("kos-chain", "kos", "kos-ports")
+
+
+class PlanEntry:
+    """One node: est is seconds, source is 'history' or 'default'."""
+    def __init__(self, item_id: str, kind: str, est: float, source: str):
+        self.id = item_id
+        self.kind = kind
+        self.est = est
+        self.source = source
+
+
+class BuildPlan:
+    def __init__(self, entries: List[PlanEntry], deps: Dict[str, List[str]]):
+        self.entries = entries
+        self.deps = deps
+        self.cost = {e.id: e.est for e in entries}
+        self.levels = bottom_levels([e.id for e in entries], deps, self.cost)
+
+    @staticmethod
+    def build(items: Sequence[Tuple[str, str]], estimates: Optional[Dict[str, float]] = None) -> "BuildPlan":
+        """items: (id, 'tool' | 'port') pairs; estimates default to the build history."""
+        from services.graph import PortGraph
+
+        if estimates is None:
+            from services.history import BuildHistory
+            estimates = BuildHistory.estimates()
+        fallback = statistics.median(estimates.values()) if estimates else DEFAULT_ESTIMATE
+
+        graph = PortGraph.load()
+        ids = [graph.canonical(i) if kind == "port" else i for i, kind in items]
+        kinds = dict(zip(ids, (kind for _, kind in items)))
+        selected = set(ids)
+        lib_tools = BuildPlan._lib_tools()
+
+        deps: Dict[str, List[str]] = {}
+        for item_id in ids:
+            if kinds[item_id] == "port":
+                wanted = [graph.canonical(d) for d in graph.deps(item_id)] + ["kos-ports"]
+            elif item_id in SDK_CHAIN:
+                wanted = list(SDK_CHAIN[:SDK_CHAIN.index(item_id)])
+            elif item_id in lib_tools:
+                wanted = ["kos"]
+            else:
+                wanted = []
+            deps[item_id] = [d for d in wanted if d in selected and d != item_id]
+
+        entries = [PlanEntry(i, kinds[i], estimates.get(i, fallback), "history" if i in estimates else "default")
+                   for i in ids]
+        return BuildPlan(entries, deps)
+
+    def critical_path(self) -> List[str]:
+        """The chain with the largest total estimate, first item first."""
+        if not self.entries:
+            return []
+        dependents = _reverse(self.deps)
+        order = {e.id: n for n, e in enumerate(self.entries)}
+        roots = [e.id for e in self.entries if not self.deps[e.id]] or list(order)
+        node = max(roots, key=lambda i: (self.levels[i], -order[i]))
+        path = [node]
+        while True:
+            # A dependency cycle must not walk forever
+            nxt = [i for i in dependents[node] if i not in path]
+            if not nxt:
+                return path
+            node = max(nxt, key=lambda i: (self.levels[i], -order[i]))
+            path.append(node)
+
+    def serial(self) -> float:
+        return sum(self.cost.values())
+
+    def makespan(self, jobs: int = 1) -> float:
+        """Simulated wall time with `jobs` builds at once, highest bottom level first."""
+        jobs = max(1, jobs)
+        waiting = {i: len(d) for i, d in self.deps.items()}
+        dependents = _reverse(self.deps)
+        order = {e.id: n for n, e in enumerate(self.entries)}
+        ready = [(-self.levels[i], order[i], i) for i, n in waiting.items() if n == 0]
+        heapq.heapify(ready)
+        running: List[Tuple[float, str]] = []
+        now = 0.0
+        while ready or running:
+            while ready and len(running) < jobs:
+                _, _, item_id = heapq.heappop(ready)
+                heapq.heappush(running, (now + self.cost[item_id], item_id))
+            now, done = heapq.heappop(running)
+            for item_id in dependents[done]:
+                waiting[item_id] -= 1
+                if waiting[item_id] == 0:
+                    heapq.heappush(ready, (-self.levels[item_id], order[item_id], item_id))
+        return now
+
+    # --- Internal helpers ---
+
+    @staticmethod
+    def _lib_tools() -> set:
+        from core.catalog import catalog
+
+        return {m.id for m in catalog.tools() if "lib" in m.type.split(",")}
+
+
+def bottom_levels(nodes: Sequence[str], deps: Dict[str, Sequence[str]],
+                  cost: Dict[str, float]) -> Dict[str, float]:
+    """node -> cost of the node plus the longest chain of nodes depending on it."""
+    dependents = _reverse({n: deps.get(n, ()) for n in nodes})
+    levels: Dict[str, float] = {}
+    for node in reversed(_topological(nodes, deps)):
+        below = [levels[d] for d in dependents[node] if d in levels]
+        levels[node] = cost.get(node, 0.0) + max(below, default=0.0)
+    return levels
+
+
+def _reverse(deps: Dict[str, Sequence[str]]) -> Dict[str, List[str]]:
+    dependents: Dict[str, List[str]] = {n: [] for n in deps}
+    for node, wanted in deps.items():
+        for dep in wanted:
+            dependents.setdefault(dep, []).append(node)
+    return dependents
+
+
+def _topological(nodes: Sequence[str], deps: Dict[str, Sequence[str]]) -> List[str]:
+    """Dependencies first; nodes caught in a cycle are appended in input order."""
+    selected = set(nodes)
+    waiting = {n: {d for d in deps.get(n, ()) if d in selected and d != n} for n in nodes}
+    dependents = _reverse({n: list(w) for n, w in waiting.items()})
+    order = [n for n in nodes if not waiting[n]]
+    for node in order:
+        for dep in dependents[node]:
+            waiting[dep].discard(node)
+            if not waiting[dep]:
+                order.append(dep)
+    seen = set(order)
+    return order + [n for n in nodes if n not in seen]
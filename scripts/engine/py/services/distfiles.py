@@ -0,0 +1,320 @@
+"""
+distfiles.py - Shared, content-addressed store for kos-ports downloads.
+
+The container tree (sdk/kos-ports) and the host workspace
+(kosaio-dev/kos-ports) each keep fetched tarballs in <port>/dist. The store
+keeps one copy of every file, named by its SHA-256:
+
+    data/distfiles/<sha[:2]>/<sha>     (KOSAIO_DISTFILES overrides the root)
+    data/distfiles/index.json          {"<port>/<file>": sha}
+
+`add` hashes dist files on a thread pool and swaps every duplicate for a
+hardlink to the store object (a reflink, or nothing, across filesystems).
+`link` puts known files into the active tree's <port>/dist before a build,
+so kos-ports finds them and skips the download. `gc` deduplicates both
+trees, drops objects that no dist entry references, and reports the bytes
+reclaimed.
+
+Objects are verified before they are handed out: a file whose content no
+longer matches its name is removed. Hashes are cached in
+data/cache/distfile-hashes.json by (size, mtime, inode).
+"""
+import errno
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core import fs
+from core.config import cfg
+
+CHUNK = 1 << 20
+# linux/fs.h FICLONE: share extents (btrfs, xfs) when hardlinks cannot cross filesystems
+FICLONE = 0x40049409
+
+
+class DistStore:
+    INDEX = "index.json"
+    HASHES = "distfile-hashes.json"
+
+    def __init__(self, root: Path, jobs: int = 4):
+        self.root = Path(root)
+        self.jobs = max(1, jobs)
+        self._hashes: Optional[Dict[str, list]] = None
+
+    @staticmethod
+    def default() -> "DistStore":
+        root = os.environ.get("KOSAIO_DISTFILES") or cfg.kosaio_dir / "data" / "distfiles"
+        return DistStore(Path(root), jobs=max(4, cfg.io_workers))
+
+    @staticmethod
+    def trees() -> List[Path]:
+        """Both kos-ports trees (container first), existing ones only."""
+        trees = []
+        for mode in ("0", "1"):
+            tree = cfg.get_tool_dir("kos-ports", force_mode=mode)
+            if tree not in trees and fs.exists(tree):
+                trees.append(tree)
+        return trees
+
+    def path(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha
+
+    # --- Public API ---
+
+    def add(self, ports: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Moves the dist files of `ports` (all ports when None) in both trees
+        into the store. Returns counters: files, new, linked, bytes_saved.
+        """
+        files = self._dist_files(ports)
+        hashes = self.hash_files([path for _, path in files])
+        index = self._load_index()
+        stats = {"files": len(files), "new": 0, "linked": 0, "bytes_saved": 0}
+        for (port, path), sha in zip(files, hashes):
+            if sha is None:
+                continue
+            index[f"{port}/{path.name}"] = sha
+            obj = self.path(sha)
+            if not fs.exists(obj) or not self._verified(obj, sha):
+                stats["new"] += self._insert(path, obj)
+                continue
+            try:
+                same = os.stat(obj).st_ino == os.stat(path).st_ino
+            except OSError:
+                continue
+            if not same and self._replace_with_link(obj, path, copy=False):
+                self._remember(path, sha)
+                stats["linked"] += 1
+                stats["bytes_saved"] += obj.stat().st_size
+        self._save_index(index)
+        self._save_hashes()
+        return stats
+
+    def link(self, ports: Optional[Iterable[str]] = None, tree: Optional[Path] = None) -> List[Tuple[str, str, str]]:
+        """
+        Puts every indexed file of `ports` (all indexed ports that exist in
+        the tree when None) into <tree>/<port>/dist. Returns
+        (port, file, 'linked' | 'present' | 'missing') rows.
+        """
+        tree = tree or cfg.kos_ports_dir
+        index = self._load_index()
+        wanted = None if ports is None else set(ports)
+        rows = []
+        for key, sha in sorted(index.items()):
+            port, _, name = key.partition("/")
+            if wanted is not None and port not in wanted:
+                continue
+            if wanted is None and not fs.exists(tree / port / "Makefile"):
+                continue
+            dest = tree / port / "dist" / name
+            obj = self.path(sha)
+            if fs.exists(dest):
+                rows.append((port, name, "present"))
+            elif fs.exists(obj) and self._verified(obj, sha) and self._replace_with_link(obj, dest, copy=True):
+                self._remember(dest, sha)
+                rows.append((port, name, "linked"))
+            else:
+                rows.append((port, name, "missing"))
+        self._save_hashes()
+        return rows
+
+    def gc(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Deduplicates both trees, then removes objects no dist file refers to
+        (and their index entries). Returns counters including bytes_reclaimed.
+        """
+        stats = {"files": 0, "linked": 0, "removed": 0, "bytes_reclaimed": 0}
+        if not dry_run:
+            added = self.add()
+            stats["files"], stats["linked"] = added["files"], added["linked"]
+            stats["bytes_reclaimed"] += added["bytes_saved"]
+
+        referenced = set(h for h in self.hash_files([p for _, p in self._dist_files(None)]) if h)
+        index = self._load_index()
+        for sha, obj, size in self.objects():
+            if sha in referenced:
+                continue
+            stats["removed"] += 1
+            stats["bytes_reclaimed"] += size
+            if not dry_run:
+                obj.unlink(missing_ok=True)
+        if not dry_run:
+            self._save_index({k: v for k, v in index.items() if v in referenced})
+            self._save_hashes()
+        return stats
+
+    def objects(self) -> List[Tuple[str, Path, int]]:
+        """(sha, path, size) for every stored object."""
+        found = []
+        if not fs.exists(self.root):
+            return found
+        for bucket in sorted(self.root.iterdir()):
+            if not bucket.is_dir() or len(bucket.name) != 2:
+                continue
+            for obj in sorted(bucket.iterdir()):
+                if obj.name.startswith(".") or not obj.is_file():
+                    continue
+                found.append((obj.name, obj, obj.stat().st_size))
+        return found
+
+    def stats(self) -> Dict[str, object]:
+        objects = self.objects()
+        return {"root": str(self.root), "objects": len(objects), "bytes": sum(s for _, _, s in objects),
+                "indexed": len(self._load_index())}
+
+    def hash_files(self, paths: List[Path]) -> List[Optional[str]]:
+        """SHA-256 of each path (None if unreadable), unchanged files from the cache."""
+        cache = self._hash_cache()
+        results: List[Optional[str]] = [None] * len(paths)
+        todo = []
+        for i, path in enumerate(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            sig = [st.st_size, st.st_mtime_ns, st.st_ino]
+            entry = cache.get(str(path))
+            if entry and entry[:3] == sig:
+                results[i] = entry[3]
+            else:
+                todo.append((i, path, sig))
+
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.jobs, len(todo))) as pool:
+                digests = list(pool.map(lambda job: _sha256(job[1]), todo))
+            for (i, path, sig), digest in zip(todo, digests):
+                results[i] = digest
+                if digest:
+                    cache[str(path)] = sig + [digest]
+        return results
+
+    # --- Internal helpers ---
+
+    def _dist_files(self, ports: Optional[Iterable[str]]) -> List[Tuple[str, Path]]:
+        """(port, file) for regular files directly in <tree>/<port>/dist (git checkouts are skipped)."""
+        files = []
+        for tree in DistStore.trees():
+            names = list(ports) if ports is not None else sorted(
+                e.name for e in os.scandir(tree) if e.is_dir(follow_symlinks=False))
+            for port in names:
+                dist = tree / port / "dist"
+                try:
+                    entries = sorted(os.scandir(dist), key=lambda e: e.name)
+                except OSError:
+                    continue
+                files += [(port, Path(e.path)) for e in entries
+                          if e.is_file(follow_symlinks=False) and not e.name.startswith(".")]
+        return files
+
+    def _verified(self, obj: Path, sha: str) -> bool:
+        """Checks an object against its name; a corrupt object is removed."""
+        if self.hash_files([obj])[0] == sha:
+            return True
+        obj.unlink(missing_ok=True)
+        return False
+
+    def _insert(self, path: Path, obj: Path) -> int:
+        """Stores `path` as `obj`, sharing its inode when possible. Returns 1 if stored."""
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_name(f".{obj.name}.{os.getpid()}")
+        try:
+            try:
+                os.link(path, tmp)
+            except OSError:
+                _clone_or_copy(path, tmp)
+            os.replace(tmp, obj)
+            return 1
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return 0
+
+    @staticmethod
+    def _replace_with_link(obj: Path, dest: Path, copy: bool) -> bool:
+        """
+        Atomically points `dest` at `obj`: hardlink, else reflink. With
+        copy=True a plain copy is acceptable too (it still saves the download).
+        """
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.kosaio-{os.getpid()}")
+        try:
+            try:
+                os.link(obj, tmp)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                    raise
+                if not _reflink(obj, tmp):
+                    if not copy:
+                        return False
+                    shutil.copy2(obj, tmp)
+            os.replace(tmp, dest)
+            return True
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return False
+
+    def _load_index(self) -> Dict[str, str]:
+        try:
+            data = json.loads(fs.read_text(self.root / DistStore.INDEX))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_index(self, index: Dict[str, str]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fs.atomic_write(self.root / DistStore.INDEX, json.dumps(index, indent=1, sort_keys=True))
+
+    def _hash_cache(self) -> Dict[str, list]:
+        if self._hashes is None:
+            try:
+                data = json.loads(fs.read_text(cfg.cache_dir / DistStore.HASHES))
+            except (OSError, ValueError):
+                data = {}
+            self._hashes = data if isinstance(data, dict) else {}
+        return self._hashes
+
+    def _remember(self, path: Path, sha: str) -> None:
+        st = os.stat(path)
+        self._hash_cache()[str(path)] = [st.st_size, st.st_mtime_ns, st.st_ino, sha]
+
+    def _save_hashes(self) -> None:
+        if self._hashes is None:
+            return
+        # Forget files that are gone
+        live = {p: v for p, v in self._hashes.items() if os.path.lexists(p)}
+        fs.atomic_write(cfg.cache_dir / DistStore.HASHES, json.dumps(live, separators=(",", ":")))
+
+
+def _sha256(path: Path) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _reflink(src: Path, dest: Path) -> bool:
+    """Copy-on-write clone of src (FICLONE); False where unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        shutil.copystat(src, dest)
+        return True
+    except OSError:
+        dest.unlink(missing_ok=True)
+        return False
+
+
+def _clone_or_copy(src: Path, dest: Path) -> None:
+    if not _reflink(src, dest):
+        shutil.copy2(src, dest)
@@ -0,0 +1,177 @@
+"""
+graph.py - Port dependency graph (kos-ports DEPENDENCIES lines).
+
+All edges are loaded once from the catalog. Ordering uses Kahn's algorithm,
+so cyclic DEPENDENCIES lines are reported instead of recursing forever, and
+reverse-dependency queries ("what breaks if I rebuild zlib") are a single
+BFS over a precomputed reverse adjacency map.
+"""
+import heapq
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class GraphIssue:
+    """Structured graph problem: kind is 'cycle' or 'missing'."""
+    def __init__(self, kind: str, port: str, path: List[str]):
+        self.kind = kind
+        self.port = port
+        self.path = path
+
+    def __str__(self) -> str:
+        if self.kind == "cycle":
+            return f"Dependency cycle: {' -> '.join(self.path)}"
+        return f"Missing dependency: {self.port} requires '{self.path[-1]}' (no such port)"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GraphIssue) and (self.kind, self.port, self.path) == (other.kind, other.port, other.path)
+
+    def __repr__(self) -> str:
+        return f"GraphIssue({self.kind!r}, {self.port!r}, {self.path!r})"
+
+
+class PortGraph:
+    def __init__(self, edges: Dict[str, List[str]]):
+        # port -> direct dependencies (as written in the Makefile)
+        self.edges = edges
+        self._lower = {name.lower(): name for name in edges}
+        self._reverse: Optional[Dict[str, List[str]]] = None
+        self._full_order: Optional[List[str]] = None
+
+    @staticmethod
+    def load(ports_dir: Optional[Path] = None) -> "PortGraph":
+        """Builds the graph for the active kos-ports tree from the catalog index."""
+        from core.catalog import catalog
+        from core.config import cfg
+
+        manifests = catalog.ports(ports_dir if ports_dir is not None else cfg.kos_ports_dir)
+        return PortGraph({m.id: list(getattr(m, "deps", [])) for m in manifests})
+
+    # --- Queries ---
+
+    def canonical(self, name: str) -> str:
+        """Canonical port name for a case-insensitive input (unchanged if unknown)."""
+        if name in self.edges:
+            return name
+        return self._lower.get(name.lower(), name)
+
+    def deps(self, name: str) -> List[str]:
+        return self.edges.get(self.canonical(name), [])
+
+    def rdeps(self, name: str, transitive: bool = True) -> List[str]:
+        """Ports that depend on name, in build order (dependencies first)."""
+        reverse = self._reverse_edges()
+        start = self.canonical(name)
+        if not transitive:
+            return sorted(reverse.get(start, []))
+
+        seen: Set[str] = set()
+        queue = deque(reverse.get(start, []))
+        while queue:
+            port = queue.popleft()
+            if port in seen:
+                continue
+            seen.add(port)
+            queue.extend(reverse.get(port, []))
+        seen.discard(start)
+        return [p for p in self.order() if p in seen]
+
+    def order(self) -> List[str]:
+        """Topological order of the whole tree (memoized). Cyclic ports are omitted."""
+        if self._full_order is None:
+            self._full_order, _ = self.resolve(sorted(self.edges))
+        return list(self._full_order)
+
+    def issues(self) -> List[GraphIssue]:
+        """Every cycle and missing dependency in the tree."""
+        _, found = self.resolve(sorted(self.edges))
+        return found
+
+    def resolve(self, roots: Iterable[str]):
+        """
+        Install order for roots plus their transitive dependencies.
+
+        Returns (order, issues). Missing dependencies are kept in the order as
+        leaves (the caller decides how to report them); ports on a cycle are
+        left out of the order and reported as 'cycle' issues.
+        """
+        # 1. Collect the closure, remembering discovery order for stable output
+        rank: Dict[str, int] = {}
+        issues: List[GraphIssue] = []
+        missing: Set[tuple] = set()
+        stack = [self.canonical(r) for r in reversed(list(roots))]
+        while stack:
+            port = stack.pop()
+            if port in rank:
+                continue
+            rank[port] = len(rank)
+            for dep in reversed(self.deps(port)):
+                dep = self.canonical(dep)
+                if dep not in self.edges and (port, dep) not in missing:
+                    missing.add((port, dep))
+                    issues.append(GraphIssue("missing", port, [port, dep]))
+                if dep not in rank:
+                    stack.append(dep)
+
+        # 2. Kahn's algorithm over the closure (edge: dependency -> dependent)
+        indegree = {port: 0 for port in rank}
+        dependents: Dict[str, List[str]] = {port: [] for port in rank}
+        for port in rank:
+            for dep in set(self.canonical(d) for d in self.deps(port)):
+                # A self-dependency keeps the port blocked, like any other cycle
+                indegree[port] += 1
+                dependents[dep].append(port)
+
+        ready = [(rank[p], p) for p, n in indegree.items() if n == 0]
+        heapq.heapify(ready)
+        order: List[str] = []
+        while ready:
+            _, port = heapq.heappop(ready)
+            order.append(port)
+            for child in dependents[port]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    heapq.heappush(ready, (rank[child], child))
+
+        # 3. Anything left is on (or waiting behind) a cycle
+        blocked = {p for p, n in indegree.items() if n > 0}
+        for cycle in self._find_cycles(blocked):
+            issues.append(GraphIssue("cycle", cycle[0], cycle))
+
+        return order, issues
+
+    # --- Internal helpers ---
+
+    def _reverse_edges(self) -> Dict[str, List[str]]:
+        if self._reverse is None:
+            reverse: Dict[str, List[str]] = {}
+            for port, deps in self.edges.items():
+                for dep in deps:
+                    reverse.setdefault(self.canonical(dep), []).append(port)
+            self._reverse = reverse
+        return self._reverse
+
+    def _find_cycles(self, nodes: Set[str]) -> List[List[str]]:
+        """One representative cycle per strongly connected knot among nodes."""
+        cycles: List[List[str]] = []
+        done: Set[str] = set()
+        for start in sorted(nodes):
+            if start in done:
+                continue
+            # Walk dependencies inside the blocked set until a node repeats
+            path: List[str] = []
+            index: Dict[str, int] = {}
+            port = start
+            while port not in done:
+                if port in index:
+                    cycles.append(path[index[port]:] + [port])
+                    break
+                index[port] = len(path)
+                path.append(port)
+                nxt = [self.canonical(d) for d in self.deps(port) if self.canonical(d) in nodes]
+                if not nxt:
+                    break
+                port = nxt[0]
+            done.update(path)
+        return cycles
@@ -0,0 +1,166 @@
+"""
+history.py - Build duration history (data/history/builds.jsonl).
+
+Every port build (serial install through `main.py history run`, parallel
+builder) and every wrapped tool build step appends one JSON line:
+
+    {"id": "SDL", "kind": "port", "session": "...", "time": 1760000000,
+     "wall": 41.2, "cpu": 150.3, "rss": 212344, "exit": 0}
+
+wall/cpu are seconds (cpu = user + system of the command and everything it
+waited for), rss is the peak resident set size in KiB. Steps that share a
+session (KOSAIO_BUILD_SESSION, set per tool action by the registry driver)
+add up to one build; build_plan estimates a target from the median of its
+last successful builds. The file is compacted to the newest KEEP builds per
+target once it grows past COMPACT_BYTES.
+"""
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core import fs
+from core.config import cfg
+
+KEEP = 20
+COMPACT_BYTES = 512 * 1024
+# Successful builds the estimate is taken over
+SAMPLE = 5
+
+
+class BuildRecord:
+    def __init__(self, item_id: str, kind: str, wall: float, cpu: float = 0.0, rss: int = 0,
+                 exit_code: int = 0, session: str = "", when: Optional[float] = None):
+        self.id = item_id
+        self.kind = kind
+        self.wall = wall
+        self.cpu = cpu
+        self.rss = rss
+        self.exit = exit_code
+        self.session = session or f"{item_id}-{os.getpid()}-{time.time_ns()}"
+        self.time = int(when if when is not None else time.time())
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"id": self.id, "kind": self.kind, "session": self.session, "time": self.time,
+                "wall": round(self.wall, 3), "cpu": round(self.cpu, 3), "rss": self.rss, "exit": self.exit}
+
+    @staticmethod
+    def from_dict(data: Dict[str, object]) -> "BuildRecord":
+        return BuildRecord(str(data["id"]), str(data.get("kind", "")), float(data.get("wall", 0)),
+                           float(data.get("cpu", 0)), int(data.get("rss", 0)), int(data.get("exit", 0)),
+                           str(data.get("session", "")), float(data.get("time", 0)))
+
+
+class BuildHistory:
+    FILENAME = "builds.jsonl"
+
+    @staticmethod
+    def path() -> Path:
+        return cfg.kosaio_dir / "data" / "history" / BuildHistory.FILENAME
+
+    @staticmethod
+    def record(rec: BuildRecord) -> None:
+        """Appends one record (a single O_APPEND write, safe across builder threads)."""
+        path = BuildHistory.path()
+        line = (json.dumps(rec.to_dict(), separators=(",", ":")) + "\n").encode()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        except OSError:
+            return
+        if size > COMPACT_BYTES:
+            BuildHistory.compact()
+
+    @staticmethod
+    def load() -> List[BuildRecord]:
+        try:
+            text = fs.read_text(BuildHistory.path())
+        except OSError:
+            return []
+        records = []
+        for line in text.splitlines():
+            try:
+                records.append(BuildRecord.from_dict(json.loads(line)))
+            except (ValueError, KeyError, TypeError):
+                continue
+        return records
+
+    @staticmethod
+    def builds(records: Optional[List[BuildRecord]] = None) -> Dict[str, List[Tuple[float, int]]]:
+        """id -> [(total wall, worst exit)] per session, oldest first."""
+        sessions: Dict[Tuple[str, str], List[float]] = {}
+        for rec in BuildHistory.load() if records is None else records:
+            total = sessions.setdefault((rec.id, rec.session), [0.0, 0])
+            total[0] += rec.wall
+            total[1] = total[1] or rec.exit
+        builds: Dict[str, List[Tuple[float, int]]] = {}
+        for (item_id, _), (wall, code) in sessions.items():
+            builds.setdefault(item_id, []).append((wall, int(code)))
+        return builds
+
+    @staticmethod
+    def estimates(records: Optional[List[BuildRecord]] = None) -> Dict[str, float]:
+        """id -> expected build seconds (median of the last successful builds)."""
+        estimates = {}
+        for item_id, builds in BuildHistory.builds(records).items():
+            ok = [wall for wall, code in builds if code == 0][-SAMPLE:]
+            if ok:
+                estimates[item_id] = statistics.median(ok)
+        return estimates
+
+    @staticmethod
+    def compact(keep: int = KEEP) -> None:
+        """Rewrites the file with the newest `keep` builds (sessions) per target."""
+        records = BuildHistory.load()
+        sessions: Dict[str, List[str]] = {}
+        for rec in records:
+            order = sessions.setdefault(rec.id, [])
+            if rec.session not in order:
+                order.append(rec.session)
+        kept = {(item_id, s) for item_id, order in sessions.items() for s in order[-keep:]}
+        lines = [json.dumps(r.to_dict(), separators=(",", ":")) for r in records if (r.id, r.session) in kept]
+        fs.atomic_write(BuildHistory.path(), "".join(line + "\n" for line in lines))
+
+
+def run_measured(argv: Sequence[str], **popen_kwargs) -> Tuple[int, float, float, int]:
+    """
+    Runs argv and waits with wait4 so the resource usage is this child's own
+    (correct with several builds running on threads). Returns
+    (exit code, wall seconds, cpu seconds, peak RSS KiB); OSError if it cannot start.
+    """
+    start = time.monotonic()
+    proc = subprocess.Popen(list(argv), **popen_kwargs)
+    _, status, usage = os.wait4(proc.pid, 0)
+    code = os.waitstatus_to_exitcode(status)
+    # wait4 reaped it: keep Popen from waiting again
+    proc.returncode = code
+    wall = time.monotonic() - start
+    return (128 - code if code < 0 else code), wall, usage.ru_utime + usage.ru_stime, usage.ru_maxrss
+
+
+def run_recorded(item_id: str, kind: str, argv: Sequence[str]) -> int:
+    """
+    Runs a build command in the foreground (stdio inherited) and records it.
+    Ctrl-C reaches the command through the terminal; the wrapper only waits.
+    """
+    previous = signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        code, wall, cpu, rss = run_measured(argv, preexec_fn=lambda: signal.signal(signal.SIGINT, signal.SIG_DFL))
+    except OSError as e:
+        print(f"kosaio: cannot run {argv[0]}: {e}", file=sys.stderr)
+        return 127
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    BuildHistory.record(BuildRecord(item_id, kind, wall, cpu, rss, code,
+                                    session=os.environ.get("KOSAIO_BUILD_SESSION", "")))
+    return code
@@ -0,0 +1,161 @@
+"""
+mirrors.py - Bare reference mirrors for registry tool repositories.
+
+Every tool can be cloned into up to three places (data/repos/<tool>,
+kosaio-dev/<tool>, the SDK tree), and each clone used to download the whole
+history again. A mirror (`git clone --mirror`) per repository URL lives in
+
+    data/mirrors/<name>-<sha1(url)[:10]>.git   (KOSAIO_MIRRORS overrides, "off" disables)
+
+kosaio_git_clone asks for it (`mirror_path --ensure URL`) and clones with
+`--reference`, so the objects come from local disk and later fetches only
+transfer what the mirror lacks. `update-all` fetches every existing mirror
+at once on a bounded worker pool before the per-tool updates.
+
+Clones borrow objects through .git/objects/info/alternates, so mirrors are
+configured never to prune unreachable objects.
+"""
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from core import fs
+from core.config import cfg
+
+DEFAULT_JOBS = 4
+DEFAULT_TIMEOUT = 1800.0
+
+_REPO_RE = re.compile(r'^[ \t]*KOSAIO_TOOL_REPO="([^"]*)"', re.MULTILINE)
+
+
+class MirrorResult:
+    """Sync outcome for one URL: state is 'cloned', 'fetched' or 'failed'."""
+    def __init__(self, url: str, path: Path, state: str, detail: str = ""):
+        self.url = url
+        self.path = path
+        self.state = state
+        self.detail = detail
+
+
+class MirrorSet:
+    def __init__(self, root: Optional[Path]):
+        self.root = root
+
+    @staticmethod
+    def default() -> "MirrorSet":
+        spec = os.environ.get("KOSAIO_MIRRORS", "")
+        return MirrorSet(None if spec == "off" else Path(spec) if spec else cfg.kosaio_dir / "data" / "mirrors")
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def path(self, url: str) -> Path:
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", url.rstrip("/").rsplit("/", 1)[-1])
+        name = name[:-4] if name.endswith(".git") else name
+        return self.root / f"{name}-{hashlib.sha1(url.encode()).hexdigest()[:10]}.git"
+
+    # --- Public API ---
+
+    def ensure(self, url: str, timeout: float = DEFAULT_TIMEOUT) -> Optional[Path]:
+        """The mirror for url, cloning it first if needed (None when unavailable)."""
+        if not self.enabled or not url or url.startswith("-"):
+            return None
+        path = self.path(url)
+        if fs.exists(path / "HEAD"):
+            return path
+        return path if self._clone(url, path, timeout) is None else None
+
+    def sync(self, urls: Sequence[str], jobs: int = DEFAULT_JOBS,
+             timeout: float = DEFAULT_TIMEOUT) -> List[MirrorResult]:
+        """Clones missing mirrors and fetches existing ones concurrently (input order, duplicates dropped)."""
+        urls = [u for u in dict.fromkeys(urls) if u and not u.startswith("-")]
+        if not self.enabled or not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(urls)))) as pool:
+            return list(pool.map(lambda url: self._sync_one(url, timeout), urls))
+
+    def urls(self) -> List[str]:
+        """Origin URL of every mirror on disk."""
+        if not self.enabled or not fs.exists(self.root):
+            return []
+        urls = []
+        for path in sorted(self.root.glob("*.git")):
+            try:
+                proc = subprocess.run(["git", "--git-dir", str(path), "config", "remote.origin.url"],
+                                      capture_output=True, text=True, stdin=subprocess.DEVNULL)
+            except OSError:
+                return []
+            if proc.returncode == 0 and proc.stdout.strip():
+                urls.append(proc.stdout.strip())
+        return urls
+
+    @staticmethod
+    def tool_repos(tool_ids: Optional[Sequence[str]] = None) -> List[str]:
+        """KOSAIO_TOOL_REPO of the given registry tools (all tools when None)."""
+        from core.catalog import catalog
+
+        wanted = None if tool_ids is None else set(tool_ids)
+        repos = []
+        for m in sorted(catalog.tools(), key=lambda m: m.id):
+            if wanted is not None and m.id not in wanted:
+                continue
+            try:
+                match = _REPO_RE.search(fs.read_text(m.path))
+            except OSError:
+                continue
+            if match and match.group(1):
+                repos.append(match.group(1))
+        return repos
+
+    # --- Internal helpers ---
+
+    def _sync_one(self, url: str, timeout: float) -> MirrorResult:
+        path = self.path(url)
+        if not fs.exists(path / "HEAD"):
+            error = self._clone(url, path, timeout)
+            return MirrorResult(url, path, "failed" if error else "cloned", error or "")
+        error = _git(["--git-dir", str(path), "fetch", "--prune", "--quiet", "origin"], timeout)
+        return MirrorResult(url, path, "failed" if error else "fetched", error or "")
+
+    def _clone(self, url: str, path: Path, timeout: float) -> Optional[str]:
+        """Clones next to the final path and renames, so readers never see half a mirror."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=self.root))
+        try:
+            error = _git(["clone", "--mirror", "--quiet", url, str(tmp)], timeout)
+            if error:
+                return error
+            for key, value in (("gc.pruneExpire", "never"), ("gc.reflogExpireUnreachable", "never")):
+                _git(["--git-dir", str(tmp), "config", key, value], timeout)
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # Another clone got there first
+                if not fs.exists(path / "HEAD"):
+                    return f"cannot create {path}"
+            return None
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _git(args: List[str], timeout: float) -> Optional[str]:
+    """Runs git non-interactively; None on success, else a one-line reason."""
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0", GIT_ASKPASS="true")
+    try:
+        proc = subprocess.run(["git"] + args, capture_output=True, text=True,
+                              stdin=subprocess.DEVNULL, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        return "timed out"
+    except OSError as e:
+        return str(e)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return lines[-1] if lines else f"git exited with {proc.returncode}"
+    return None
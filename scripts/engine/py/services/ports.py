@@ -1,25 +1,21 @@
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from core.manifest import ManifestParser
+from services.graph import GraphIssue, PortGraph
 
 class PortService:
-    @staticmethod
-    def resolve_bulk_dependencies(libs: List[str]) -> List[str]:
-        resolved: List[str] = []
-
-        def _resolve_recursive(lib_name: str):
-            deps = ManifestParser.get_port_dependencies(lib_name)
-            for dep in deps:
-                if dep not in resolved:
-                    _resolve_recursive(dep)
-            if lib_name not in resolved:
-                resolved.append(lib_name)
+    # port_info record keys, in output order. INSTALLED/HASH describe the active
+    # kos-ports tree ($KOS_PORTS); the _CONTAINER/_HOST pairs both trees.
+    INFO_FIELDS = ("PORTNAME", "SHORT_DESC", "PORTVERSION", "GIT_REPOSITORY", "GIT_BRANCH", "DEPENDENCIES",
+                   "INSTALLED", "HASH", "INSTALLED_CONTAINER", "INSTALLED_HOST", "HASH_CONTAINER", "HASH_HOST")
 
-        for lib in libs:
-            _resolve_recursive(lib)
-
-        return resolved
+    @staticmethod
+    def resolve_bulk_dependencies(libs: List[str]) -> Tuple[List[str], List[GraphIssue]]:
+        """
+        Install order (dependencies first) for libs and everything they need.
+        Returns (order, issues); ports caught in a cycle are left out of order.
+        """
+        return PortGraph.load().resolve(libs)
 
     @staticmethod
     def _sanitize_port_name(name: str) -> Optional[str]:
@@ -36,27 +32,57 @@ class PortService:
         Case-insensitive port name resolution.
         Returns the canonical name if found, else None.
         """
-        from core.config import cfg
+        from core.names import names
 
         safe_name = PortService._sanitize_port_name(input_name)
         if safe_name is None:
             return None
+        return names.lookup("port", safe_name)
 
-        ports_dir = cfg.system_kos_ports_dir
-        if not ports_dir.exists():
-            return None
 
-        # 1. Exact match check
-        exact_path = ports_dir / safe_name / "Makefile"
-        if exact_path.exists():
-            return safe_name
+    @staticmethod
+    def port_info_bulk(queries: List[str]) -> List[Optional[Dict[str, str]]]:
+        """
+        Metadata plus installed versions and git hashes for many ports, one
+        record per query in input order (None when the port does not exist).
+        Every Makefile is parsed once; empty strings mean "not installed".
+        """
+        from core.config import cfg
+        from core.manifest import ManifestParser
+
+        trees = {
+            "": cfg.kos_ports_dir,
+            "_CONTAINER": cfg.get_tool_dir("kos-ports", force_mode="0"),
+            "_HOST": cfg.get_tool_dir("kos-ports", force_mode="1"),
+        }
+        records: List[Optional[Dict[str, str]]] = []
+        for query in queries:
+            name = PortService.resolve_port_name(query) or PortService._sanitize_port_name(query)
+            m = ManifestParser.parse_port_makefile(cfg.kos_ports_dir / name / "Makefile") if name else None
+            if m is None:
+                records.append(None)
+                continue
 
-        # 2. Case-insensitive search
-        input_lower = safe_name.lower()
-        for path in ports_dir.iterdir():
-            if path.is_dir() and path.name.lower() == input_lower:
-                if (path / "Makefile").exists():
-                    return path.name
+            record = {
+                "PORTNAME": m.id,
+                "SHORT_DESC": m.desc,
+                "PORTVERSION": m.version,
+                "GIT_REPOSITORY": m.repo,
+                "GIT_BRANCH": m.branch,
+                "DEPENDENCIES": " ".join(m.deps),
+            }
+            for suffix, tree in trees.items():
+                markers = tree / "lib" / ".kos-ports"
+                record[f"INSTALLED{suffix}"] = PortService._read_marker(markers / m.id)
+                record[f"HASH{suffix}"] = PortService._read_marker(markers / f"{m.id}.hash")
+            records.append({key: record[key] for key in PortService.INFO_FIELDS})
+        return records
 
-        return None
+    @staticmethod
+    def _read_marker(path: Path) -> str:
+        from core import fs
 
+        try:
+            return fs.read_text(path).strip()
+        except OSError:
+            return ""
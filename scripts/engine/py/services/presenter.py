@@ -1,8 +1,8 @@
-from typing import List
+from typing import List, Optional, TYPE_CHECKING
 from services.ui import UI
-from services.status import StatusService
-from core.config import cfg
-from core.manifest import ManifestParser, Manifest
+
+if TYPE_CHECKING:
+    from core.manifest import Manifest
 
 class Presenter:
     @staticmethod
@@ -17,7 +17,14 @@ class Presenter:
         print(f"{UI.BOLD}MODE:{UI.RESET}  {UI.B_CYAN}C{UI.RESET}=Container  {UI.B_CYAN}H{UI.RESET}=Host\n")
 
     @staticmethod
-    def render_search_table(results: List[Manifest], filter_installed: bool = False) -> None:
+    def render_search_table(results: List["Manifest"], filter_installed: bool = False,
+                            limit: Optional[int] = None) -> None:
+        # Table-only dependencies: render_banner must stay import-light
+        from core.config import cfg
+        from core.fs import FsSnapshot
+        from core.profiling import span
+        from services.status import StatusService
+
         Presenter.print_legend()
         if not results:
             print(f"  {UI.GRAY}No matches found in Registry or KOS-PORTS.{UI.RESET}\n")
@@ -31,58 +38,63 @@ class Presenter:
             ("DESCRIPTION", 40, UI.B_CYAN)
         ]
 
-        rows = []
-        filtered_count = 0
+        # One directory snapshot for the whole table instead of ~20 stats per row
+        fs = FsSnapshot()
+        statuses = StatusService.iter_status_bulk(((m.id, m.type) for m in results), fs)
 
-        for m in results:
-            status = StatusService.get_status_data(m.id, m.type)
-
-            # Apply Installation Filter
-            if filter_installed:
-                if status["c_inst"] == "x" and status["h_inst"] == "x":
+        def rows():
+            shown = 0
+            for m, status in zip(results, statuses):
+                # Apply Installation Filter
+                if filter_installed and status["c_inst"] == "x" and status["h_inst"] == "x":
                     continue
-
-            cfg_status = StatusService.get_config_status(m.id)
-            cfg_pill = UI.cfg_pill(cfg_status)
-
-            # Show only the active mode's status with C/H prefix
-            if status["h_active"]:
-                stat_pill = UI.active_pill(status["h_inst"], "H")
-            else:
-                stat_pill = UI.active_pill(status["c_inst"], "C")
-
-            rows.append([
-                (f"[{m.type.upper()}]", UI.CYAN),
-                (m.id, UI.BLUE),
-                (cfg_pill, ""),
-                (stat_pill, ""),
-                (m.desc, UI.RESET)
-            ])
-            filtered_count += 1
-
-        if filtered_count == 0 and filter_installed:
+                if limit and shown >= limit:
+                    return
+
+                with span("status evaluation"):
+                    cfg_state = StatusService.get_config_status(m.id, fs)
+                cfg_pill = UI.cfg_pill(cfg_state)
+
+                # Show only the active mode's status with C/H prefix
+                if status["h_active"]:
+                    stat_pill = UI.active_pill(status["h_inst"], "H")
+                else:
+                    stat_pill = UI.active_pill(status["c_inst"], "C")
+
+                shown += 1
+                yield [
+                    (f"[{m.type.upper()}]", UI.CYAN),
+                    (m.id, UI.BLUE),
+                    (cfg_pill, ""),
+                    (stat_pill, ""),
+                    (m.desc, UI.RESET)
+                ]
+
+        # Rows are printed as their status is computed
+        with span("rendering"):
+            shown = UI.stream_table(headers, rows())
+        if shown == 0 and filter_installed:
             print(f"  {UI.GRAY}No installed packages found matching query.{UI.RESET}\n")
             return
 
-        print(UI.render_table(headers, rows))
-
         # Help user if ports repo is missing
-        if not cfg.kos_ports_dir.exists():
+        if not fs.exists(cfg.kos_ports_dir):
             print(f"  {UI.YELLOW}INFO: KOS-PORTS repository missing. Individual libraries (ports) are hidden.{UI.RESET}")
             print(f"  {UI.GRAY}Run 'kosaio clone kos-ports' to see available libraries.{UI.RESET}\n")
 
     @staticmethod
     def render_ports_table() -> None:
+        from core import fs
+        from core.catalog import catalog
+        from core.config import cfg
+        from core.profiling import span
+        from services.status import StatusService
+
         ports_path = cfg.kos_ports_dir
-        if not ports_path.exists():
+        if not fs.exists(ports_path):
             return
 
-        skip_dirs = {"utils", "scripts", "include", "lib", "examples", "kos-ports"}
-        ports = []
-        for makefile in ports_path.glob("*/Makefile"):
-            if makefile.parent.name in skip_dirs: continue
-            ports.append(makefile.parent.name)
-        ports.sort()
+        ports = sorted(catalog.ports(ports_path), key=lambda m: m.id)
 
         headers = [
             ("LIBRARY", 20, UI.B_CYAN),
@@ -91,23 +103,19 @@ class Presenter:
             ("DESCRIPTION", 40, UI.B_CYAN)
         ]
 
-        rows = []
-        for lib in ports:
-            status = StatusService.get_status_data(lib, "port")
-            c_pill = UI.status_pill(status["c_inst"], status["c_active"])
-            h_pill = UI.status_pill(status["h_inst"], status["h_active"])
-
-            m = ManifestParser.parse_port_makefile(ports_path / lib / "Makefile")
-            desc = m.desc if m else "No description"
+        statuses = StatusService.iter_status_bulk((m.id, "port") for m in ports)
 
-            rows.append([
-                (lib, UI.BLUE),
-                (c_pill, ""),
-                (h_pill, ""),
-                (desc, UI.RESET)
-            ])
+        def rows():
+            for m, status in zip(ports, statuses):
+                yield [
+                    (m.id, UI.BLUE),
+                    (UI.status_pill(status["c_inst"], status["c_active"]), ""),
+                    (UI.status_pill(status["h_inst"], status["h_active"]), ""),
+                    (m.desc, UI.RESET)
+                ]
 
-        print(UI.render_table(headers, rows))
+        with span("rendering"):
+            UI.stream_table(headers, rows())
 
     @staticmethod
     def render_banner(branch: str, commit: str, date: str) -> None:
@@ -0,0 +1,143 @@
+"""
+remotes.py - Concurrent remote revision checks for git-tracked ports.
+
+`ports_update` has to know whether a branch-tracking port moved upstream,
+which costs one `git ls-remote` round-trip per port. RemoteChecker runs
+those calls on a bounded thread pool (each with its own timeout), asks each
+(repository, ref) pair only once, and keeps the answers in
+data/cache/remote-heads.json for KOSAIO_REMOTE_TTL seconds so the shell's
+per-port check right after update_plan does not go back to the network.
+
+States:
+    current   remote head equals lib/.kos-ports/<port>.hash
+    behind    remote head differs (or no hash was recorded)
+    unknown   ls-remote failed, timed out or the ref does not exist
+"""
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core import fs
+from core.config import cfg
+
+DEFAULT_JOBS = 8
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_TTL = 300
+
+
+class RemoteStatus:
+    """Remote check result for one port."""
+    def __init__(self, port: str, repo: str, ref: str, remote: str, local: str, state: str):
+        self.port = port
+        self.repo = repo
+        self.ref = ref
+        self.remote = remote
+        self.local = local
+        self.state = state
+
+    def __repr__(self) -> str:
+        return f"RemoteStatus({self.port!r}, {self.state!r}, {self.remote[:12]!r})"
+
+
+class RemoteChecker:
+    FILENAME = "remote-heads.json"
+
+    @staticmethod
+    def cache_path() -> Path:
+        return cfg.cache_dir / RemoteChecker.FILENAME
+
+    @staticmethod
+    def default_ttl() -> int:
+        try:
+            return max(0, int(os.environ.get("KOSAIO_REMOTE_TTL", DEFAULT_TTL)))
+        except ValueError:
+            return DEFAULT_TTL
+
+    @staticmethod
+    def check(ports: Sequence[str], jobs: int = DEFAULT_JOBS, timeout: float = DEFAULT_TIMEOUT,
+              ttl: Optional[int] = None) -> List[RemoteStatus]:
+        """
+        Remote state of every git-tracked port in `ports` (input order; ports
+        without GIT_REPOSITORY or without a Makefile are left out).
+        """
+        from services.ports import PortService
+
+        ttl = RemoteChecker.default_ttl() if ttl is None else ttl
+        tracked = []
+        for record in PortService.port_info_bulk(list(ports)):
+            if record and record["GIT_REPOSITORY"]:
+                ref = f"refs/heads/{record['GIT_BRANCH']}" if record["GIT_BRANCH"] else "HEAD"
+                tracked.append((record["PORTNAME"], record["GIT_REPOSITORY"], ref, record["HASH"]))
+
+        heads = RemoteChecker.heads({(repo, ref) for _, repo, ref, _ in tracked}, jobs, timeout, ttl)
+
+        results = []
+        for port, repo, ref, local in tracked:
+            remote = heads.get((repo, ref), "")
+            if not remote:
+                state = "unknown"
+            elif remote == local:
+                state = "current"
+            else:
+                state = "behind"
+            results.append(RemoteStatus(port, repo, ref, remote, local, state))
+        return results
+
+    @staticmethod
+    def heads(pairs, jobs: int = DEFAULT_JOBS, timeout: float = DEFAULT_TIMEOUT,
+              ttl: int = DEFAULT_TTL) -> Dict[Tuple[str, str], str]:
+        """(repo, ref) -> commit hash ('' when unknown), from the cache when fresh."""
+        now = time.time()
+        cache = RemoteChecker._load()
+        heads: Dict[Tuple[str, str], str] = {}
+        missing = []
+        for repo, ref in sorted(pairs):
+            entry = cache.get(f"{repo} {ref}")
+            if entry and now - entry.get("time", 0) < ttl:
+                heads[(repo, ref)] = entry.get("hash", "")
+            else:
+                missing.append((repo, ref))
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(missing)))) as pool:
+                fetched = list(pool.map(lambda pair: RemoteChecker.ls_remote(*pair, timeout=timeout), missing))
+            for (repo, ref), head in zip(missing, fetched):
+                heads[(repo, ref)] = head
+                # Failures are not cached: the next run asks again
+                if head:
+                    cache[f"{repo} {ref}"] = {"hash": head, "time": now}
+            fs.atomic_write(RemoteChecker.cache_path(), json.dumps(cache, indent=1, sort_keys=True))
+        return heads
+
+    @staticmethod
+    def ls_remote(repo: str, ref: str, timeout: float = DEFAULT_TIMEOUT) -> str:
+        """Commit hash `ref` points to on `repo` ('' on error or timeout)."""
+        if repo.startswith("-"):
+            return ""
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0", GIT_ASKPASS="true")
+        try:
+            proc = subprocess.run(["git", "ls-remote", repo, ref], capture_output=True, text=True,
+                                  stdin=subprocess.DEVNULL, timeout=timeout, env=env)
+        except (OSError, subprocess.TimeoutExpired):
+            return ""
+        if proc.returncode != 0:
+            return ""
+        for line in proc.stdout.splitlines():
+            sha, _, name = line.partition("\t")
+            if name == ref:
+                return sha
+        return ""
+
+    # --- Internal helpers ---
+
+    @staticmethod
+    def _load() -> Dict[str, dict]:
+        try:
+            data = json.loads(fs.read_text(RemoteChecker.cache_path()))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
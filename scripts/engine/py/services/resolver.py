@@ -1,20 +1,11 @@
-from typing import List, Optional
+from typing import List
 
-from core.manifest import ManifestParser
+from services.graph import PortGraph
 
 class DependencyResolver:
     @staticmethod
-    def resolve(lib_name: str, resolved_list: Optional[List[str]] = None) -> List[str]:
-        if resolved_list is None:
-            resolved_list = []
-
-        deps = ManifestParser.get_port_dependencies(lib_name)
-        for dep in deps:
-            if dep not in resolved_list:
-                # Recursive call
-                DependencyResolver.resolve(dep, resolved_list)
-                if dep not in resolved_list:
-                    resolved_list.append(dep)
-
-        return resolved_list
-
+    def resolve(lib_name: str) -> List[str]:
+        """Transitive dependencies of lib_name in install order (excluding itself)."""
+        graph = PortGraph.load()
+        order, _ = graph.resolve([lib_name])
+        return [dep for dep in order if dep != graph.canonical(lib_name)]
@@ -0,0 +1,159 @@
+"""
+search_index.py - Ranked, typo-tolerant search over catalog manifests.
+
+Manifests are tokenized once into an inverted index (token -> documents
+with the best field weight). Query tokens match vocabulary tokens exactly,
+by prefix or by substring; a trigram index over the vocabulary makes the
+substring step a set intersection instead of a scan, and the same trigrams
+give a fuzzy fallback for typos. Queries are plain text, never regexes;
+ones without word tokens ("-", "_") fall back to a substring scan.
+"""
+import heapq
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.manifest import Manifest
+
+# id match > name > tag match > description match
+FIELD_WEIGHTS = (("id", 8.0), ("name", 6.0), ("tags", 4.0), ("desc", 2.0))
+
+# Match quality per query token
+EXACT, PREFIX, SUBSTRING = 1.0, 0.8, 0.6
+SYNONYM_FACTOR = 0.9
+FUZZY_FACTOR = 0.5
+FUZZY_MIN_SIMILARITY = 0.5
+# Whole query equals the manifest id
+ID_BONUS = 10.0
+
+# Query term -> extra terms searched with it (data, not code)
+SYNONYM_GROUPS = (
+    (("opengl", "gl", "libgl", "3d", "graphics"), ("gl", "kgl", "parallax", "tsunami", "graphics")),
+    (("audio", "mp3", "sound", "music"), ("audio", "tremor", "sh4zam", "vorbis", "wav", "mp3", "ogg")),
+    (("network", "ip", "tcp"), ("network", "lwip", "tcp", "ip")),
+)
+SYNONYMS: Dict[str, Tuple[str, ...]] = {term: expansion for terms, expansion in SYNONYM_GROUPS for term in terms}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+[+#]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps '+'/'#' suffixes so c++ and c# stay searchable."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, manifests: Iterable[Manifest]):
+        self.docs: List[Manifest] = list(manifests)
+        # token -> {doc index -> best field weight}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        # trigram (of "$token$") -> vocabulary tokens containing it
+        self.trigrams: Dict[str, Set[str]] = {}
+
+        for doc_id, m in enumerate(self.docs):
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(str(getattr(m, field, "") or "")):
+                    docs = self.postings.setdefault(token, {})
+                    if docs.get(doc_id, 0.0) < weight:
+                        docs[doc_id] = weight
+        for token in self.postings:
+            for gram in _trigrams(token):
+                self.trigrams.setdefault(gram, set()).add(token)
+
+    def search(self, query: str, limit: Optional[int] = None,
+               tiebreak: Callable[[Manifest], object] = lambda m: m.id) -> List[Manifest]:
+        """Manifests matching every query term, best score first (top `limit`)."""
+        terms = tokenize(query)
+        if not terms:
+            return self._substring(query, limit, tiebreak)
+
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            term_scores = self._score_term(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+            if not scores:
+                return []
+
+        whole = query.strip().lower()
+        for doc_id in scores:
+            if self.docs[doc_id].id.lower() == whole:
+                scores[doc_id] += ID_BONUS
+
+        ranked = ((-score, tiebreak(self.docs[d]), d) for d, score in scores.items())
+        best = heapq.nsmallest(limit, ranked) if limit else sorted(ranked)
+        return [self.docs[d] for _, _, d in best]
+
+    # --- Internal helpers ---
+
+    def _substring(self, query: str, limit: Optional[int],
+                   tiebreak: Callable[[Manifest], object]) -> List[Manifest]:
+        """Plain substring scan for queries without word tokens (e.g. "-" or "_")."""
+        needle = query.lower()
+        found = [m for m in self.docs
+                 if any(needle in str(getattr(m, field, "") or "").lower() for field, _ in FIELD_WEIGHTS)]
+        return sorted(found, key=tiebreak)[:limit]
+
+    def _score_term(self, term: str) -> Dict[int, float]:
+        """doc -> best score for one query term (synonyms included)."""
+        matches = self._match_vocab(term, fuzzy=True)
+        for extra in SYNONYMS.get(term, ()):
+            for token, quality in self._match_vocab(extra, fuzzy=False).items():
+                quality *= SYNONYM_FACTOR
+                if matches.get(token, 0.0) < quality:
+                    matches[token] = quality
+
+        scores: Dict[int, float] = {}
+        for token, quality in matches.items():
+            for doc_id, weight in self.postings[token].items():
+                score = quality * weight
+                if scores.get(doc_id, 0.0) < score:
+                    scores[doc_id] = score
+        return scores
+
+    def _match_vocab(self, term: str, fuzzy: bool) -> Dict[str, float]:
+        """Vocabulary tokens matching term -> match quality."""
+        matches: Dict[str, float] = {}
+        if term in self.postings:
+            matches[term] = EXACT
+
+        if len(term) < 3:
+            # Too short for trigrams (and substring hits would be noise): prefix only
+            candidates = self.trigrams.get(f"${term}", set()) if len(term) == 2 else \
+                {t for t in self.postings if t.startswith(term)}
+            for token in candidates:
+                if token != term and token.startswith(term):
+                    matches[token] = PREFIX
+            return matches
+
+        grams = [g for g in _trigrams(term) if "$" not in g]
+        # Smallest posting set first keeps the intersection cheap
+        postings = sorted((self.trigrams.get(g, set()) for g in grams), key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        for token in candidates:
+            if token != term and term in token:
+                matches[token] = PREFIX if token.startswith(term) else SUBSTRING
+
+        if not matches and fuzzy and len(term) >= 4:
+            matches = self._fuzzy(term)
+        return matches
+
+    def _fuzzy(self, term: str) -> Dict[str, float]:
+        """Tokens sharing enough trigrams with term (Dice coefficient)."""
+        grams = _trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for token in self.trigrams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        matches = {}
+        for token, count in shared.items():
+            similarity = 2.0 * count / (len(grams) + len(token))
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches[token] = FUZZY_FACTOR * similarity
+        return matches
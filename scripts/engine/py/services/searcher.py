@@ -1,52 +1,23 @@
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 
+from core import fs
+from core.catalog import catalog
 from core.config import cfg
-from core.manifest import ManifestParser, Manifest
+from core.manifest import Manifest
+from core.profiling import span
 
 class SearchService:
     @staticmethod
     def identify_target(target_id: str) -> Optional[str]:
         """
-        Returns 'tool', 'port' or None by checking real directories.
+        Returns 'tool', 'core', 'port' or None, from the name index.
         Supports aliases (e.g., sys -> system).
         """
-        target_id = target_id.lower()
-        if target_id == "sys": target_id = "system"
-        if target_id == "kosaio": target_id = "self"
-
-        # 1. Check Registry (Tools)
-        registry_dir = cfg.registry_dir
-        if registry_dir.exists():
-            for manifest_path in registry_dir.rglob(f"{target_id}.tool"):
-                return "tool"
-
-        # 2. Check Diagnostics (Core/Internal)
-        diag_dir = cfg.diagnostics_dir
-        if diag_dir.exists():
-             if (diag_dir / f"{target_id}.sh").exists():
-                 return "core"
-
-        # 3. Check Config (template-covered tool)
-        if cfg.config_tools_dir.exists():
-            if (cfg.config_tools_dir / f"{target_id}.tool").exists():
-                return "tool"
-
-        # 4. Check Ports
-        # Use SYSTEM path for identification (Authoritative registry)
-        ports_path = cfg.system_kos_ports_dir
-        if ports_path.exists():
-            # Exact match
-            if (ports_path / target_id / "Makefile").exists():
-                return "port"
-
-            # Case-insensitive match
-            for path in ports_path.iterdir():
-                if path.is_dir() and path.name.lower() == target_id:
-                    if (path / "Makefile").exists():
-                        return "port"
+        from core.names import names
 
-        return None
+        found = names.identify(target_id)
+        return found[0] if found else None
 
     @staticmethod
     def get_manifest_path(target_id: str) -> Optional[Path]:
@@ -54,44 +25,43 @@ class SearchService:
         Returns the full path to a manifest file for a given target.
         Supports aliases (e.g., sys -> system).
         """
-        target_id = target_id.lower()
-        if target_id == "sys": target_id = "system"
-        if target_id == "kosaio": target_id = "self"
-
-        registry_dir = cfg.registry_dir
-        if registry_dir.exists():
-            for manifest_path in registry_dir.rglob(f"{target_id}.tool"):
-                return manifest_path
-        
-        # Check Diagnostics
-        diag_dir = cfg.diagnostics_dir
-        if diag_dir.exists():
-             diag_path = diag_dir / f"{target_id}.sh"
-             if diag_path.exists():
-                 return diag_path
+        from core.names import names
 
-        # Fallback to template if config exists
-        if cfg.config_tools_dir.exists():
-            if (cfg.config_tools_dir / f"{target_id}.tool").exists():
-                if cfg.template_path.exists():
-                    return cfg.template_path
-
-        return None
+        return names.manifest_path(target_id)
 
     @staticmethod
-    def search_all(query: str = "") -> List[Manifest]:
+    def search_all(query: str = "", limit: Optional[int] = None) -> List[Manifest]:
         """
         Search all available targets (registry tools and ports).
         
         Args:
             query: Search string. Empty string returns all results.
+            limit: Return only the best `limit` matches.
             
         Returns:
-            List of Manifest objects matching the query, sorted by type priority.
+            List of Manifest objects, best match first (type priority for an empty query).
         """
+        return SearchService._rank("all", SearchService._all_manifests, query, limit)
+
+    @staticmethod
+    def search_registry(query: str = "", limit: Optional[int] = None) -> List[Manifest]:
+        # Registry tools (*.tool files are metadata manifests), served from the catalog index
+        return SearchService._rank("registry", catalog.tools, query, limit)
+
+    @staticmethod
+    def search_ports(query: str = "", limit: Optional[int] = None) -> List[Manifest]:
+        return SearchService._rank("ports", SearchService._port_manifests, query, limit)
+
+    # --- Internal helpers ---
+
+    # scope -> (generation, index) of the last search; reused by the daemon
+    _index_cache: Dict[str, tuple] = {}
+
+    @staticmethod
+    def _all_manifests() -> List[Manifest]:
         results: List[Manifest] = []
-        results.extend(SearchService.search_registry(query))
-        results.extend(SearchService.search_ports(query))
+        results.extend(catalog.tools())
+        results.extend(SearchService._port_manifests())
 
         # Unique by ID
         seen = set()
@@ -100,78 +70,45 @@ class SearchService:
             if r.id not in seen:
                 seen.add(r.id)
                 unique_results.append(r)
-
-        # Custom Sorting
-        def type_priority(item: Manifest) -> int:
-            t = item.type.lower()
-            if t == "core": return 1
-            if t == "tool": return 2
-            if t == "lib": return 3
-            if t == "emulator": return 4
-            if t == "loader": return 5
-            if t == "port": return 6
-            return 99 # Rest
-
-        unique_results.sort(key=lambda x: (type_priority(x), x.id))
         return unique_results
 
     @staticmethod
-    def search_registry(query: str = "") -> List[Manifest]:
-        query_lower = query.lower()
-        results: List[Manifest] = []
-
-        # 1. Search registry tools (*.tool files are metadata manifests)
-        if cfg.registry_dir.exists():
-            for manifest_path in cfg.registry_dir.rglob("*.tool"):
-                m = ManifestParser.parse_config_file(manifest_path)
-                if m:
-                    if not query or any(query_lower in str(getattr(m, f)).lower() for f in ['id', 'name', 'desc', 'tags']):
-                        results.append(m)
-
-        # 2. Search for template-covered tools via config_tools_dir (same as above, avoids dups)
-        if cfg.config_tools_dir.exists() and cfg.config_tools_dir != cfg.registry_dir / "tools":
-            existing_ids = {m.id for m in results}
-            for config_path in cfg.config_tools_dir.glob("*.tool"):
-                tool_id = config_path.stem
-                if tool_id not in existing_ids:
-                    m = ManifestParser.parse_config_file(config_path)
-                    if m:
-                        if not query or any(query_lower in str(getattr(m, f)).lower() for f in ['id', 'name', 'desc', 'tags']):
-                            results.append(m)
-
-        return results
-
-    @staticmethod
-    def search_ports(query: str = "") -> List[Manifest]:
+    def _port_manifests() -> List[Manifest]:
         # Always use SYSTEM path for search (Discovery should show all available)
         ports_path = cfg.system_kos_ports_dir
-        if not ports_path or not ports_path.exists():
+        if not ports_path or not fs.exists(ports_path):
             return []
+        return catalog.ports(ports_path)
 
-        import re
-        q_lower = query.lower()
-        regex_pattern = q_lower
-        if not q_lower:
-            regex_pattern = ".*"
-        elif q_lower in ["opengl", "gl", "libgl", "3d", "graphics"]:
-            regex_pattern = "(gl|kgl|parallax|tsunami|graphics)"
-        elif q_lower in ["audio", "mp3", "sound", "music"]:
-            regex_pattern = "(audio|tremor|sh4zam|vorbis|wav|mp3|ogg)"
-        elif q_lower in ["network", "ip", "tcp"]:
-            regex_pattern = "(network|lwip|tcp|ip)"
-
-        compiled_regex = re.compile(regex_pattern, re.IGNORECASE)
-        skip_dirs = {"utils", "scripts", "include", "lib", "examples", "kos-ports"}
-
-        results: List[Manifest] = []
-        for makefile in ports_path.glob("*/Makefile"):
-            if makefile.parent.name in skip_dirs:
-                continue
-
-            m = ManifestParser.parse_port_makefile(makefile)
-            if m:
-                if compiled_regex.search(m.id) or compiled_regex.search(m.desc):
-                    results.append(m)
-
-        return results
+    @staticmethod
+    def _type_priority(item: Manifest) -> int:
+        t = item.type.lower()
+        if t == "core": return 1
+        if t == "tool": return 2
+        if t == "lib": return 3
+        if t == "emulator": return 4
+        if t == "loader": return 5
+        if t == "port": return 6
+        return 99 # Rest
 
+    @staticmethod
+    def _rank(scope: str, load: Callable[[], List[Manifest]], query: str,
+              limit: Optional[int]) -> List[Manifest]:
+        def order(m: Manifest):
+            return (SearchService._type_priority(m), m.id)
+
+        if not query.strip():
+            return sorted(load(), key=order)[:limit]
+
+        from core.names import names
+        from services.search_index import SearchIndex
+
+        with span("search ranking"):
+            # load() stats every manifest and bumps catalog.generation on an edit,
+            # so the index is only rebuilt when a tool, port or its contents change
+            manifests = load()
+            generation = (names.generation(), catalog.generation, str(cfg.system_kos_ports_dir))
+            cached = SearchService._index_cache.get(scope)
+            if cached is None or cached[0] != generation:
+                cached = SearchService._index_cache[scope] = (generation, SearchIndex(manifests))
+            return cached[1].search(query, limit, tiebreak=order)
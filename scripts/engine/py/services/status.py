@@ -1,55 +1,91 @@
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from core.config import cfg
+from core.fs import FsSnapshot, LiveFs, live_fs
+from core.profiling import span
+from services.ports import PortService
 
 
 class StatusService:
+    # Rows prefetched per thread-pool round when streaming (io_workers > 1)
+    PREFETCH_CHUNK = 64
+
+    @staticmethod
+    def get_status_bulk(items: Iterable[Tuple[str, str]],
+                        fs: Optional[FsSnapshot] = None) -> List[Dict[str, Union[str, bool]]]:
+        """
+        Status for many (item_id, item_type) pairs, in input order.
+        Every directory involved is listed once and shared by all rows.
+        """
+        return list(StatusService.iter_status_bulk(items, fs))
+
     @staticmethod
-    def get_status_data(item_id: str, item_type: str) -> Dict[str, Union[str, bool]]:
-        c_inst = cfg.get_installed_version(item_id, mode="0") is not None
-        h_inst = cfg.get_installed_version(item_id, mode="1") is not None
+    def iter_status_bulk(items: Iterable[Tuple[str, str]],
+                         fs: Optional[FsSnapshot] = None) -> Iterator[Dict[str, Union[str, bool]]]:
+        """get_status_bulk as a generator, so tables can print rows as they are computed."""
+        fs = fs or FsSnapshot()
+        it = iter(items)
+        while True:
+            chunk = list(islice(it, StatusService.PREFETCH_CHUNK))
+            if not chunk:
+                return
+            if cfg.io_workers > 1:
+                with span("status evaluation"):
+                    StatusService._prefetch(chunk, fs)
+            for item_id, item_type in chunk:
+                # The span must not stay open across the yield
+                with span("status evaluation"):
+                    status = StatusService.get_status_data(item_id, item_type, fs)
+                yield status
 
-        if item_type != "port":
+    @staticmethod
+    def get_status_data(item_id: str, item_type: str, fs: Optional[LiveFs] = None) -> Dict[str, Union[str, bool]]:
+        fs = fs or live_fs
+        if item_type == "port":
+            c_inst = StatusService._has_version_marker(item_id, "0", fs)
+            h_inst = StatusService._has_version_marker(item_id, "1", fs)
+        else:
             c_base, h_base = StatusService._resolve_bases(item_id)
-            c_inst = c_base.exists()
-            h_inst = h_base.exists()
+            c_inst = fs.exists(c_base)
+            h_inst = fs.exists(h_base)
 
-            c_inst, h_inst = StatusService._apply_fallback(item_id, c_base, h_base, c_inst, h_inst)
-            c_inst, h_inst = StatusService._run_specialized_check(item_id, c_base, h_base, c_inst, h_inst)
+            c_inst, h_inst = StatusService._apply_fallback(item_id, c_base, h_base, c_inst, h_inst, fs)
+            c_inst, h_inst = StatusService._run_specialized_check(item_id, c_base, h_base, c_inst, h_inst, fs)
 
             # Generic tools (not in _SPECIAL_CASES): check data/states/container/<tool> marker
             if item_id not in StatusService._SPECIAL_CASES:
                 # Try standard path, then kos-ports fallback (for tools with DIR_OVERRIDE)
                 c_path = c_base
-                if not c_path.exists():
+                if not fs.exists(c_path):
                     c_alt = cfg.sdk_root / "kos-ports" / item_id
-                    if c_alt.exists():
+                    if fs.exists(c_alt):
                         c_path = c_alt
 
-                if (cfg.state_dir / "container" / item_id).exists():
+                if fs.exists(cfg.state_dir / "container" / item_id):
                     c_inst = True
-                elif c_path.exists():
+                elif fs.exists(c_path):
                     c_inst = "c"
                 else:
                     c_inst = False
 
                 # Same for host
                 h_path = h_base
-                if not h_path.exists():
+                if not fs.exists(h_path):
                     h_alt = cfg.dev_root / "kos-ports" / item_id
-                    if h_alt.exists():
+                    if fs.exists(h_alt):
                         h_path = h_alt
 
-                if (cfg.state_dir / "host" / item_id).exists():
+                if fs.exists(cfg.state_dir / "host" / item_id):
                     h_inst = True
-                elif h_path.exists():
+                elif fs.exists(h_path):
                     h_inst = "c"
                 else:
                     h_inst = False
 
-        is_host_active = StatusService._detect_active_mode(item_id, item_type)
-        c_inst, h_inst = StatusService._detect_broken(item_id, is_host_active, c_inst, h_inst)
-        c_source, h_source, c_inst, h_inst = StatusService._detect_port_source(item_id, item_type, c_inst, h_inst)
+        is_host_active = StatusService._detect_active_mode(item_id, item_type, fs)
+        c_inst, h_inst = StatusService._detect_broken(item_id, is_host_active, c_inst, h_inst, fs)
+        c_source, h_source, c_inst, h_inst = StatusService._detect_port_source(item_id, item_type, c_inst, h_inst, fs)
 
         return {
             "c_inst": "o" if c_inst is True else ("c" if c_inst == "c" or (c_source and item_type == "port") else "x"),
@@ -60,8 +96,37 @@ class StatusService:
 
     # --- Internal helpers ---
 
+    @staticmethod
+    def _prefetch(items: List[Tuple[str, str]], fs: FsSnapshot) -> None:
+        """Reads the per-row directories concurrently; evaluation then never waits on I/O."""
+        trees = [cfg.get_tool_dir("kos-ports", force_mode=mode) for mode in ("0", "1")]
+        dirs = [cfg.state_dir / state for state in ("host", "container", "broken")]
+        dirs += [tree / "lib" / ".kos-ports" for tree in trees]
+        dirs += [tree / item_id for item_id, item_type in items if item_type == "port" for tree in trees]
+        fs.prefetch(dirs, cfg.io_workers)
+
     _HOLY_LIST = {"kos", "kos-ports", "sh-elf", "arm-eabi", "aicaos", "bin", "toolchain"}
 
+    @staticmethod
+    def _has_version_marker(item_id: str, mode: str, fs: LiveFs) -> bool:
+        """
+        cfg.get_installed_version(...) is not None without reading the marker:
+        it has to exist (snapshot lookup) and be a readable file.
+        """
+        marker_dir = cfg.get_tool_dir("kos-ports", force_mode=mode) / "lib" / ".kos-ports"
+
+        if fs.exists(marker_dir / item_id):
+            return fs.readable(marker_dir / item_id)
+
+        # Try canonical name (case-insensitive fs support)
+        resolved = PortService.resolve_port_name(item_id)
+        if resolved and resolved != item_id:
+            if fs.exists(marker_dir / resolved):
+                return fs.readable(marker_dir / resolved)
+            hash_marker = marker_dir / f"{resolved}.hash"
+            return fs.exists(hash_marker) and fs.readable(hash_marker)
+        return False
+
     @staticmethod
     def _resolve_bases(item_id: str):
         if item_id in StatusService._HOLY_LIST:
@@ -72,33 +137,33 @@ class StatusService:
         return c_base, h_base
 
     @staticmethod
-    def _apply_fallback(item_id: str, c_base: Path, h_base: Path, c_inst, h_inst):
+    def _apply_fallback(item_id: str, c_base: Path, h_base: Path, c_inst, h_inst, fs: LiveFs):
         if not c_inst:
             c_alt = cfg.sdk_root / "kos-ports" / item_id
-            if c_alt.exists():
+            if fs.exists(c_alt):
                 c_inst = True
         if not h_inst:
             h_alt = cfg.dev_root / "kos-ports" / item_id
-            if h_alt.exists():
+            if fs.exists(h_alt):
                 h_inst = True
         return c_inst, h_inst
 
     @staticmethod
-    def _run_specialized_check(item_id: str, c_base: Path, h_base: Path, c_inst, h_inst):
+    def _run_specialized_check(item_id: str, c_base: Path, h_base: Path, c_inst, h_inst, fs: LiveFs):
         handler = StatusService._SPECIAL_CASES.get(item_id)
         if handler:
-            return handler(c_base, h_base, c_inst, h_inst)
+            return handler(c_base, h_base, c_inst, h_inst, fs)
         return c_inst, h_inst
 
     @staticmethod
-    def _check_toolchain(c_base: Path, h_base: Path, c_inst, h_inst):
+    def _check_toolchain(c_base: Path, h_base: Path, c_inst, h_inst, fs: LiveFs):
         c_sh = cfg.sdk_root / "sh-elf"
         c_arm = cfg.sdk_root / "arm-eabi"
         h_sh = cfg.dev_root / "sh-elf"
         h_arm = cfg.dev_root / "arm-eabi"
 
-        c_has_sh = (c_sh / "bin" / "sh-elf-gcc").exists()
-        c_has_arm = (c_arm / "bin" / "arm-eabi-gcc").exists()
+        c_has_sh = fs.exists(c_sh / "bin" / "sh-elf-gcc")
+        c_has_arm = fs.exists(c_arm / "bin" / "arm-eabi-gcc")
         if c_has_sh:
             c_inst = True  # SH4 is sufficient; ARM is optional
         elif c_has_arm:
@@ -106,8 +171,8 @@ class StatusService:
         else:
             c_inst = False
 
-        h_has_sh = (h_sh / "bin" / "sh-elf-gcc").exists()
-        h_has_arm = (h_arm / "bin" / "arm-eabi-gcc").exists()
+        h_has_sh = fs.exists(h_sh / "bin" / "sh-elf-gcc")
+        h_has_arm = fs.exists(h_arm / "bin" / "arm-eabi-gcc")
         if h_has_sh:
             h_inst = True
         elif h_has_arm:
@@ -118,19 +183,19 @@ class StatusService:
         return c_inst, h_inst
 
     @staticmethod
-    def _check_kos(c_base: Path, h_base: Path, c_inst, h_inst):
+    def _check_kos(c_base: Path, h_base: Path, c_inst, h_inst, fs: LiveFs):
         c_lib = c_base / "lib" / "dreamcast" / "libkallisti.a"
-        if c_lib.exists():
+        if fs.exists(c_lib):
             c_inst = True
-        elif c_base.exists():
+        elif fs.exists(c_base):
             c_inst = "c"
         else:
             c_inst = False
 
         h_lib = h_base / "lib" / "dreamcast" / "libkallisti.a"
-        if h_lib.exists():
+        if fs.exists(h_lib):
             h_inst = True
-        elif h_base.exists():
+        elif fs.exists(h_base):
             h_inst = "c"
         else:
             h_inst = False
@@ -138,21 +203,21 @@ class StatusService:
         return c_inst, h_inst
 
     @staticmethod
-    def _check_aicaos(c_base: Path, h_base: Path, c_inst, h_inst):
+    def _check_aicaos(c_base: Path, h_base: Path, c_inst, h_inst, fs: LiveFs):
         kos_c = cfg.sdk_root / "kos"
         aica_lib_c = kos_c / "addons" / "lib" / "dreamcast" / "libaicaos.a"
-        if aica_lib_c.exists():
+        if fs.exists(aica_lib_c):
             c_inst = True
-        elif c_base.exists():
+        elif fs.exists(c_base):
             c_inst = "c"
         else:
             c_inst = False
 
         h_drv = h_base / "arm" / "aicaos.drv"
         h_lib = h_base / "libaicaos.a"
-        if h_drv.exists() and h_lib.exists():
+        if fs.exists(h_drv) and fs.exists(h_lib):
             h_inst = True
-        elif h_base.exists():
+        elif fs.exists(h_base):
             h_inst = "c"
         else:
             h_inst = False
@@ -166,30 +231,31 @@ class StatusService:
     }
 
     @staticmethod
-    def _detect_active_mode(item_id: str, item_type: str) -> bool:
+    def _detect_active_mode(item_id: str, item_type: str, fs: LiveFs = live_fs) -> bool:
         # New state system: data/states/host/<tool>
         state_file = cfg.state_dir / "host" / item_id
-        if state_file.exists():
+        if fs.exists(state_file):
             return True
         if item_type == "port":
             p_state = cfg.state_dir / "host" / "kos-ports"
-            return p_state.exists() or cfg.dev_mode == "1"
+            return fs.exists(p_state) or cfg.dev_mode == "1"
         return cfg.dev_mode == "1"
 
     @staticmethod
-    def get_config_status(item_id: str) -> str:
+    def get_config_status(item_id: str, fs: Optional[LiveFs] = None) -> str:
+        fs = fs or live_fs
         user_cfg = cfg.user_cfg_dir / f"{item_id}.cfg"
-        if user_cfg.exists():
+        if fs.exists(user_cfg):
             return "override"
         default_cfg = cfg.registry_cfg_dir / f"{item_id}.cfg.default"
-        if default_cfg.exists():
+        if fs.exists(default_cfg):
             return "default"
         return "none"
 
     @staticmethod
-    def _detect_broken(item_id: str, is_host_active: bool, c_inst, h_inst):
+    def _detect_broken(item_id: str, is_host_active: bool, c_inst, h_inst, fs: LiveFs = live_fs):
         broken_marker = cfg.state_dir / "broken" / item_id
-        if broken_marker.exists():
+        if fs.exists(broken_marker):
             if is_host_active:
                 h_inst = "!"
             else:
@@ -199,17 +265,17 @@ class StatusService:
         return c_inst, h_inst
 
     @staticmethod
-    def _detect_port_source(item_id: str, item_type: str, c_inst, h_inst):
+    def _detect_port_source(item_id: str, item_type: str, c_inst, h_inst, fs: LiveFs = live_fs):
         c_source = False
         h_source = False
         if item_type == "port":
             h_ports_dir = cfg.get_tool_dir("kos-ports", force_mode="1")
             c_ports_dir = cfg.get_tool_dir("kos-ports", force_mode="0")
 
-            h_source = (h_ports_dir / item_id / "dist").exists()
-            h_inst_dir = (h_ports_dir / item_id / "inst").exists()
-            c_source = (c_ports_dir / item_id / "dist").exists()
-            c_inst_dir = (c_ports_dir / item_id / "inst").exists()
+            h_source = fs.exists(h_ports_dir / item_id / "dist")
+            h_inst_dir = fs.exists(h_ports_dir / item_id / "inst")
+            c_source = fs.exists(c_ports_dir / item_id / "dist")
+            c_inst_dir = fs.exists(c_ports_dir / item_id / "inst")
 
             if h_inst_dir:
                 h_inst = True
@@ -1,5 +1,53 @@
 import re
-from typing import List, Tuple, Union, Any
+import sys
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, TextIO, Tuple, Union
+
+# ANSI escape sequences (colors, styles)
+_ANSI_RE = re.compile(r'\033\[[0-9;]*[a-zA-Z]')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+@lru_cache(maxsize=1024)
+def _char_width(char: str) -> int:
+    import unicodedata
+    if unicodedata.category(char) == 'Mn':
+        return 0
+    if unicodedata.east_asian_width(char) in ('W', 'F', 'A'):
+        return 2
+    return 1
+
+
+@lru_cache(maxsize=4096)
+def _unicode_width(clean: str) -> int:
+    """Column width of an ANSI-free, non-ASCII string (tables repeat the same pills)."""
+    # Every character starts at one column; only non-ASCII ones can differ
+    vlen = len(clean)
+    for match in _NON_ASCII_RE.finditer(clean):
+        char = match.group()
+        width = _char_width(char)
+        if width == 2:
+            # Most emojis and CJK characters have east_asian_width 'W', 'F' or 'A'
+            # In modern terminals, Ambiguous ('A') is usually 2 columns.
+            vlen += 1
+        elif width == 0:
+            # Skip non-spacing marks (like variation selectors \ufe0f)
+            vlen -= 1
+            # Fix: VS16 (\ufe0f) usually forces Emoji style (Width 2).
+            # If the base char was 'N' (Width 1), we need to add 1.
+            # EXCEPTION: Info (U+2139) often stays narrow even with VS16.
+            if char == '\ufe0f' and _base_char(clean, match.start()) != '\u2139':
+                vlen += 1
+    return vlen
+
+
+def _base_char(s: str, pos: int):
+    """Last character before pos that is not a combining mark (None at the start)."""
+    for i in range(pos - 1, -1, -1):
+        if s[i].isascii() or _char_width(s[i]) != 0:
+            return s[i]
+    return None
+
 
 class UI:
     # ANSI Colors
@@ -18,29 +66,12 @@ class UI:
     @staticmethod
     def visual_len(s: str) -> int:
         """Visible length of string accounting for ANSI, emojis, and variation selectors."""
-        import unicodedata
-        # Remove ANSI escape sequences
-        clean = re.sub(r'\033\[[0-9;]*[a-zA-Z]', '', s)
-        vlen = 0
-        last_char = None
-        for char in clean:
-            # Skip non-spacing marks (like variation selectors \ufe0f)
-            if unicodedata.category(char) == 'Mn':
-                # Fix: VS16 (\ufe0f) usually forces Emoji style (Width 2). 
-                # If the base char was 'N' (Width 1), we need to add 1.
-                # EXCEPTION: Info (U+2139) often stays narrow even with VS16.
-                if char == '\ufe0f' and last_char != '\u2139':
-                    vlen += 1
-                continue
-            
-            last_char = char
-            # Most emojis and CJK characters have east_asian_width 'W', 'F' or 'A'
-            # In modern terminals, Ambiguous ('A') is usually 2 columns.
-            if unicodedata.east_asian_width(char) in ('W', 'F', 'A'):
-                vlen += 2
-            else:
-                vlen += 1
-        return vlen
+        if "\033" in s:
+            s = _ANSI_RE.sub('', s)
+        # Fast path: every ASCII character is exactly one column
+        if s.isascii():
+            return len(s)
+        return _unicode_width(s)
 
     @staticmethod
     def strlen(s: str) -> int:
@@ -54,29 +85,45 @@ class UI:
         padding = " " * max(0, width - vlen)
         return f"{s}{padding}"
 
+    @staticmethod
+    def fit(s: str, width: int) -> str:
+        """truncate + pad with a single measurement of s."""
+        vlen = UI.visual_len(s)
+        if vlen > width:
+            s = UI._truncate(s, width)
+            vlen = UI.visual_len(s)
+        return s + " " * max(0, width - vlen)
+
     @staticmethod
     def _char_width(char: str) -> int:
         """Visible column width of a single character (0 for combining marks)."""
-        import unicodedata
-        if unicodedata.category(char) == 'Mn':
-            return 0
-        if unicodedata.east_asian_width(char) in ('W', 'F', 'A'):
-            return 2
-        return 1
+        return _char_width(char)
 
     @staticmethod
     def truncate(s: str, width: int) -> str:
         """Truncate to visible width, preserving ANSI codes and cutting at word boundaries."""
         if UI.visual_len(s) <= width:
             return s
+        return UI._truncate(s, width)
 
+    @staticmethod
+    def _truncate(s: str, width: int) -> str:
+        """truncate() for a string already known to be wider than width."""
         result_chars = []
         vis = 0
         target = width - 3
         in_ansi = False
         ansi_buf = ""
 
-        for c in s:
+        # Fast path: a leading run of plain ASCII is copied in one slice
+        start = 0
+        if "\033" not in s:
+            first_wide = _NON_ASCII_RE.search(s)
+            start = max(0, min(first_wide.start() if first_wide else len(s), target))
+            result_chars.append(s[:start])
+            vis = start
+
+        for c in s[start:]:
             if in_ansi:
                 ansi_buf += c
                 if c == 'm':
@@ -89,7 +136,7 @@ class UI:
                 ansi_buf = c
                 continue
 
-            cw = UI._char_width(c)
+            cw = 1 if c.isascii() else _char_width(c)
             if vis + cw > target:
                 break
             result_chars.append(c)
@@ -231,7 +278,31 @@ class UI:
         headers: List of (label, width, color)
         rows: List of lists of (value, color)
         """
-        # Header
+        output = [UI._table_header(headers)]
+        output.extend(UI._table_row(headers, row) for row in rows)
+        return "\n".join(output)
+
+    @staticmethod
+    def stream_table(headers: List[Tuple[str, int, str]], rows: Iterable[List[Tuple[Any, str]]],
+                     out: Optional[TextIO] = None) -> int:
+        """
+        Same layout as render_table, but each row is written and flushed as
+        soon as the generator yields it (columns are fixed-width, so nothing
+        has to be buffered). The header is printed with the first row.
+        Returns the number of rows written.
+        """
+        out = out or sys.stdout
+        count = 0
+        for row in rows:
+            if count == 0:
+                out.write(UI._table_header(headers) + "\n")
+            out.write(UI._table_row(headers, row) + "\n")
+            out.flush()
+            count += 1
+        return count
+
+    @staticmethod
+    def _table_header(headers: List[Tuple[str, int, str]]) -> str:
         header_line = ""
         sep_line = ""
         for i, (label, width, color) in enumerate(headers):
@@ -240,25 +311,28 @@ class UI:
             if i < len(headers) - 1:
                 header_line += " | "
                 sep_line += "-+-"
+        return f"{header_line}\n{sep_line}"
 
-        output = [header_line, sep_line]
-
-        # Rows
-        for row in rows:
-            row_line = ""
-            for i, (val, color) in enumerate(row):
-                # Ensure val is string
-                val = str(val)
-                width = headers[i][1]
+    @staticmethod
+    def _table_row(headers: List[Tuple[str, int, str]], row: List[Tuple[Any, str]]) -> str:
+        row_line = ""
+        for i, (val, color) in enumerate(row):
+            # Ensure val is string
+            val = str(val)
+            width = headers[i][1]
 
-                # Truncate if too long (visible)
-                if UI.strlen(val) > width:
-                    val = UI.truncate(val, width)
+            # Truncate if too long (visible) and pad, measuring once
+            row_line += color + UI.fit(val, width) + UI.RESET
+            if i < len(row) - 1:
+                row_line += " | "
+        return row_line
 
-                row_line += color + UI.pad(val, width) + UI.RESET
-                if i < len(row) - 1:
-                    row_line += " | "
-            output.append(row_line)
+    @staticmethod
+    def set_color(enabled: bool) -> None:
+        """Turns every color/style code on or off (--no-color, NO_COLOR, pipes)."""
+        for name, code in _PALETTE.items():
+            setattr(UI, name, code if enabled else "")
 
-        return "\n".join(output)
 
+# Original escape codes, so set_color(True) can restore them
+_PALETTE = {name: value for name, value in vars(UI).items() if name.isupper() and isinstance(value, str)}
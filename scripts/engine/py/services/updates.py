@@ -0,0 +1,184 @@
+"""
+updates.py - Update planning for `kosaio update-all`.
+
+Instead of running the full update lifecycle for every installed id, the
+planner classifies everything in one pass over data already on disk:
+
+    ok      installed version matches the Makefile (or a pinned release
+            with a recorded .hash), nothing to do
+    bump    PORTVERSION differs from lib/.kos-ports/<port>
+    check   git-tracked: only the remote can tell (tools, ports tracking a
+            branch without a recorded hash; with --remote, git tools and
+            ports are settled by a concurrent, cached ls-remote instead)
+    broken  installed state exists but is unusable (recipe gone, broken
+            marker); reported, never updated blindly
+
+Tools come first (SDK components such as kos / kos-ports leading) so the
+ports built on them are planned against refreshed recipes; ports come out
+in dependency order.
+"""
+import subprocess
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.config import SDK_COMPONENTS, cfg
+
+
+class PlanItem:
+    """One update-all entry: state is 'ok', 'bump', 'check' or 'broken'."""
+    def __init__(self, item_id: str, kind: str, state: str, detail: str = ""):
+        self.id = item_id
+        self.kind = kind
+        self.state = state
+        self.detail = detail
+
+    def __repr__(self) -> str:
+        return f"PlanItem({self.id!r}, {self.kind!r}, {self.state!r}, {self.detail!r})"
+
+
+class UpdatePlanner:
+    STATES = ("ok", "bump", "check", "broken")
+
+    @staticmethod
+    def plan(kinds: Sequence[str] = ("tool", "port"), remote: bool = False) -> List[PlanItem]:
+        items: List[PlanItem] = []
+        if "tool" in kinds:
+            items += UpdatePlanner.plan_tools(remote)
+        if "port" in kinds:
+            items += UpdatePlanner.plan_ports(remote)
+        return items
+
+    @staticmethod
+    def plan_tools(remote: bool = False) -> List[PlanItem]:
+        """
+        Installed registry tools: 'check' (git or lifecycle decides) or 'broken'.
+        With remote=True git clones on a branch are settled by comparing their
+        HEAD with the remote branch head: 'ok' when equal, 'bump' when not.
+        """
+        from core import fs
+        from core.catalog import catalog
+        from core.fs import FsSnapshot
+        from services.status import StatusService
+
+        tools = sorted(catalog.tools(), key=lambda m: (m.id not in SDK_COMPONENTS, m.id))
+        snapshot = FsSnapshot()
+        statuses = StatusService.get_status_bulk(((m.id, m.type) for m in tools), snapshot)
+
+        items = []
+        for m, status in zip(tools, statuses):
+            states = (status["c_inst"], status["h_inst"])
+            if "!" in states or fs.exists(cfg.state_dir / "broken" / m.id):
+                items.append(PlanItem(m.id, "tool", "broken", "marked broken"))
+            elif "o" in states:
+                source = cfg.get_tool_dir(m.id)
+                detail = "git" if fs.exists(source / ".git") else "lifecycle"
+                items.append(PlanItem(m.id, "tool", "check", detail))
+
+        if remote:
+            UpdatePlanner._resolve_tools([i for i in items if i.detail == "git"])
+        return items
+
+    @staticmethod
+    def plan_ports(remote: bool = False) -> List[PlanItem]:
+        """
+        Ports with a marker in the active kos-ports tree, dependencies first.
+        With remote=True the 'check' ports are settled against their remote
+        heads (services.remotes); unreachable remotes stay 'check'.
+        """
+        from services.graph import PortGraph
+        from services.ports import PortService
+
+        markers = UpdatePlanner.installed_ports()
+        if not markers:
+            return []
+
+        ports_dir = cfg.kos_ports_dir
+        records = PortService.port_info_bulk(list(markers))
+        by_name: Dict[str, PlanItem] = {}
+        for marker, record in zip(markers, records):
+            if record is None:
+                by_name[marker] = PlanItem(marker, "port", "broken", f"no Makefile in {ports_dir}")
+                continue
+            by_name[record["PORTNAME"]] = UpdatePlanner._classify(record)
+
+        if remote:
+            UpdatePlanner._resolve_remote([i for i in by_name.values() if i.state == "check"])
+
+        order = [p for p in PortGraph.load(ports_dir).order() if p in by_name]
+        order += sorted(set(by_name) - set(order))
+        return [by_name[p] for p in order]
+
+    @staticmethod
+    def installed_ports() -> List[str]:
+        """Port names with a version or .hash marker in the active tree (sorted)."""
+        from core import fs
+
+        try:
+            entries = fs.listdir(cfg.kos_ports_dir / "lib" / ".kos-ports")
+        except OSError:
+            return []
+        names = {e[:-5] if e.endswith(".hash") else e for e in entries if not e.startswith(".")}
+        return sorted(names)
+
+    # --- Internal helpers ---
+
+    @staticmethod
+    def _classify(record: Dict[str, str]) -> PlanItem:
+        name = record["PORTNAME"]
+        current = record["PORTVERSION"]
+        installed = record["INSTALLED"]
+        if current != "unknown" and installed and installed != current:
+            return PlanItem(name, "port", "bump", f"{installed} -> {current}")
+        if record["GIT_REPOSITORY"] and not (current[:1].isdigit() and record["HASH"]):
+            # Branch-tracking (or never hashed): same rule as the shell's bulk update
+            branch = record["GIT_BRANCH"] or "HEAD"
+            return PlanItem(name, "port", "check", f"git {branch}")
+        return PlanItem(name, "port", "ok", installed or record["HASH"][:12])
+
+    @staticmethod
+    def _resolve_remote(items: List[PlanItem]) -> None:
+        from services.remotes import RemoteChecker
+
+        if not items:
+            return
+        by_port = {i.id: i for i in items}
+        for result in RemoteChecker.check(list(by_port)):
+            item = by_port[result.port]
+            if result.state == "current":
+                item.state, item.detail = "ok", result.local[:12]
+            elif result.state == "behind":
+                item.state = "bump"
+                item.detail = f"{result.local[:12] or '?'} -> {result.remote[:12]}"
+
+    @staticmethod
+    def _resolve_tools(items: List[PlanItem]) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+        from services.remotes import DEFAULT_JOBS, RemoteChecker
+
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=min(DEFAULT_JOBS, len(items))) as pool:
+            local = list(pool.map(lambda i: _local_head(cfg.get_tool_dir(i.id)), items))
+        tracked = [(item, head) for item, head in zip(items, local) if head]
+        heads = RemoteChecker.heads({(repo, ref) for _, (_, repo, ref) in tracked},
+                                    ttl=RemoteChecker.default_ttl())
+        for item, (sha, repo, ref) in tracked:
+            remote = heads.get((repo, ref), "")
+            if remote == sha:
+                item.state, item.detail = "ok", sha[:12]
+            elif remote:
+                item.state, item.detail = "bump", f"{sha[:12]} -> {remote[:12]}"
+
+
+def _local_head(source) -> Optional[Tuple[str, str, str]]:
+    """(HEAD sha, origin url, refs/heads/<branch>) of a clone; None when detached or unknown."""
+    try:
+        rev = subprocess.run(["git", "-C", str(source), "rev-parse", "HEAD", "--symbolic-full-name", "HEAD"],
+                             capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        url = subprocess.run(["git", "-C", str(source), "config", "--get", "remote.origin.url"],
+                             capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    except OSError:
+        return None
+    lines = rev.stdout.split()
+    if rev.returncode != 0 or url.returncode != 0 or len(lines) != 2 or not lines[1].startswith("refs/heads/"):
+        return None
+    return lines[0], url.stdout.strip(), lines[1]
@@ -9,8 +9,9 @@ Exit Codes:
 """
 from pathlib import Path
 
-from core.config import cfg
-from services.searcher import SearchService
+from core import fs
+from core.config import SDK_COMPONENTS, cfg
+from core.names import names
 
 
 class ValidationResult:
@@ -59,7 +60,8 @@ class ValidatorService:
         target_lower = target.lower()
 
         # 1. Identify target type
-        target_type = SearchService.identify_target(target_lower)
+        found = names.identify(target_lower)
+        target_type = found[0] if found else None
 
         if not target_type:
             return ValidationResult(
@@ -71,7 +73,7 @@ class ValidatorService:
 
         # 2. Context-aware validation
         if target_type == "port" and action in ValidatorService.PORT_ACTIONS:
-            if not cfg.kos_ports_dir.exists():
+            if not fs.exists(cfg.kos_ports_dir):
                 return ValidationResult(
                     target_type=target_type,
                     target_id=target_lower,
@@ -105,11 +107,13 @@ class ValidatorService:
         elif mode == "sys":
             force_mode = "0"
 
+        # SDK components are never ports; skip the name index entirely
+        if tool in SDK_COMPONENTS:
+            return cfg.get_tool_dir(tool, force_mode=force_mode)
+
         # Check if it's a port. Ports live INSIDE kos-ports.
-        # We use a temporary config override if mode is provided to ensure identifying correctly
-        target_type = SearchService.identify_target(tool)
-        
-        if target_type == "port":
+        found = names.identify(tool)
+        if found and found[0] == "port":
             ports_dir = cfg.get_tool_dir("kos-ports", force_mode=force_mode)
             return ports_dir / tool
 
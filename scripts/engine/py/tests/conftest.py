@@ -1,6 +1,7 @@
 import pytest
 import os
 import sys
+import tempfile
 
 # Calculate project root: scripts/engine/py/tests/conftest.py -> kosaio/
 _test_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,6 +11,9 @@ _project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
 if "KOSAIO_DIR" not in os.environ:
     os.environ["KOSAIO_DIR"] = _project_root
 
+# Keep the catalog index out of the checked-out data/ directory
+os.environ["KOSAIO_CACHE_DIR"] = tempfile.mkdtemp(prefix="kosaio-test-cache-")
+
 # Add 'scripts/engine/py' to sys.path so imports from 'core', 'services' work
 _engine_py_dir = os.path.dirname(_test_dir)
 if _engine_py_dir not in sys.path:
@@ -20,3 +24,73 @@ if _engine_py_dir not in sys.path:
 def setup_env():
     """Ensure environment is consistent for each test."""
     pass
+
+
+# One .tool template for fixtures and benchmark trees, so they cannot drift apart
+from bench.layout import TOOL_TEMPLATE  # noqa: E402
+
+PORT_TEMPLATE = """PORTNAME = {name}
+PORTVERSION = {version}
+SHORT_DESC = {desc}
+{deps}
+
+include ${{KOS_PORTS}}/scripts/kos-ports.mk
+"""
+
+
+class FakeTree:
+    """A throwaway KOSAIO layout (registry, sdk and dev trees) wired into cfg."""
+
+    def __init__(self, root):
+        self.root = root
+        self.kosaio_dir = root / "kosaio"
+        self.sdk_root = root / "sdk"
+        self.projects_root = root / "projects"
+        self.registry_dir = self.kosaio_dir / "scripts" / "registry"
+        self.ports_dir = self.sdk_root / "kos-ports"
+        self.dev_ports_dir = self.projects_root / "kosaio-dev" / "kos-ports"
+        for d in (self.registry_dir / "tools", self.kosaio_dir / "scripts" / "engine" / "diagnostics",
+                  self.ports_dir, self.kosaio_dir / "data" / "states"):
+            d.mkdir(parents=True, exist_ok=True)
+
+    def add_tool(self, tool_id, desc="A tool", tags=("tool",), tool_type="tool"):
+        path = self.registry_dir / "tools" / f"{tool_id}.tool"
+        path.write_text(TOOL_TEMPLATE.format(
+            id=tool_id, name=tool_id.upper(), desc=desc,
+            tags=" ".join(f'"{t}"' for t in tags), type=tool_type))
+        return path
+
+    def add_port(self, name, version="1.0", desc="A port", deps=(), ports_dir=None):
+        port_dir = (ports_dir or self.ports_dir) / name
+        port_dir.mkdir(parents=True, exist_ok=True)
+        path = port_dir / "Makefile"
+        path.write_text(PORT_TEMPLATE.format(name=name, version=version, desc=desc,
+                                            deps=f"DEPENDENCIES = {' '.join(deps)}" if deps else ""))
+        return path
+
+    def mark_installed(self, name, version="1.0", ports_dir=None):
+        marker_dir = (ports_dir or self.ports_dir) / "lib" / ".kos-ports"
+        marker_dir.mkdir(parents=True, exist_ok=True)
+        (marker_dir / name).write_text(f"{version}\n")
+
+
+@pytest.fixture
+def fake_tree(tmp_path, monkeypatch):
+    from core.catalog import catalog
+    from core.config import cfg
+    from core.names import names
+
+    tree = FakeTree(tmp_path)
+    monkeypatch.setattr(cfg, "kosaio_dir", tree.kosaio_dir)
+    monkeypatch.setattr(cfg, "sdk_root", tree.sdk_root)
+    monkeypatch.setattr(cfg, "projects_root", tree.projects_root)
+    monkeypatch.setattr(cfg, "dev_root", tree.projects_root / "kosaio-dev")
+    monkeypatch.setattr(cfg, "state_dir", tree.kosaio_dir / "data" / "states")
+    monkeypatch.setattr(cfg, "dev_mode", "0")
+    monkeypatch.setattr(cfg, "kos_ports_dir_override", None)
+    monkeypatch.setattr(cfg, "cache_dir_override", str(tmp_path / "cache"))
+    catalog.invalidate()
+    names.invalidate()
+    yield tree
+    catalog.invalidate()
+    names.invalidate()
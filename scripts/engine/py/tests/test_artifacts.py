@@ -0,0 +1,184 @@
+import os
+import subprocess
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+import main
+from core.config import cfg
+from services.artifacts import ArtifactCache, DirectoryBackend, HttpBackend
+from services.builder import ParallelBuilder
+from services.graph import PortGraph
+
+
+@pytest.fixture
+def kos_base(fake_tree, tmp_path, monkeypatch):
+    base = tmp_path / "sdk" / "kos"
+    base.mkdir(parents=True)
+    # A toolchain identity: sh-elf-gcc --version and a KOS commit
+    gcc = cfg.get_tool_dir("sh-elf") / "bin" / "sh-elf-gcc"
+    gcc.parent.mkdir(parents=True, exist_ok=True)
+    gcc.write_text("#!/bin/sh\necho 'sh-elf-gcc (GCC) 14.2.0'\n")
+    gcc.chmod(0o755)
+    subprocess.run(["git", "init", "-q", str(base)], check=True)
+    subprocess.run(["git", "-C", str(base), "-c", "user.name=Test", "-c", "user.email=test@example.com",
+                    "commit", "-q", "--allow-empty", "-m", "kos"], check=True)
+    monkeypatch.setenv("KOS_BASE", str(base))
+    monkeypatch.setenv("KOS_CFLAGS", "-O2")
+    monkeypatch.delenv("KOSAIO_ARTIFACT_REMOTE", raising=False)
+    monkeypatch.setenv("KOSAIO_ARTIFACT_CACHE", str(tmp_path / "artifacts"))
+    return base
+
+
+def _install(tree, kos_base, name, version="1.0"):
+    """What a successful `make install` + _ports_execute_install leaves behind."""
+    files = [tree.ports_dir / "lib" / f"lib{name}.a", tree.ports_dir / "include" / name / f"{name}.h"]
+    for f in files:
+        f.parent.mkdir(parents=True, exist_ok=True)
+        f.write_text(f"{name} {f.name}\n")
+    tree.mark_installed(name, version=version)
+    manifest = kos_base / ".kos-manifest" / f"{name}.manifest"
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    manifest.write_text("".join(f"{f}\n" for f in files))
+    return files
+
+
+def _uninstall(tree, kos_base, name, files):
+    for f in files:
+        f.unlink()
+    (tree.ports_dir / "lib" / ".kos-ports" / name).unlink()
+    (kos_base / ".kos-manifest" / f"{name}.manifest").unlink()
+
+
+class TestArtifactCache:
+    def test_store_and_restore_roundtrip(self, fake_tree, kos_base):
+        fake_tree.add_port("zlib", version="1.3")
+        files = _install(fake_tree, kos_base, "zlib", version="1.3")
+
+        key = ArtifactCache.default().store("zlib")
+        assert key and len(key) == 64
+        _uninstall(fake_tree, kos_base, "zlib", files)
+
+        assert ArtifactCache.default().restore("zlib") == key
+        assert [f.read_text() for f in files] == ["zlib libzlib.a\n", "zlib zlib.h\n"]
+        assert (fake_tree.ports_dir / "lib" / ".kos-ports" / "zlib").read_text().strip() == "1.3"
+        manifest = (kos_base / ".kos-manifest" / "zlib.manifest").read_text().split()
+        assert sorted(manifest) == sorted(map(str, files))
+        assert ArtifactCache.default().stats()["hits"] == 1
+
+    def test_key_follows_inputs(self, fake_tree, kos_base, monkeypatch):
+        fake_tree.add_port("zlib", version="1.3")
+        fake_tree.add_port("libpng", deps=("zlib",))
+        key = lambda port="libpng": ArtifactCache.default().key(port)  # noqa: E731
+        base = key()
+
+        (fake_tree.ports_dir / "libpng" / "dist").mkdir()
+        (fake_tree.ports_dir / "libpng" / "dist" / "libpng.tar.gz").write_text("x")
+        assert key() == base, "build directories are not inputs"
+
+        seen = {base}
+        for change in (
+            lambda: (fake_tree.ports_dir / "libpng" / "files").mkdir() or
+                    (fake_tree.ports_dir / "libpng" / "files" / "fix.diff").write_text("+1\n"),
+            lambda: monkeypatch.setenv("KOS_CFLAGS", "-O3"),
+            lambda: (fake_tree.registry_dir / "cfg").mkdir(exist_ok=True) or
+                    (fake_tree.registry_dir / "cfg" / "kos.cfg.default").write_text("X=1\n"),
+            lambda: fake_tree.add_port("zlib", version="1.4"),
+        ):
+            change()
+            current = key()
+            assert current not in seen
+            seen.add(current)
+
+    def test_unknown_toolchain_is_not_cached(self, fake_tree, kos_base):
+        fake_tree.add_port("zlib")
+        (cfg.get_tool_dir("sh-elf") / "bin" / "sh-elf-gcc").unlink()
+        assert ArtifactCache.default().key("zlib") is None
+
+    def test_unreachable_git_source_is_not_cached(self, fake_tree, kos_base, tmp_path):
+        path = fake_tree.add_port("nightly")
+        path.write_text(path.read_text() + f"GIT_REPOSITORY = {tmp_path / 'missing.git'}\n")
+        fake_tree.add_port("game", deps=("nightly",))
+        assert ArtifactCache.default().key("nightly") is None
+        assert ArtifactCache.default().key("game") is None
+
+    def test_lru_prune(self, tmp_path):
+        backend = DirectoryBackend(tmp_path / "store")
+        src = tmp_path / "blob"
+        src.write_bytes(b"x" * 100)
+        for i, key in enumerate(("aa01", "bb02", "cc03")):
+            backend.put(key, src)
+            os.utime(backend.path(key), (1000 + i, 1000 + i))
+        # A hit refreshes the oldest entry
+        assert backend.get("aa01", tmp_path / "out")
+
+        removed = ArtifactCache(backend, max_bytes=150).prune()
+        assert removed == ["bb02", "cc03"]
+        assert [e[0] for e in backend.entries()] == ["aa01"]
+
+    def test_shared_tier_serves_other_nodes(self, fake_tree, kos_base, tmp_path, monkeypatch):
+        fake_tree.add_port("zlib")
+        files = _install(fake_tree, kos_base, "zlib")
+        monkeypatch.setenv("KOSAIO_ARTIFACT_REMOTE", str(tmp_path / "shared"))
+        key = ArtifactCache.default().store("zlib")
+        _uninstall(fake_tree, kos_base, "zlib", files)
+
+        # Another node: empty local cache, same shared directory
+        monkeypatch.setenv("KOSAIO_ARTIFACT_CACHE", str(tmp_path / "node-b"))
+        assert ArtifactCache.default().restore("zlib") == key
+        assert files[0].exists()
+        assert DirectoryBackend(tmp_path / "node-b").path(key).exists()
+
+    def test_http_backend(self, tmp_path):
+        root = tmp_path / "www"
+        root.mkdir()
+
+        class Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *a, **kw):
+                super().__init__(*a, directory=str(root), **kw)
+
+            def do_PUT(self):
+                (root / self.path.lstrip("/")).write_bytes(self.rfile.read(int(self.headers["Content-Length"])))
+                self.send_response(201)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            backend = HttpBackend(f"http://127.0.0.1:{server.server_port}/")
+            (tmp_path / "blob").write_bytes(b"payload")
+            assert backend.put("abc", tmp_path / "blob")
+            assert backend.get("abc", tmp_path / "out") and (tmp_path / "out").read_bytes() == b"payload"
+            assert not backend.get("missing", tmp_path / "out2")
+        finally:
+            server.shutdown()
+
+    def test_parallel_builder_restores_hits(self, fake_tree, kos_base, tmp_path):
+        fake_tree.add_port("zlib")
+        fake_tree.add_port("libpng", deps=("zlib",))
+        files = _install(fake_tree, kos_base, "zlib")
+        ArtifactCache.default().store("zlib")
+        _uninstall(fake_tree, kos_base, "zlib", files)
+        # libpng has no install target: it fails, zlib never reaches make
+        results = ParallelBuilder(PortGraph.load(), ["zlib", "libpng"], log_dir=tmp_path / "logs",
+                                  cache=ArtifactCache.default()).run()
+        assert [(r.port, r.status, r.cached) for r in results] == [("zlib", "ok", True), ("libpng", "failed", False)]
+        assert files[0].exists()
+
+    def test_command(self, fake_tree, kos_base):
+        fake_tree.add_port("zlib")
+        _install(fake_tree, kos_base, "zlib")
+        code, out, _ = main.run_captured(["cache", "store", "zlib"])
+        assert code == 0 and out.startswith("STORED zlib ")
+        assert main.run_captured(["cache", "restore", "nope"])[:2] == (1, "MISS nope\n")
+        assert main.run_captured(["cache", "restore", "zlib"])[0] == 0
+
+        code, out, _ = main.run_captured(["cache", "stats"])
+        assert "Entries:  1" in out and "1 hits, 0 misses" in out
+        code, out, _ = main.run_captured(["cache", "prune", "--max-mb", "0"])
+        assert out.startswith("Removed 1 archive(s)")
+        assert main.run_captured(["cache", "key"])[0] == 2
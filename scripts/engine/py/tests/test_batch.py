@@ -0,0 +1,65 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+
+
+def _run_batch(monkeypatch, capsys, lines):
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(lines) + "\n"))
+    with pytest.raises(SystemExit):
+        main.cmd_batch(None)
+    return [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+
+
+class TestBatch:
+    def test_request_to_argv(self):
+        parser = main.build_parser()
+        assert main.request_to_argv(parser, {"cmd": "validate_target", "target": "libpng", "action": "install"}) == \
+            ["validate_target", "libpng", "--action", "install"]
+        assert main.request_to_argv(parser, {"cmd": "resolve_deps", "query": ["a", "b"]}) == ["resolve_deps", "a", "b"]
+        assert main.request_to_argv(parser, {"cmd": "search", "query": "gl", "installed": True}) == \
+            ["search", "gl", "--installed"]
+
+    def test_unknown_command_rejected(self):
+        with pytest.raises(ValueError):
+            main.request_to_argv(main.build_parser(), {"cmd": "nope"})
+
+    def test_streams_one_response_per_request(self, fake_tree, monkeypatch, capsys):
+        fake_tree.add_tool("flycast")
+        fake_tree.add_port("zlib")
+        fake_tree.add_port("libpng", deps=("zlib",))
+
+        responses = _run_batch(monkeypatch, capsys, [
+            '{"cmd": "validate_target", "target": "libpng", "id": 1}',
+            '{"argv": ["get_type", "flycast"]}',
+            '',
+            'not json',
+            '{"cmd": "daemon", "action": "status"}',
+            '{"cmd": "resolve_deps", "query": ["libpng"]}',
+        ])
+
+        assert len(responses) == 5
+        assert responses[0] == {"id": 1, "code": 0, "stdout": "port\n", "stderr": ""}
+        assert responses[1]["stdout"] == "tool\n"
+        assert responses[2]["code"] == 2
+        assert responses[3]["code"] == 2
+        assert responses[4]["stdout"] == "zlib libpng\n"
+
+    def test_commands_with_child_processes_are_rejected(self, tmp_path):
+        # Their children would write to the real stdout, between the JSON lines
+        requests = "\n".join(json.dumps(r) for r in (
+            {"argv": ["history_run", "t", "--", "echo", "raw"], "id": 1},
+            {"cmd": "build_ports", "ports": ["zlib"], "id": 2},
+            {"argv": ["get_type", "nothing"], "id": 3},
+        )) + "\n"
+        env = dict(os.environ, KOSAIO_DIR=str(tmp_path), KOSAIO_NO_DAEMON="1")
+        proc = subprocess.run([sys.executable, main.__file__, "batch"], input=requests, env=env,
+                              capture_output=True, text=True, timeout=30)
+        responses = [json.loads(line) for line in proc.stdout.splitlines()]
+        assert [(r["id"], r["code"]) for r in responses] == [(1, 2), (2, 2), (3, 1)]
+        assert "cannot run inside a batch" in responses[0]["stderr"]
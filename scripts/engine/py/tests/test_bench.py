@@ -0,0 +1,23 @@
+from bench.layout import build_layout
+from bench.suite import compare
+from services.graph import PortGraph
+
+
+class TestSyntheticLayout:
+    def test_layout_is_deterministic_and_acyclic(self, fake_tree, tmp_path):
+        first = build_layout(tmp_path / "a", ports=40, tools=12, seed=7)
+        second = build_layout(tmp_path / "b", ports=40, tools=12, seed=7)
+        assert first == second
+
+        graphs = [PortGraph.load(tmp_path / root / "sdk" / "kos-ports") for root in ("a", "b")]
+        assert graphs[0].edges == graphs[1].edges
+        assert any(graphs[0].edges.values())
+        assert graphs[0].issues() == []
+        assert len(graphs[0].order()) == 40
+
+    def test_compare_needs_relative_and_absolute_slowdown(self):
+        base = {"a": {"median_ms": 100.0}, "b": {"median_ms": 10.0}, "c": {"median_ms": 100.0}}
+        now = {"a": {"median_ms": 140.0}, "b": {"median_ms": 20.0}, "c": {"median_ms": 110.0},
+               "new": {"median_ms": 1.0}}
+        regressions = compare(now, base, threshold=0.25, min_delta=25.0)
+        assert len(regressions) == 1 and regressions[0].startswith("a:")
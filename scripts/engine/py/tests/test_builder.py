@@ -0,0 +1,129 @@
+import time
+
+from services.builder import JobServer, ParallelBuilder
+from services.graph import PortGraph
+from services.remotes import RemoteChecker
+
+# A port Makefile whose install target records start/end times and can fail on demand
+BUILD_MAKEFILE = """PORTNAME = {name}
+PORTVERSION = 2.0
+{deps}
+
+install:
+\t@echo start $$(date +%s.%N) >> {trace}
+\t@sleep {sleep}
+\t@test "{fail}" != "1"
+\t@echo "$(MAKEFLAGS)" > makeflags.txt
+\t@mkdir -p {include} && touch {include}/{name}.h
+\t@echo end $$(date +%s.%N) >> {trace}
+"""
+
+
+def _port(tree, name, deps=(), sleep=0.2, fail=False):
+    d = tree.ports_dir / name
+    d.mkdir(parents=True, exist_ok=True)
+    (d / "Makefile").write_text(BUILD_MAKEFILE.format(
+        name=name, deps=f"DEPENDENCIES = {' '.join(deps)}" if deps else "",
+        include=tree.ports_dir / "include" / name, trace=d / "trace", sleep=sleep, fail="1" if fail else "0"))
+
+
+def _spans(tree, name):
+    lines = (tree.ports_dir / name / "trace").read_text().split()
+    return float(lines[1]), float(lines[3])
+
+
+class TestJobServer:
+    def test_tokens(self):
+        js = JobServer(4)
+        try:
+            assert "--jobserver-auth=" in js.makeflags
+            tokens = [js.acquire() for _ in range(3)]
+            assert tokens == [b"+"] * 3
+            for t in tokens:
+                js.release(t)
+        finally:
+            js.close()
+
+
+class TestParallelBuilder:
+    def test_independent_ports_overlap_and_deps_wait(self, fake_tree, tmp_path):
+        _port(fake_tree, "zlib")
+        _port(fake_tree, "lua")
+        _port(fake_tree, "libpng", deps=("zlib",))
+        graph = PortGraph.load()
+
+        results = ParallelBuilder(graph, ["zlib", "lua", "libpng"], jobs=4, log_dir=tmp_path / "logs").run()
+        assert [r.status for r in results] == ["ok", "ok", "ok"]
+
+        z, l, p = _spans(fake_tree, "zlib"), _spans(fake_tree, "lua"), _spans(fake_tree, "libpng")
+        assert l[0] < z[1] and z[0] < l[1], "independent ports should build concurrently"
+        assert p[0] >= z[1], "libpng must wait for zlib"
+        assert "jobserver-auth" in (fake_tree.ports_dir / "zlib" / "makeflags.txt").read_text()
+        assert (fake_tree.ports_dir / "lib" / ".kos-ports" / "libpng").read_text().strip() == "2.0"
+        assert (tmp_path / "logs" / "zlib.log").exists()
+
+    def test_single_job_is_sequential(self, fake_tree, tmp_path):
+        _port(fake_tree, "a", sleep=0.1)
+        _port(fake_tree, "b", sleep=0.1)
+        results = ParallelBuilder(PortGraph.load(), ["a", "b"], jobs=1, log_dir=tmp_path).run()
+        assert [r.status for r in results] == ["ok", "ok"]
+        a, b = _spans(fake_tree, "a"), _spans(fake_tree, "b")
+        assert b[0] >= a[1]
+
+    def test_failure_only_skips_downstream(self, fake_tree, tmp_path):
+        _port(fake_tree, "zlib", fail=True)
+        _port(fake_tree, "libpng", deps=("zlib",))
+        _port(fake_tree, "sdl_image", deps=("libpng",))
+        _port(fake_tree, "lua")
+
+        start = time.monotonic()
+        results = {r.port: r for r in ParallelBuilder(
+            PortGraph.load(), ["zlib", "libpng", "sdl_image", "lua"], jobs=2, log_dir=tmp_path).run()}
+        assert time.monotonic() - start < 10
+
+        assert results["zlib"].status == "failed"
+        assert results["libpng"].status == "skipped" and results["libpng"].blocked_by == "zlib"
+        assert results["sdl_image"].status == "skipped"
+        assert results["lua"].status == "ok"
+        assert not (fake_tree.ports_dir / "libpng" / "trace").exists()
+
+    def test_concurrency_is_capped_by_jobs(self, fake_tree, tmp_path):
+        names = ["a", "b", "c", "d"]
+        for n in names:
+            _port(fake_tree, n, sleep=0.3)
+        ParallelBuilder(PortGraph.load(), names, jobs=2, log_dir=tmp_path).run()
+
+        spans = [_spans(fake_tree, n) for n in names]
+        peak = max(sum(1 for s, e in spans if s <= t < e) for t, _ in spans)
+        assert peak == 2
+
+    def test_tracking_files_match_a_serial_install(self, fake_tree, tmp_path, monkeypatch):
+        monkeypatch.setenv("KOS_BASE", str(tmp_path / "kos"))
+        monkeypatch.setattr(RemoteChecker, "heads", staticmethod(lambda pairs, **kw: {p: "abc123" for p in pairs}))
+        _port(fake_tree, "zlib", sleep=0.3)
+        _port(fake_tree, "lua", sleep=0.1)
+        _port(fake_tree, "libpng", deps=("zlib",))
+        makefile = fake_tree.ports_dir / "lua" / "Makefile"
+        makefile.write_text(makefile.read_text().replace("PORTVERSION", "GIT_REPOSITORY = https://example.com/lua.git\nPORTVERSION"))
+
+        results = ParallelBuilder(PortGraph.load(), ["zlib", "lua", "libpng"], jobs=4, log_dir=tmp_path / "logs").run()
+        assert [r.status for r in results] == ["ok", "ok", "ok"]
+
+        markers = fake_tree.ports_dir / "lib" / ".kos-ports"
+        assert (markers / "lua.hash").read_text() == "abc123\n"
+        assert not (markers / "zlib.hash").exists()
+        for name in ("zlib", "lua", "libpng"):
+            manifest = tmp_path / "kos" / ".kos-manifest" / f"{name}.manifest"
+            assert manifest.read_text() == f"{fake_tree.ports_dir / 'include' / name / name}.h\n"
+
+    def test_worker_exception_fails_the_port(self, fake_tree, tmp_path, monkeypatch):
+        def broken(port):
+            raise RuntimeError("disk on fire")
+
+        monkeypatch.setattr(ParallelBuilder, "_record_installed", staticmethod(broken))
+        _port(fake_tree, "zlib", sleep=0)
+        _port(fake_tree, "libpng", deps=("zlib",), sleep=0)
+        results = {r.port: r for r in ParallelBuilder(PortGraph.load(), ["zlib", "libpng"], log_dir=tmp_path).run()}
+        assert results["zlib"].status == "failed"
+        assert results["libpng"].status == "skipped"
+        assert "disk on fire" in (tmp_path / "zlib.log").read_text()
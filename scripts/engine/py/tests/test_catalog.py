@@ -0,0 +1,70 @@
+import json
+import os
+
+from core.catalog import catalog
+from core.manifest import ManifestParser
+from services.searcher import SearchService
+
+
+class TestCatalog:
+    def test_search_all_writes_index(self, fake_tree):
+        fake_tree.add_tool("flycast", desc="Emulator")
+        fake_tree.add_port("libpng", deps=("zlib",))
+        fake_tree.add_port("zlib")
+
+        ids = [m.id for m in SearchService.search_all("")]
+        assert ids == ["flycast", "libpng", "zlib"]
+        assert catalog.path.exists()
+
+        data = json.loads(catalog.path.read_text())
+        assert data["version"] == catalog.VERSION
+        assert len(data["sections"]["tools"]) == 1
+
+    def test_only_changed_makefiles_are_reparsed(self, fake_tree, monkeypatch):
+        fake_tree.add_port("zlib")
+        libpng = fake_tree.add_port("libpng", desc="PNG library")
+        SearchService.search_all("")
+
+        calls = []
+        original = ManifestParser.parse_port_makefile
+
+        def counting(path):
+            calls.append(path.parent.name)
+            return original(path)
+
+        monkeypatch.setattr(ManifestParser, "parse_port_makefile", staticmethod(counting))
+
+        # Fresh process: reload from disk, nothing changed
+        catalog.invalidate()
+        SearchService.search_all("")
+        assert calls == []
+
+        libpng.write_text(libpng.read_text().replace("PNG library", "Portable Network Graphics"))
+        os.utime(libpng, ns=(1, 1))
+        results = {m.id: m for m in SearchService.search_all("")}
+        assert calls == ["libpng"]
+        assert results["libpng"].desc == "Portable Network Graphics"
+
+    def test_removed_port_is_dropped(self, fake_tree):
+        fake_tree.add_port("zlib")
+        gone = fake_tree.add_port("libogg")
+        SearchService.search_all("")
+
+        gone.unlink()
+        gone.parent.rmdir()
+        assert [m.id for m in SearchService.search_all("")] == ["zlib"]
+
+    def test_corrupt_index_falls_back_to_scan(self, fake_tree):
+        fake_tree.add_tool("flycast")
+        catalog.path.parent.mkdir(parents=True, exist_ok=True)
+        catalog.path.write_text("{not json")
+        catalog.invalidate()
+
+        assert [m.id for m in SearchService.search_all("")] == ["flycast"]
+        assert json.loads(catalog.path.read_text())["version"] == catalog.VERSION
+
+    def test_rebuild_counts(self, fake_tree):
+        fake_tree.add_tool("flycast")
+        fake_tree.add_port("zlib")
+        fake_tree.add_port("libpng")
+        assert catalog.rebuild() == {"tools": 1, "ports": 2}
@@ -0,0 +1,93 @@
+import os
+import subprocess
+from pathlib import Path
+
+import main
+from core import fs
+from core.completion import complete, kind_for_action, targets_path, words_path
+from core.config import cfg
+
+KOSAIO_ROOT = Path(__file__).resolve().parents[4]
+
+
+def _tree(fake_tree):
+    fake_tree.add_tool("flycast")
+    fake_tree.add_tool("FlashTool")
+    fake_tree.add_port("libpng")
+    fake_tree.add_port("libGL")
+    fake_tree.add_port("zlib")
+    fake_tree.mark_installed("libpng")
+    (cfg.diagnostics_dir / "system.sh").write_text("")
+
+
+class TestComplete:
+    def test_prefix_matches_are_sorted_and_case_insensitive(self, fake_tree):
+        _tree(fake_tree)
+        assert complete("fl") == ["FlashTool", "flycast"]
+        assert complete("LIB") == ["libGL", "libpng"]
+        assert complete("lib", "tools") == []
+        assert complete("s", "tools") == ["system"]
+        assert complete("nope") == []
+        assert len(complete("")) == 6
+
+    def test_answers_from_the_id_file_without_parsing(self, fake_tree, monkeypatch):
+        _tree(fake_tree)
+        complete("")
+        assert targets_path().exists()
+
+        from core.names import NameIndex
+        monkeypatch.setattr(NameIndex, "_build", lambda self: (_ for _ in ()).throw(AssertionError("rebuilt")))
+        with fs.accounting() as stats:
+            assert complete("z", "ports") == ["zlib"]
+        assert stats["read"] == 1 and stats["list"] == 0 and stats["glob"] == 0
+
+    def test_new_port_invalidates_the_id_file(self, fake_tree):
+        _tree(fake_tree)
+        assert complete("sdl") == []
+        fake_tree.add_port("SDL")
+        os.utime(fake_tree.ports_dir, ns=(0, os.stat(fake_tree.ports_dir).st_mtime_ns + 1))
+        assert complete("sdl") == ["SDL"]
+
+    def test_installed_for_uninstall(self, fake_tree, capsys):
+        _tree(fake_tree)
+        assert kind_for_action("uninstall") == "installed"
+        assert kind_for_action("install") == "all"
+        assert complete("lib", "installed") == ["libpng"]
+
+        code, out, _ = main.run_captured(["complete", "l", "--action", "uninstall"])
+        assert (code, out) == (0, "libpng\n")
+        code, out, _ = main.run_captured(["complete", "l", "--action", "install"])
+        assert out.split() == ["libGL", "libpng"]
+
+    def test_rebuild_writes_shell_word_lists(self, fake_tree):
+        _tree(fake_tree)
+        complete("")
+        assert words_path("all").read_text().split() == ["FlashTool", "flycast", "libGL", "libpng", "system", "zlib"]
+        assert str(fake_tree.ports_dir) in words_path("all").with_name("all.dirs").read_text().splitlines()
+
+        assert main.run_captured(["complete", "--kind", "installed", "--write-words"])[:2] == (0, "")
+        assert words_path("installed").read_text() == "libpng\n"
+        assert str(cfg.state_dir / "host") in words_path("installed").with_name("installed.dirs").read_text()
+
+    def test_shell_reads_word_lists_without_python(self, fake_tree, tmp_path):
+        _tree(fake_tree)
+        main.run_captured(["complete", "--kind", "installed", "--write-words"])
+        shim = tmp_path / "bin"
+        shim.mkdir()
+        (shim / "python3").write_text(f"#!/bin/sh\ntouch {tmp_path / 'ran'}\nexit 1\n")
+        (shim / "python3").chmod(0o755)
+
+        def tab(prefix, action):
+            script = (f'source "{KOSAIO_ROOT}/scripts/common/completions.sh"; '
+                      f'_kosaio_complete_targets "{prefix}" "{action}"')
+            env = dict(os.environ, KOSAIO_DIR=str(KOSAIO_ROOT), KOSAIO_CACHE_DIR=str(cfg.cache_dir),
+                       PATH=f"{shim}:{os.environ['PATH']}")
+            return subprocess.run(["bash", "-c", script], env=env, capture_output=True, text=True).stdout.split()
+
+        assert tab("FL", "install") == ["FlashTool", "flycast"]
+        assert tab("l", "uninstall") == ["libpng"]
+        assert not (tmp_path / "ran").exists()
+
+        os.utime(fake_tree.ports_dir, ns=(0, os.stat(words_path("all")).st_mtime_ns + 10**9))
+        tab("l", "install")
+        assert (tmp_path / "ran").exists()
@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from core import daemon
+
+
+@pytest.fixture
+def sock_path(monkeypatch):
+    # AF_UNIX paths are limited to ~108 bytes, so avoid pytest's long tmp_path
+    path = Path(tempfile.mkdtemp(prefix="kd-")) / "engine.sock"
+    monkeypatch.setenv("KOSAIO_ENGINE_SOCKET", str(path))
+    return path
+
+
+def _serve(runner, idle_timeout=5):
+    d = daemon.EngineDaemon(runner, idle_timeout=idle_timeout)
+    t = threading.Thread(target=d.serve_forever, daemon=True)
+    t.start()
+    for _ in range(100):
+        if daemon.status():
+            break
+        time.sleep(0.02)
+    return d, t
+
+
+class TestEngineDaemon:
+    def test_forward_without_daemon_returns_none(self, sock_path):
+        assert daemon.forward(["get_type", "kos"]) is None
+
+    def test_forward_replays_output(self, sock_path, capsys):
+        seen = []
+
+        def runner(argv):
+            seen.append(argv)
+            return 3, "tool\n", "warn\n"
+
+        _, t = _serve(runner)
+        assert daemon.forward(["get_type", "kos"]) == 3
+        out, err = capsys.readouterr()
+        assert out == "tool\n"
+        assert err == "warn\n"
+        assert seen == [["get_type", "kos"]]
+
+        assert daemon.status()["requests"] == 1
+        assert daemon.stop()
+        t.join(2)
+        assert not t.is_alive()
+        assert not sock_path.exists()
+
+    def test_idle_timeout_exits(self, sock_path):
+        _, t = _serve(lambda argv: (0, "", ""), idle_timeout=1)
+        t.join(3)
+        assert not t.is_alive()
+        assert daemon.status() is None
+
+    def test_stale_socket_is_replaced(self, sock_path):
+        sock_path.write_text("")
+        _, t = _serve(lambda argv: (0, "ok\n", ""))
+        assert daemon.status() is not None
+        daemon.stop()
+        t.join(2)
+
+    def test_request_runs_with_client_env_and_cwd(self, sock_path, tmp_path, monkeypatch, capsys):
+        def runner(argv):
+            return 0, f"{os.getcwd()} {os.environ.get('KOS_CFLAGS')}\n", ""
+
+        _, t = _serve(runner)
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("KOS_CFLAGS", "-O3")
+        assert daemon.forward(["get_type", "kos"]) == 0
+        assert capsys.readouterr().out == f"{tmp_path} -O3\n"
+        daemon.stop()
+        t.join(2)
+
+    def test_accepted_request_is_not_retried_locally(self, sock_path, monkeypatch, capsys):
+        def slow(argv):
+            time.sleep(0.5)
+            return 0, "late\n", ""
+
+        monkeypatch.setattr(daemon, "REQUEST_TIMEOUT", 0.2)
+        _, t = _serve(slow)
+        assert daemon.forward(["get_type", "kos"]) == 1
+        assert "failed to answer" in capsys.readouterr().err
+        daemon.stop()
+        t.join(2)
+
+    def test_malformed_requests_keep_the_daemon_alive(self, sock_path):
+        import socket
+
+        _, t = _serve(lambda argv: (0, "ok\n", ""))
+        for body in (b"[]", b'"x"', b"{not json"):
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            s.connect(str(sock_path))
+            s.sendall(body)
+            s.shutdown(socket.SHUT_WR)
+            assert s.recv(1024) == b""
+            s.close()
+
+        reply = daemon._exchange({"argv": ["get_type"], "env": dict(os.environ), "cwd": ["not", "a", "path"]})
+        assert reply["code"] == 1 and "cannot run the request" in reply["stderr"]
+        reply = daemon._exchange({"argv": ["get_type"], "env": "nope"})
+        assert reply["code"] == 1
+        assert daemon.status()["requests"] == 2
+        daemon.stop()
+        t.join(2)
+        assert not t.is_alive()
+
+    def test_build_commands_run_in_the_caller(self, sock_path, tmp_path, monkeypatch):
+        import main
+
+        served = []
+        _, t = _serve(lambda argv: served.append(argv) or main.run_captured(argv))
+        workdir = tmp_path / "build"
+        workdir.mkdir()
+        env = dict(os.environ, KOSAIO_DIR=str(tmp_path), KOSAIO_ENGINE_SOCKET=str(sock_path))
+        env.pop("KOSAIO_NO_DAEMON", None)
+        proc = subprocess.run([sys.executable, main.__file__, "history_run", "t", "--", "pwd"],
+                              cwd=workdir, env=env, capture_output=True, text=True, timeout=30)
+        assert (proc.returncode, proc.stdout) == (0, f"{workdir}\n")
+        assert served == []
+        assert '"id":"t"' in (tmp_path / "data" / "history" / "builds.jsonl").read_text()
+        daemon.stop()
+        t.join(2)
@@ -0,0 +1,92 @@
+import hashlib
+import os
+
+import pytest
+
+import main
+from core.config import cfg
+from services.distfiles import DistStore
+
+TARBALL = b"SDL-1.2.15 source tarball\n" * 1000
+
+
+@pytest.fixture
+def store(fake_tree, tmp_path, monkeypatch):
+    monkeypatch.setenv("KOSAIO_DISTFILES", str(tmp_path / "distfiles"))
+    return DistStore.default()
+
+
+def _fetched(tree_dir, port, name="SDL-1.2.15.tar.gz", data=TARBALL):
+    """A port with a downloaded tarball in <tree>/<port>/dist."""
+    (tree_dir / port).mkdir(parents=True, exist_ok=True)
+    (tree_dir / port / "Makefile").write_text(f"PORTNAME = {port}\n")
+    if data is None:
+        return None
+    dist = tree_dir / port / "dist"
+    dist.mkdir(exist_ok=True)
+    (dist / name).write_bytes(data)
+    return dist / name
+
+
+class TestDistStore:
+    def test_add_links_duplicates_across_trees(self, fake_tree, store):
+        container = _fetched(fake_tree.ports_dir, "SDL")
+        host = _fetched(fake_tree.dev_ports_dir, "SDL")
+        # A git checkout in dist/ is not a distfile
+        (fake_tree.ports_dir / "SDL" / "dist" / "SDL-git").mkdir()
+
+        stats = store.add()
+        assert stats == {"files": 2, "new": 1, "linked": 1, "bytes_saved": len(TARBALL)}
+        sha = hashlib.sha256(TARBALL).hexdigest()
+        assert os.stat(container).st_ino == os.stat(host).st_ino == os.stat(store.path(sha)).st_ino
+        assert host.read_bytes() == TARBALL
+        assert store.stats()["objects"] == 1
+
+        # Nothing left to do the second time
+        assert store.add()["linked"] == 0
+
+    def test_dev_switch_skips_fetch(self, fake_tree, store, monkeypatch):
+        _fetched(fake_tree.ports_dir, "SDL")
+        _fetched(fake_tree.dev_ports_dir, "SDL", data=None)
+        store.add(["SDL"])
+
+        monkeypatch.setattr(cfg, "dev_mode", "1")
+        assert store.link() == [("SDL", "SDL-1.2.15.tar.gz", "linked")]
+        assert (fake_tree.dev_ports_dir / "SDL" / "dist" / "SDL-1.2.15.tar.gz").read_bytes() == TARBALL
+        assert store.link(["SDL"]) == [("SDL", "SDL-1.2.15.tar.gz", "present")]
+
+    def test_corrupt_object_is_not_handed_out(self, fake_tree, store, monkeypatch):
+        container = _fetched(fake_tree.ports_dir, "SDL")
+        _fetched(fake_tree.dev_ports_dir, "SDL", data=None)
+        store.add()
+        obj = store.path(hashlib.sha256(TARBALL).hexdigest())
+        obj.unlink()
+        obj.write_bytes(b"truncated")
+
+        monkeypatch.setattr(cfg, "dev_mode", "1")
+        assert store.link(["SDL"]) == [("SDL", "SDL-1.2.15.tar.gz", "missing")]
+        assert not obj.exists()
+        assert container.read_bytes() == TARBALL
+
+    def test_hashes_are_cached_until_the_file_changes(self, fake_tree, store):
+        path = _fetched(fake_tree.ports_dir, "SDL")
+        assert store.hash_files([path]) == [hashlib.sha256(TARBALL).hexdigest()]
+        path.write_bytes(b"new")
+        assert store.hash_files([path, path.with_name("missing")]) == [hashlib.sha256(b"new").hexdigest(), None]
+
+    def test_gc_reports_reclaimed_bytes(self, fake_tree, store):
+        _fetched(fake_tree.ports_dir, "SDL")
+        _fetched(fake_tree.ports_dir, "zlib", "zlib-1.3.tar.gz", b"z" * 500)
+        store.add()
+        # A duplicate fetched since, and zlib cleaned from the only tree holding it
+        _fetched(fake_tree.dev_ports_dir, "SDL")
+        os.unlink(fake_tree.ports_dir / "zlib" / "dist" / "zlib-1.3.tar.gz")
+
+        assert store.gc(dry_run=True)["bytes_reclaimed"] == 500
+        assert store.stats()["objects"] == 2
+
+        code, out, _ = main.run_captured(["distfiles", "gc"])
+        assert code == 0
+        assert f"({len(TARBALL) + 500} bytes)" in out
+        assert "1 duplicate(s) linked, 1 unreferenced object(s) removed" in out
+        assert store.stats()["objects"] == 1 and store.stats()["indexed"] == 1
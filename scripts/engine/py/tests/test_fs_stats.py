@@ -0,0 +1,94 @@
+"""
+Filesystem operation budgets per command.
+
+Each command runs in-process under core.fs accounting against trees of two
+sizes, as a fresh process would see them (persisted indexes warm, in-memory
+caches cold). Budgets are linear in the number of ports, so an accidental
+per-row directory scan or stat loop (O(n^2)) fails here before review.
+"""
+import pytest
+
+import main
+from core import fs
+from core.catalog import catalog
+from core.manifest import ManifestParser
+from core.names import names
+
+# command -> (argv, {kind: (per port, constant)})
+BUDGETS = {
+    "list_ports": (["list_ports"], {"stat": (1.25, 20), "list": (2.0, 20), "read": (0, 5)}),
+    "search": (["search", "port"], {"stat": (1.25, 30), "list": (2.0, 30), "read": (0, 5), "glob": (0, 2)}),
+    "get_installed_ids": (["get_installed_ids"], {"stat": (1.25, 30), "list": (2.0, 30), "read": (0, 5), "glob": (0, 2)}),
+    "resolve_deps": (["resolve_deps", "lib0"], {"stat": (1.25, 10), "list": (0, 3), "read": (0, 3)}),
+    "validate_target": (["validate_target", "lib0", "--action", "install"], {"stat": (0, 10), "list": (0, 2), "read": (0, 2)}),
+    "get_tool_path": (["get_tool_path", "lib0"], {"stat": (0, 10), "list": (0, 2), "read": (0, 2)}),
+}
+
+
+def _populate(tree, count):
+    tree.add_tool("flycast")
+    for i in range(count):
+        deps = [f"lib{i + 1}"] if i + 1 < count else []
+        tree.add_port(f"lib{i}", deps=deps)
+        if i % 2 == 0:
+            tree.add_port(f"lib{i}", ports_dir=tree.dev_ports_dir)
+        if i % 3 == 0:
+            tree.mark_installed(f"lib{i}")
+
+
+def _fresh_process():
+    catalog.invalidate()
+    names.invalidate()
+    ManifestParser._port_vars_cache.clear()
+
+
+def _count(argv):
+    _fresh_process()
+    main.run_captured(argv)
+    _fresh_process()
+    with fs.accounting() as stats:
+        code, _, err = main.run_captured(argv)
+    assert code == 0, err
+    return stats
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS))
+def test_filesystem_budget(name, fake_tree):
+    argv, budget = BUDGETS[name]
+    _populate(fake_tree, 40)
+    small = _count(argv)
+    _populate(fake_tree, 80)
+    large = _count(argv)
+
+    for stats, ports in ((small, 40), (large, 80)):
+        for kind in fs.KINDS:
+            per_port, constant = budget.get(kind, (0, 0))
+            assert stats[kind] <= per_port * ports + constant, stats.report(f"{name}@{ports}")
+
+
+class TestAccounting:
+    def test_counts_by_kind_and_caller(self, fake_tree):
+        fake_tree.add_port("zlib")
+        with fs.accounting() as stats:
+            fs.exists(fake_tree.ports_dir)
+            fs.read_text(fake_tree.ports_dir / "zlib" / "Makefile")
+            fs.rglob(fake_tree.ports_dir, "Makefile")
+        assert (stats["stat"], stats["read"], stats["glob"]) == (1, 1, 1)
+        caller = f"{__name__}.TestAccounting.test_counts_by_kind_and_caller"
+        assert stats.callers[("stat", caller)] == 1
+        assert stats.summary("x") == "x: 1 stat, 1 read, 1 glob"
+
+    def test_off_outside_accounting(self, fake_tree):
+        with fs.accounting() as stats:
+            pass
+        fs.exists(fake_tree.ports_dir)
+        assert stats.total == 0
+
+    def test_snapshot_reads_are_attributed_to_the_caller(self, fake_tree):
+        for i in range(5):
+            fake_tree.add_port(f"lib{i}")
+        snapshot = fs.FsSnapshot()
+        with fs.accounting() as stats:
+            snapshot.prefetch([fake_tree.ports_dir / f"lib{i}" for i in range(5)], workers=4)
+        assert stats["list"] == snapshot.reads
+        assert all(not caller.startswith("core.fs") for _, caller in stats.callers)
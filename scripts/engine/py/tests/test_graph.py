@@ -0,0 +1,58 @@
+from services.graph import GraphIssue, PortGraph
+from services.ports import PortService
+
+
+class TestPortGraph:
+    def test_dependencies_come_first(self):
+        g = PortGraph({"libpng": ["zlib"], "zlib": [], "sdl": ["libpng", "zlib"]})
+        order, issues = g.resolve(["sdl"])
+        assert order == ["zlib", "libpng", "sdl"]
+        assert issues == []
+
+    def test_multiple_roots_are_deduplicated(self):
+        g = PortGraph({"a": ["c"], "b": ["c"], "c": []})
+        order, _ = g.resolve(["a", "b"])
+        assert order == ["c", "a", "b"]
+
+    def test_cycle_is_reported_not_recursed(self):
+        g = PortGraph({"a": ["b"], "b": ["c"], "c": ["a"], "d": ["a"], "e": []})
+        order, issues = g.resolve(["d", "e"])
+        assert order == ["e"]
+        assert issues == [GraphIssue("cycle", "a", ["a", "b", "c", "a"])]
+        assert str(issues[0]) == "Dependency cycle: a -> b -> c -> a"
+
+    def test_self_dependency_is_a_cycle(self):
+        order, issues = PortGraph({"a": ["a"]}).resolve(["a"])
+        assert order == []
+        assert issues[0].path == ["a", "a"]
+
+    def test_missing_dependency_is_kept_as_leaf(self):
+        order, issues = PortGraph({"libpng": ["zlibx"]}).resolve(["libpng"])
+        assert order == ["zlibx", "libpng"]
+        assert issues == [GraphIssue("missing", "libpng", ["libpng", "zlibx"])]
+
+    def test_case_insensitive_roots(self):
+        g = PortGraph({"SDL": ["zlib"], "zlib": []})
+        assert g.resolve(["sdl"])[0] == ["zlib", "SDL"]
+
+    def test_rdeps(self):
+        g = PortGraph({"zlib": [], "libpng": ["zlib"], "sdl_image": ["libpng"], "freetype": ["zlib"], "lua": []})
+        assert g.rdeps("zlib") == ["freetype", "libpng", "sdl_image"]
+        assert g.rdeps("zlib", transitive=False) == ["freetype", "libpng"]
+        assert g.rdeps("lua") == []
+
+    def test_large_chain_does_not_overflow_stack(self):
+        n = 5000
+        edges = {f"p{i}": [f"p{i - 1}"] if i else [] for i in range(n)}
+        order, issues = PortGraph(edges).resolve([f"p{n - 1}"])
+        assert order[0] == "p0" and order[-1] == f"p{n - 1}"
+        assert issues == []
+
+
+class TestBulkResolution:
+    def test_resolve_bulk_from_tree(self, fake_tree):
+        fake_tree.add_port("zlib")
+        fake_tree.add_port("libpng", deps=("zlib",))
+        order, issues = PortService.resolve_bulk_dependencies(["libpng"])
+        assert order == ["zlib", "libpng"]
+        assert issues == []
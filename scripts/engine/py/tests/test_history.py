@@ -0,0 +1,100 @@
+import json
+
+import main
+from services import history
+from services.buildplan import BuildPlan
+from services.builder import ParallelBuilder
+from services.graph import PortGraph
+from services.history import BuildHistory, BuildRecord
+
+
+def _builds(item_id, *walls, kind="port", code=0):
+    for wall in walls:
+        BuildHistory.record(BuildRecord(item_id, kind, wall, exit_code=code))
+
+
+class TestBuildHistory:
+    def test_estimates(self, fake_tree):
+        _builds("zlib", 100, 10, 20, 30, 40, 50)
+        _builds("zlib", 999, code=2)
+        # Two steps of one tool action add up to one build
+        BuildHistory.record(BuildRecord("kos", "tool", 30, session="a"))
+        BuildHistory.record(BuildRecord("kos", "tool", 12, session="a"))
+
+        assert BuildHistory.estimates() == {"zlib": 30, "kos": 42}
+        assert [code for _, code in BuildHistory.builds()["zlib"]] == [0] * 6 + [2]
+
+    def test_compaction_keeps_newest_builds(self, fake_tree, monkeypatch):
+        monkeypatch.setattr(history, "COMPACT_BYTES", 2000)
+        _builds("zlib", *range(1, 41))
+        _builds("lua", 5)
+
+        builds = BuildHistory.builds()
+        assert [w for w, _ in builds["zlib"]] == list(range(41 - history.KEEP, 41))
+        assert builds["lua"] == [(5, 0)]
+
+    def test_history_run_command(self, fake_tree, monkeypatch):
+        monkeypatch.setenv("KOSAIO_BUILD_SESSION", "s1")
+        assert main.run_captured(["history_run", "--kind", "port", "zlib", "--", "sh", "-c", "exit 3"])[0] == 3
+        assert main.run_captured(["history_run", "kos", "--", "true"])[0] == 0
+        assert main.run_captured(["history_run", "kos", "--", "/nonexistent/make"])[0] == 127
+
+        records = [json.loads(line) for line in BuildHistory.path().read_text().splitlines()]
+        assert [(r["id"], r["kind"], r["exit"], r["session"]) for r in records] == [
+            ("zlib", "port", 3, "s1"), ("kos", "tool", 0, "s1")]
+        assert all(r["wall"] >= 0 and r["rss"] > 0 for r in records)
+
+        code, out, _ = main.run_captured(["history", "kos", "nope"])
+        assert out.splitlines()[1] == "nope 0 - -"
+        assert out.startswith("kos 1 ")
+
+
+class TestBuildPlan:
+    def test_critical_path_and_estimates(self, fake_tree):
+        fake_tree.add_tool("kos-chain", tool_type="core")
+        fake_tree.add_tool("kos", tool_type="core")
+        fake_tree.add_tool("sdl2-dc", tool_type="lib")
+        fake_tree.add_tool("mksdiso")
+        fake_tree.add_port("zlib")
+        fake_tree.add_port("libpng", deps=("zlib",))
+        estimates = {"kos-chain": 600, "kos": 120, "sdl2-dc": 90, "mksdiso": 10, "zlib": 20}
+
+        items = [("mksdiso", "tool"), ("libpng", "port"), ("zlib", "port"), ("sdl2-dc", "tool"),
+                 ("kos", "tool"), ("kos-chain", "tool")]
+        plan = BuildPlan.build(items, estimates)
+        assert plan.critical_path() == ["kos-chain", "kos", "sdl2-dc"]
+        # libpng never built: median of the known estimates
+        assert {e.id: e.source for e in plan.entries}["libpng"] == "default"
+        assert plan.cost["libpng"] == 90
+        assert plan.serial() == 930
+        assert plan.makespan(1) == 930
+        assert plan.makespan(4) == 810
+
+    def test_command(self, fake_tree):
+        fake_tree.add_tool("kos", tool_type="core")
+        fake_tree.add_tool("sdl2-dc", tool_type="lib")
+        _builds("kos", 100, kind="tool")
+
+        code, out, _ = main.run_captured(["build_plan", "sdl2-dc", "kos", "--jobs", "2"])
+        assert code == 0
+        assert out.splitlines() == [
+            "ITEM kos tool 100.0 history",
+            "ITEM sdl2-dc tool 100.0 default",
+            "CRITICAL 200.0 kos sdl2-dc",
+            "ESTIMATE serial=200.0 parallel=200.0 jobs=2 known=1/2",
+        ]
+
+    def test_builder_starts_long_chains_first(self, fake_tree, tmp_path):
+        for name, deps in (("leaf", ()), ("base", ()), ("mid", ("base",)), ("top", ("mid",))):
+            port = fake_tree.add_port(name, deps=deps)
+            port.write_text(port.read_text().replace("include ${KOS_PORTS}/scripts/kos-ports.mk\n", "")
+                            + f"install:\n\t@echo {name} >> {tmp_path / 'order'}\n")
+        _builds("leaf", 20)
+        _builds("base", 10)
+
+        results = ParallelBuilder(PortGraph.load(), ["leaf", "base", "mid", "top"], jobs=1,
+                                  log_dir=tmp_path / "logs").run()
+        assert [r.status for r in results] == ["ok"] * 4
+        # Bottom levels (unknown ports cost the median, 15): base 40, mid 30, leaf 20, top 15
+        assert (tmp_path / "order").read_text().split() == ["base", "mid", "leaf", "top"]
+        assert {"leaf", "base", "mid", "top"} <= set(BuildHistory.estimates())
@@ -51,3 +51,61 @@ class TestManifestParser:
         pipe = m.to_pipe_string()
         # id|name|desc|tags|type|path = 5 delimiters = 6 fields
         assert pipe.count("|") == 5
+
+SAMPLE_PORT_MAKEFILE = """# libpng port
+PORTNAME = libpng
+PORTVERSION = 1.6.43
+MAINTAINER = Someone <someone@example.com>
+SHORT_DESC = PNG | image library
+GIT_REPOSITORY = https://example.com/libpng.git
+GIT_BRANCH = main
+DEPENDENCIES = zlib \\
+	libfoo # optional extras
+PORTVERSION = 9.9.9
+
+# Recipes and conditionals are ignored
+install:
+	PORTVERSION=0 $(MAKE) stuff
+"""
+
+class TestPortMakefileParser:
+    def test_single_pass_fields(self, tmp_path):
+        mf = tmp_path / "libpng" / "Makefile"
+        mf.parent.mkdir()
+        mf.write_text(SAMPLE_PORT_MAKEFILE)
+        m = ManifestParser.parse_port_makefile(mf)
+        assert m.id == "libpng"
+        assert m.version == "1.6.43"
+        assert m.desc == "PNG   image library"
+        assert m.repo == "https://example.com/libpng.git"
+        assert m.branch == "main"
+        assert m.deps == ["zlib", "libfoo"]
+        assert ManifestParser.read_port_vars(mf)["MAINTAINER"] == "Someone <someone@example.com>"
+
+    def test_empty_assignment_does_not_swallow_next_line(self, tmp_path):
+        mf = tmp_path / "zlib" / "Makefile"
+        mf.parent.mkdir()
+        mf.write_text("PORTNAME = zlib\nDEPENDENCIES =\nSHORT_DESC =\n\ninclude foo.mk\n")
+        m = ManifestParser.parse_port_makefile(mf)
+        assert m.deps == []
+        assert m.desc == "No description"
+
+    def test_makefile_read_once_per_mtime(self, tmp_path, monkeypatch):
+        mf = tmp_path / "zlib" / "Makefile"
+        mf.parent.mkdir()
+        mf.write_text("PORTVERSION = 1.0\n")
+
+        reads = []
+        original = ManifestParser._parse_make_assignments
+        monkeypatch.setattr(ManifestParser, "_parse_make_assignments",
+                            staticmethod(lambda c: reads.append(c) or original(c)))
+
+        for _ in range(3):
+            assert ManifestParser.parse_port_makefile(mf).version == "1.0"
+        assert len(reads) == 1
+
+        mf.write_text("PORTVERSION = 1.1\n")
+        import os
+        os.utime(mf, ns=(1, 1))
+        assert ManifestParser.parse_port_makefile(mf).version == "1.1"
+        assert len(reads) == 2
@@ -0,0 +1,96 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import main
+from services.mirrors import MirrorSet
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+GIT = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", "-c", "init.defaultBranch=master"]
+KOSAIO_ROOT = Path(__file__).resolve().parents[4]
+
+
+def _upstream(root, name):
+    """Work tree plus bare 'remote' with one commit; returns (work, url)."""
+    work, bare = root / f"{name}-work", root / f"{name}.git"
+    subprocess.run(GIT + ["init", "-q", str(work)], check=True)
+    _commit(work, "initial")
+    subprocess.run(["git", "clone", "-q", "--bare", str(work), str(bare)], check=True)
+    subprocess.run(["git", "-C", str(work), "remote", "add", "origin", str(bare)], check=True)
+    return work, str(bare)
+
+
+def _commit(work, message):
+    (work / "file.txt").write_text(message + "\n")
+    subprocess.run(GIT + ["-C", str(work), "add", "file.txt"], check=True)
+    subprocess.run(GIT + ["-C", str(work), "commit", "-q", "-m", message], check=True)
+    return subprocess.run(["git", "-C", str(work), "rev-parse", "HEAD"], check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def _has(git_dir, sha):
+    return subprocess.run(["git", "--git-dir", str(git_dir), "cat-file", "-e", sha]).returncode == 0
+
+
+@pytest.fixture
+def mirrors(fake_tree, tmp_path, monkeypatch):
+    monkeypatch.setenv("KOSAIO_MIRRORS", str(tmp_path / "mirrors"))
+    return MirrorSet.default()
+
+
+class TestMirrorSet:
+    def test_ensure_and_concurrent_sync(self, mirrors, tmp_path):
+        work_a, url_a = _upstream(tmp_path, "kos")
+        work_b, url_b = _upstream(tmp_path, "sdl")
+        path = mirrors.ensure(url_a)
+        assert path == mirrors.path(url_a) and path.name.startswith("kos-")
+        assert mirrors.ensure(url_a) == path
+
+        new_a = _commit(work_a, "second")
+        subprocess.run(["git", "-C", str(work_a), "push", "-q", "origin", "master"], check=True)
+        results = mirrors.sync([url_a, url_b, url_a, str(tmp_path / "missing.git")], jobs=3)
+        assert [(r.url, r.state) for r in results] == [
+            (url_a, "fetched"), (url_b, "cloned"), (str(tmp_path / "missing.git"), "failed")]
+        assert _has(path, new_a)
+        assert sorted(mirrors.urls()) == sorted([url_a, url_b])
+
+    def test_disabled(self, fake_tree, monkeypatch, tmp_path):
+        monkeypatch.setenv("KOSAIO_MIRRORS", "off")
+        _, url = _upstream(tmp_path, "kos")
+        assert MirrorSet.default().ensure(url) is None
+        assert main.run_captured(["mirror_path", "--ensure", url])[0] == 1
+
+    def test_tool_repos_and_command(self, fake_tree, mirrors, tmp_path):
+        _, url = _upstream(tmp_path, "kos")
+        tool = fake_tree.add_tool("kos", tool_type="core")
+        tool.write_text(tool.read_text() + f'KOSAIO_TOOL_REPO="{url}"\n')
+        fake_tree.add_tool("nothing")
+        assert MirrorSet.tool_repos() == [url]
+
+        assert main.run_captured(["mirror_path", url])[0] == 1
+        assert main.run_captured(["mirror_sync", "--tools"])[1] == f"CLONED {url}\n"
+        assert main.run_captured(["mirror_sync"])[1] == f"FETCHED {url}\n"
+        code, out, _ = main.run_captured(["mirror_path", url])
+        assert code == 0 and out.strip() == str(mirrors.path(url))
+
+    def test_shell_clone_borrows_from_mirror(self, mirrors, tmp_path):
+        _, url = _upstream(tmp_path, "kos")
+        target = tmp_path / "clone"
+        script = (
+            'set -Eeuo pipefail; log_info() { :; }; '
+            f'source "{KOSAIO_ROOT}/scripts/common/git_utils.sh"; '
+            f'kosaio_git_clone --branch master "{url}" "{target}"'
+        )
+        env = dict(os.environ, KOSAIO_DIR=str(KOSAIO_ROOT), KOSAIO_MIRRORS=str(mirrors.root))
+        subprocess.run(["bash", "-c", script], check=True, env=env, capture_output=True)
+
+        alternates = (target / ".git" / "objects" / "info" / "alternates").read_text().strip()
+        assert Path(alternates) == mirrors.path(url) / "objects"
+        assert (target / "file.txt").read_text() == "initial\n"
+
+    def test_mirror_commands_never_use_the_daemon(self):
+        assert {"mirror_path", "mirror_sync"} <= main.LOCAL_COMMANDS
@@ -0,0 +1,69 @@
+import json
+import os
+
+from core.config import cfg
+from core.names import NameIndex, alias, names
+from services.ports import PortService
+from services.searcher import SearchService
+
+
+class TestNameIndex:
+    def test_identifies_tools_core_and_ports(self, fake_tree):
+        fake_tree.add_tool("flycast")
+        fake_tree.add_port("SDL")
+        (cfg.diagnostics_dir / "system.sh").write_text("")
+
+        assert SearchService.identify_target("FlyCast") == "tool"
+        assert SearchService.identify_target("sys") == "core"
+        assert SearchService.identify_target("sdl") == "port"
+        assert SearchService.identify_target("nope") is None
+        assert PortService.resolve_port_name("sdl") == "SDL"
+        assert PortService.resolve_port_name("../SDL") is None
+
+    def test_aliases_come_from_one_table(self):
+        assert alias("SYS") == "system"
+        assert alias("kosaio") == "self"
+        assert alias("Flycast") == "flycast"
+
+    def test_persisted_index_is_reused_until_a_directory_changes(self, fake_tree, monkeypatch):
+        fake_tree.add_port("zlib")
+        assert names.lookup("port", "ZLIB") == "zlib"
+        assert json.loads(names.path.read_text())["port"] == ["zlib"]
+
+        builds = []
+        original = NameIndex._build
+        monkeypatch.setattr(NameIndex, "_build", lambda self: builds.append(1) or original(self))
+
+        # New process, nothing changed: served from names.json
+        names.invalidate()
+        assert names.lookup("port", "zlib") == "zlib"
+        assert builds == []
+
+        # A new port directory bumps kos-ports' mtime and forces a rebuild
+        fake_tree.add_port("libpng")
+        os.utime(fake_tree.ports_dir, ns=(0, os.stat(fake_tree.ports_dir).st_mtime_ns + 1))
+        names.invalidate()
+        assert names.lookup("port", "LibPNG") == "libpng"
+        assert builds == [1]
+
+    def test_installed_version_via_canonical_name(self, fake_tree):
+        fake_tree.add_port("SDL")
+        fake_tree.mark_installed("SDL", version="2.0")
+        assert cfg.get_installed_version("sdl", mode="0") == "2.0"
+
+    def test_manifest_paths_from_one_registry_walk(self, fake_tree, monkeypatch):
+        tool = fake_tree.add_tool("flycast")
+        nested = fake_tree.registry_dir / "emulators"
+        nested.mkdir()
+        (nested / "redream.tool").write_text("")
+        (cfg.diagnostics_dir / "self.sh").write_text("")
+
+        walks = []
+        real_walk = os.walk
+        monkeypatch.setattr(os, "walk", lambda *a, **k: walks.append(a) or real_walk(*a, **k))
+
+        assert SearchService.get_manifest_path("flycast") == tool
+        assert SearchService.get_manifest_path("Redream") == nested / "redream.tool"
+        assert SearchService.get_manifest_path("kosaio") == cfg.diagnostics_dir / "self.sh"
+        assert SearchService.get_manifest_path("nope") is None
+        assert len(walks) == 1
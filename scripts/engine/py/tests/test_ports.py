@@ -21,3 +21,48 @@ class TestPortNameSanitization:
 
     def test_dotdot_name_rejected(self):
         assert PortService._sanitize_port_name("..") is None
+
+
+class TestPortInfoBulk:
+    def _tree(self, fake_tree):
+        fake_tree.add_port("SDL", version="2.0", desc="It's $(HOME) `x`", deps=("zlib",))
+        fake_tree.add_port("zlib", version="1.3")
+        fake_tree.mark_installed("SDL", version="1.9")
+        fake_tree.mark_installed("SDL", version="2.0", ports_dir=fake_tree.dev_ports_dir)
+        (fake_tree.ports_dir / "lib" / ".kos-ports" / "SDL.hash").write_text("abc123\n")
+
+    def test_records_in_query_order_with_versions_and_hashes(self, fake_tree):
+        self._tree(fake_tree)
+        sdl, missing, zlib = PortService.port_info_bulk(["sdl", "nope", "zlib"])
+        assert missing is None
+        assert list(sdl) == list(PortService.INFO_FIELDS)
+        assert (sdl["PORTNAME"], sdl["PORTVERSION"], sdl["DEPENDENCIES"]) == ("SDL", "2.0", "zlib")
+        assert (sdl["INSTALLED_CONTAINER"], sdl["INSTALLED_HOST"]) == ("1.9", "2.0")
+        assert (sdl["HASH_CONTAINER"], sdl["HASH_HOST"]) == ("abc123", "")
+        assert zlib["INSTALLED_CONTAINER"] == zlib["INSTALLED_HOST"] == ""
+
+    def test_formats(self, fake_tree):
+        import json
+        import subprocess
+
+        import main
+
+        self._tree(fake_tree)
+        code, out, _ = main.run_captured(["port_info", "sdl", "nope", "--format", "json"])
+        data = json.loads(out)
+        assert code == 1 and [d["found"] for d in data] == [True, False]
+        assert data[0]["query"] == "sdl" and data[0]["HASH_CONTAINER"] == "abc123"
+
+        code, out, _ = main.run_captured(["port_info", "zlib", "--format", "nul"])
+        fields = out.split("\0")
+        assert code == 0 and fields[:3] == ["QUERY=zlib", "FOUND=1", "PORTNAME=zlib"] and fields[-2:] == ["", ""]
+
+        code, out, _ = main.run_captured(["port_info", "sdl", "zlib", "--format", "shell"])
+        script = out + 'printf "%s|%s|%s" "${PORT_INFO_NAMES[sdl]}" "${PORT_INFO[SDL,SHORT_DESC]}" "${PORT_INFO[zlib,PORTVERSION]}"'
+        shell = subprocess.run(["bash", "-c", script], capture_output=True, text=True)
+        assert shell.stdout == "SDL|It's $(HOME) `x`|1.3"
+
+        code, out, _ = main.run_captured(["port_info", "zlib"])
+        assert code == 0 and out.splitlines()[0] == "PORTNAME=zlib"
+        assert main.run_captured(["port_info", "nope"])[:2] == (1, "")
+        assert main.run_captured(["port_info", "zlib", "--format", "shell", "--var", "x;rm"])[0] == 2
@@ -0,0 +1,52 @@
+import io
+import pstats
+import time
+
+import pytest
+
+from core import profiling
+from core.profiling import run_profiled, span, spans
+from services.presenter import Presenter
+
+
+class TestProfiling:
+    def test_span_is_a_noop_outside_profiled_runs(self):
+        with span("ports scan"):
+            pass
+        assert span("a") is span("b")
+
+    def test_nested_spans_are_exclusive(self, fake_tree):
+        def work():
+            with span("rendering"):
+                time.sleep(0.02)
+                with span("status evaluation"):
+                    time.sleep(0.03)
+
+        out = io.StringIO()
+        run_profiled(work, "unit", out=out)
+        phases = spans()
+        assert 0.015 < phases["rendering"][0] < 0.03
+        assert phases["status evaluation"][0] >= 0.03
+        assert "--- phases" in out.getvalue()
+
+    def test_writes_stats_and_reports_phases_even_on_exit(self, fake_tree, capsys):
+        for i in range(3):
+            fake_tree.add_port(f"lib{i}")
+
+        def command():
+            Presenter.render_ports_table()
+            raise SystemExit(0)
+
+        with pytest.raises(SystemExit):
+            run_profiled(command, "list_ports")
+
+        captured = capsys.readouterr()
+        assert "lib2" in captured.out
+        assert "status evaluation" in captured.err and "ports scan" in captured.err
+        assert "--- phases" not in captured.out
+        assert spans()["status evaluation"][1] == 3
+        assert not profiling._recorder.enabled
+
+        prof = list((fake_tree.kosaio_dir / "data" / "logs" / "profiles").glob("list_ports-*.prof"))
+        assert len(prof) == 1
+        assert pstats.Stats(str(prof[0])).total_calls > 0
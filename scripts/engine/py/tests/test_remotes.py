@@ -0,0 +1,103 @@
+import shutil
+import subprocess
+
+import pytest
+
+import main
+from services.remotes import RemoteChecker
+from services.updates import UpdatePlanner
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+GIT = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", "-c", "init.defaultBranch=master"]
+
+
+def _bare_repo(root, name, branches=("master",)):
+    """Bare repository with one commit per branch; returns (url, {branch: sha})."""
+    work, bare = root / f"{name}-work", root / f"{name}.git"
+    subprocess.run(GIT + ["init", "-q", str(work)], check=True)
+    heads = {}
+    for branch in branches:
+        subprocess.run(GIT + ["-C", str(work), "checkout", "-q", "-B", branch], check=True)
+        subprocess.run(GIT + ["-C", str(work), "commit", "-q", "--allow-empty", "-m", branch], check=True)
+        heads[branch] = subprocess.run(["git", "-C", str(work), "rev-parse", "HEAD"], check=True,
+                                       capture_output=True, text=True).stdout.strip()
+    subprocess.run(["git", "clone", "-q", "--bare", str(work), str(bare)], check=True)
+    return str(bare), heads
+
+
+def _git_port(fake_tree, name, repo, branch="master", version="git", installed_hash=None):
+    path = fake_tree.add_port(name, version=version)
+    path.write_text(path.read_text() + f"GIT_REPOSITORY = {repo}\nGIT_BRANCH = {branch}\n")
+    fake_tree.mark_installed(name, version=version)
+    if installed_hash is not None:
+        (fake_tree.ports_dir / "lib" / ".kos-ports" / f"{name}.hash").write_text(installed_hash + "\n")
+
+
+class TestRemoteChecker:
+    def test_states_against_local_bare_repos(self, fake_tree, tmp_path):
+        repo, heads = _bare_repo(tmp_path, "lib", branches=("master", "dev"))
+        _git_port(fake_tree, "fresh", repo, installed_hash=heads["master"])
+        _git_port(fake_tree, "stale", repo, branch="dev", installed_hash=heads["master"])
+        _git_port(fake_tree, "nohash", repo)
+        _git_port(fake_tree, "gone", str(tmp_path / "missing.git"))
+        _git_port(fake_tree, "nobranch", repo, branch="nope")
+        fake_tree.add_port("plain")
+
+        results = RemoteChecker.check(["fresh", "stale", "nohash", "gone", "nobranch", "plain"], jobs=4, ttl=0)
+        states = {r.port: (r.state, r.remote) for r in results}
+        assert list(states) == ["fresh", "stale", "nohash", "gone", "nobranch"]
+        assert states["fresh"] == ("current", heads["master"])
+        assert states["stale"] == ("behind", heads["dev"])
+        assert states["nohash"][0] == "behind"
+        assert states["gone"] == states["nobranch"] == ("unknown", "")
+
+    def test_ttl_cache(self, fake_tree, tmp_path):
+        repo, heads = _bare_repo(tmp_path, "lib")
+        _git_port(fake_tree, "lib", repo, installed_hash=heads["master"])
+        assert RemoteChecker.check(["lib"], ttl=60)[0].state == "current"
+
+        # The remote disappears: a fresh cache entry still answers, ttl=0 asks again
+        shutil.rmtree(repo)
+        assert RemoteChecker.check(["lib"], ttl=60)[0].state == "current"
+        assert RemoteChecker.check(["lib"], ttl=0)[0].state == "unknown"
+
+    def test_command_and_plan(self, fake_tree, tmp_path):
+        repo, heads = _bare_repo(tmp_path, "lib", branches=("master", "dev"))
+        _git_port(fake_tree, "fresh", repo, installed_hash=heads["master"])
+        _git_port(fake_tree, "stale", repo, branch="dev", installed_hash=heads["master"])
+
+        code, out, _ = main.run_captured(["remote_heads", "--refresh"])
+        assert code == 0
+        assert out.splitlines() == [f"CURRENT fresh {heads['master']} {heads['master']}",
+                                    f"BEHIND stale {heads['dev']} {heads['master']}"]
+
+        code, out, _ = main.run_captured(["remote_heads", "stale", "--format", "shell"])
+        shell = subprocess.run(["bash", "-c", out + 'printf "%s" "${PORT_REMOTE[stale]}"'],
+                               capture_output=True, text=True)
+        assert shell.stdout == heads["dev"]
+
+        plan = {i.id: i.state for i in UpdatePlanner.plan_ports(remote=True)}
+        assert plan == {"fresh": "ok", "stale": "bump"}
+        assert {i.state for i in UpdatePlanner.plan_ports()} == {"check"}
+
+    def test_git_tools_compare_local_head(self, fake_tree, tmp_path, monkeypatch):
+        from core.config import cfg
+
+        monkeypatch.setenv("KOSAIO_REMOTE_TTL", "0")
+        repo, heads = _bare_repo(tmp_path, "tool", branches=("master",))
+        states = fake_tree.kosaio_dir / "data" / "states" / "container"
+        states.mkdir(parents=True, exist_ok=True)
+        for tool_id in ("current", "lagging", "plain"):
+            fake_tree.add_tool(tool_id)
+            (states / tool_id).write_text("")
+        for tool_id in ("current", "lagging"):
+            subprocess.run(["git", "clone", "-q", repo, str(cfg.get_tool_dir(tool_id))], check=True)
+        subprocess.run(GIT + ["-C", str(cfg.get_tool_dir("lagging")), "commit", "-q", "--allow-empty", "-m", "local"],
+                       check=True)
+
+        plan = {i.id: (i.state, i.detail) for i in UpdatePlanner.plan_tools(remote=True)}
+        assert plan["current"] == ("ok", heads["master"][:12])
+        assert plan["lagging"][0] == "bump"
+        assert plan["plain"] == ("check", "lifecycle")
+        assert {i.state for i in UpdatePlanner.plan_tools()} == {"check"}
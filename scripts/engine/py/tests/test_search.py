@@ -0,0 +1,104 @@
+import os
+import time
+
+from core.manifest import Manifest
+from services.search_index import SearchIndex, tokenize
+from services.searcher import SearchService
+
+
+def _m(item_id, desc="", tags="", item_type="port", name=None):
+    return Manifest(item_id, name or item_id, desc, tags, item_type, f"/x/{item_id}")
+
+
+CORPUS = [
+    _m("libpng", "PNG image library", "image"),
+    _m("zlib", "Compression library"),
+    _m("GLdc", "OpenGL 1.x implementation for Dreamcast"),
+    _m("libtremor", "Integer-only Ogg Vorbis decoder"),
+    _m("lwip", "Lightweight TCP/IP stack"),
+    _m("cppcore", "C++ runtime helpers"),
+    _m("flycast", "Dreamcast emulator", "emulator,png", "tool"),
+    _m("dcemu", "Another emulator frontend"),
+]
+
+
+class TestSearchIndex:
+    def test_ranks_id_over_tag_over_description(self):
+        ids = [m.id for m in SearchIndex(CORPUS).search("png")]
+        # Substring of the id beats an exact tag hit
+        assert ids == ["libpng", "flycast"]
+        # Tag hit beats a description-only hit
+        assert [m.id for m in SearchIndex(CORPUS).search("emulator")] == ["flycast", "dcemu"]
+
+    def test_query_is_not_a_regex(self):
+        assert tokenize("C++ (beta)*") == ["c++", "beta"]
+        assert [m.id for m in SearchIndex(CORPUS).search("c++")] == ["cppcore"]
+        assert SearchIndex(CORPUS).search("[unclosed") == []
+
+    def test_queries_without_tokens_match_substrings(self):
+        corpus = CORPUS + [_m("sh4_zam", "Fixed-point math")]
+        assert [m.id for m in SearchIndex(corpus).search("_")] == ["sh4_zam"]
+        assert [m.id for m in SearchIndex(corpus).search("-")] == ["libtremor", "sh4_zam"]
+        assert SearchIndex(corpus).search("%") == []
+
+    def test_typos_fall_back_to_trigram_similarity(self):
+        assert [m.id for m in SearchIndex(CORPUS).search("flycst")] == ["flycast"]
+        assert [m.id for m in SearchIndex(CORPUS).search("compresion")] == ["zlib"]
+
+    def test_synonyms_and_all_terms_required(self):
+        assert [m.id for m in SearchIndex(CORPUS).search("opengl")] == ["GLdc"]
+        assert {m.id for m in SearchIndex(CORPUS).search("audio")} == {"libtremor"}
+        assert [m.id for m in SearchIndex(CORPUS).search("image library")] == ["libpng"]
+
+    def test_limit_returns_top_k(self):
+        ids = [m.id for m in SearchIndex(CORPUS).search("library", limit=1)]
+        assert len(ids) == 1
+
+    def test_query_cost_does_not_grow_with_catalog(self):
+        big = [_m(f"port{i}", f"generated library number {i}") for i in range(5000)]
+        index = SearchIndex(CORPUS + big)
+        start = time.perf_counter()
+        for _ in range(100):
+            found = index.search("libpng", limit=10)
+        assert found[0].id == "libpng"
+        assert (time.perf_counter() - start) / 100 < 0.005
+
+
+class TestSearchService:
+    def test_search_all_limit_and_empty_query(self, fake_tree):
+        fake_tree.add_tool("flycast", desc="Dreamcast emulator")
+        fake_tree.add_port("libpng", desc="PNG library")
+        fake_tree.add_port("zlib", desc="Compression library")
+
+        assert [m.id for m in SearchService.search_all("")] == ["flycast", "libpng", "zlib"]
+        assert [m.id for m in SearchService.search_all("library", limit=1)] in (["libpng"], ["zlib"])
+        assert SearchService.search_all("c++") == []
+
+    def test_repeated_queries_reuse_the_index(self, fake_tree, monkeypatch):
+        import services.search_index as search_index
+        from core.names import names
+
+        fake_tree.add_port("libpng", desc="PNG library")
+        assert [m.id for m in SearchService.search_ports("png")] == ["libpng"]
+
+        builds = []
+        index_class = search_index.SearchIndex
+        monkeypatch.setattr(search_index, "SearchIndex", lambda docs: builds.append(1) or index_class(docs))
+        names.invalidate()
+        assert [m.id for m in SearchService.search_ports("png")] == ["libpng"]
+        assert builds == []
+
+        # A new port directory changes the generation
+        fake_tree.add_port("pngquant", desc="PNG quantizer")
+        names.invalidate()
+        assert [m.id for m in SearchService.search_ports("png")] == ["pngquant", "libpng"]
+        assert len(builds) == 1
+
+    def test_in_place_makefile_edit_is_searchable(self, fake_tree):
+        import main
+
+        path = fake_tree.add_port("zlib", desc="Compression library")
+        assert main.run_captured(["search", "zebra"])[1].count("zlib") == 0
+        path.write_text(path.read_text().replace("Compression library", "zebra stripes"))
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+        assert "zlib" in main.run_captured(["search", "zebra"])[1]
@@ -0,0 +1,71 @@
+"""
+Startup budget for the commands the shell runs on every prompt/shell start.
+
+Each command is run in a fresh interpreter with `-X importtime`. We assert
+both which engine modules get loaded (deterministic) and the total import
+time beyond a bare interpreter (generous, but catches eager-import regressions).
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+MAIN_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# Total import time (microseconds) allowed on top of `python -c pass`
+IMPORT_BUDGET_US = 120_000
+
+# Lifecycle lookups are answered by the name index alone
+INDEX_ONLY = {"services.presenter", "services.status", "services.ui", "services.searcher",
+              "core.catalog", "core.manifest", "unicodedata", "subprocess", "cProfile"}
+
+FAST_COMMANDS = {
+    "get_tool_path": (["get_tool_path", "kos"], INDEX_ONLY | {"json"}),
+    "get_tool_path_port": (["get_tool_path", "libpng"], INDEX_ONLY),
+    "render_banner": (["render_banner", "master", "abcdef1", "2026-01-01"],
+                      {"services.searcher", "services.status", "core.catalog", "core.manifest", "json"}),
+    "get_type": (["get_type", "kos"], INDEX_ONLY),
+    "get_manifest_path": (["get_manifest_path", "kos"], INDEX_ONLY),
+    "complete": (["complete", "k", "--action", "install"], INDEX_ONLY | {"json"}),
+}
+
+
+def _importtime(args, env):
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                          env=env, capture_output=True, text=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(cumulative), not name.startswith("  "))
+    return modules
+
+
+def _top_level_total(modules, exclude=()):
+    return sum(c for name, (c, top) in modules.items() if top and name not in exclude)
+
+
+@pytest.fixture(scope="module")
+def engine_env(tmp_path_factory):
+    env = dict(os.environ)
+    env["KOSAIO_NO_DAEMON"] = "1"
+    env["KOSAIO_ENGINE_SOCKET"] = str(tmp_path_factory.mktemp("sock") / "none.sock")
+    return env
+
+
+@pytest.mark.parametrize("name", sorted(FAST_COMMANDS))
+def test_startup_import_budget(name, engine_env):
+    args, forbidden = FAST_COMMANDS[name]
+    baseline = _importtime(["-c", "pass"], engine_env)
+
+    # First run warms __pycache__; keep the best of the following runs
+    _importtime([MAIN_PY] + args, engine_env)
+    runs = [_importtime([MAIN_PY] + args, engine_env) for _ in range(3)]
+
+    loaded = set(runs[0])
+    assert not (forbidden & loaded), f"{name} eagerly imported {sorted(forbidden & loaded)}"
+
+    total = min(_top_level_total(r, exclude=baseline) for r in runs)
+    assert total < IMPORT_BUDGET_US, f"{name} imports took {total}us (budget {IMPORT_BUDGET_US}us)"
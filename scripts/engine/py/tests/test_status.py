@@ -0,0 +1,113 @@
+import os
+
+from core.config import cfg
+from core.fs import FsSnapshot
+from services.status import StatusService
+
+
+def _populate(tree):
+    for name in ("zlib", "libpng", "Opus", "lua"):
+        tree.add_port(name)
+    tree.add_port("zlib", ports_dir=tree.dev_ports_dir)
+    tree.mark_installed("zlib")
+    tree.mark_installed("lua", ports_dir=tree.dev_ports_dir)
+    (tree.ports_dir / "libpng" / "dist").mkdir()
+    (tree.ports_dir / "lua" / "inst").mkdir()
+
+    for tool in ("flycast", "kos", "toolchain", "aicaos"):
+        tree.add_tool(tool)
+    (cfg.kosaio_dir / "data" / "repos" / "flycast").mkdir(parents=True)
+    (tree.sdk_root / "kos" / "lib" / "dreamcast").mkdir(parents=True)
+    (tree.sdk_root / "kos" / "lib" / "dreamcast" / "libkallisti.a").write_text("")
+    (tree.sdk_root / "sh-elf" / "bin").mkdir(parents=True)
+    (tree.sdk_root / "sh-elf" / "bin" / "sh-elf-gcc").write_text("")
+    for state in ("container", "broken"):
+        (cfg.state_dir / state).mkdir(parents=True, exist_ok=True)
+    (cfg.state_dir / "container" / "flycast").write_text("")
+    (cfg.state_dir / "broken" / "aicaos").write_text("")
+
+
+ITEMS = [("zlib", "port"), ("libpng", "port"), ("opus", "port"), ("lua", "port"), ("missing", "port"),
+         ("flycast", "tool"), ("kos", "tool"), ("toolchain", "tool"), ("aicaos", "tool"), ("gone", "tool")]
+
+
+class TestStatusBulk:
+    def test_bulk_matches_single_lookups(self, fake_tree):
+        _populate(fake_tree)
+        single = [StatusService.get_status_data(i, t) for i, t in ITEMS]
+        assert StatusService.get_status_bulk(ITEMS) == single
+
+        by_id = {i: s for (i, _), s in zip(ITEMS, single)}
+        assert by_id["zlib"]["c_inst"] == "o"
+        assert by_id["libpng"]["c_inst"] == "c"
+        assert by_id["lua"]["c_inst"] == "o" and by_id["lua"]["h_inst"] == "o"
+        assert by_id["missing"]["c_inst"] == "x"
+        assert by_id["flycast"]["c_inst"] == "o"
+        assert by_id["toolchain"]["c_inst"] == "o"
+        assert by_id["kos"]["c_inst"] == "o"
+
+    def test_unreadable_marker_is_not_installed(self, fake_tree):
+        fake_tree.add_port("zlib")
+        fake_tree.add_port("opus")
+        fake_tree.mark_installed("zlib")
+        # A marker that cannot be read as a file, like get_installed_version sees it
+        (fake_tree.ports_dir / "lib" / ".kos-ports" / "opus").mkdir()
+        assert cfg.get_installed_version("opus", "0") is None
+
+        statuses = StatusService.get_status_bulk([("zlib", "port"), ("opus", "port")])
+        assert [s["c_inst"] for s in statuses] == ["o", "x"]
+        assert StatusService.get_status_data("opus", "port")["c_inst"] == "x"
+
+    def test_bulk_reads_each_directory_once(self, fake_tree, monkeypatch):
+        for i in range(200):
+            fake_tree.add_port(f"port{i:03d}")
+        fake_tree.mark_installed("port007")
+        items = [(f"port{i:03d}", "port") for i in range(200)]
+
+        scans = []
+        original = FsSnapshot._scan
+
+        def counting(directory):
+            scans.append(directory)
+            return original(directory)
+
+        monkeypatch.setattr(FsSnapshot, "_scan", staticmethod(counting))
+        statuses = StatusService.get_status_bulk(items)
+
+        assert statuses[7]["c_inst"] == "o"
+        assert len(scans) == len(set(scans))
+        # One listing per existing port directory plus a handful of shared parents;
+        # the (absent) dev tree is never read per port
+        assert len(scans) < 200 + 30
+
+    def test_dangling_symlink_does_not_exist(self, tmp_path):
+        os.symlink(tmp_path / "nowhere", tmp_path / "dangling")
+        (tmp_path / "real").write_text("")
+        snap = FsSnapshot()
+        assert snap.exists(tmp_path / "real")
+        assert not snap.exists(tmp_path / "dangling")
+        assert not snap.exists(tmp_path / "absent" / "child")
+
+    def test_unreadable_parent_is_probed_directly(self, tmp_path, monkeypatch):
+        # e.g. a mode 0711 directory: entries can be opened but not listed
+        locked = tmp_path / "locked"
+        locked.mkdir()
+        (locked / "inside").write_text("")
+        scan = FsSnapshot._scan
+        monkeypatch.setattr(FsSnapshot, "_scan", staticmethod(
+            lambda d: (None, frozenset()) if d == str(locked) else scan(d)))
+        snap = FsSnapshot()
+        assert snap.exists(locked / "inside")
+        assert not snap.exists(locked / "missing")
+
+    def test_threaded_prefetch_matches_serial(self, fake_tree, monkeypatch):
+        _populate(fake_tree)
+        serial = StatusService.get_status_bulk(ITEMS)
+
+        monkeypatch.setattr(cfg, "io_workers", 8)
+        snap = FsSnapshot()
+        assert StatusService.get_status_bulk(ITEMS, snap) == serial
+        # Prefetched listings are reused, never read a second time
+        reads = snap.reads
+        StatusService.get_status_bulk(ITEMS, snap)
+        assert snap.reads == reads
@@ -0,0 +1,73 @@
+import io
+
+from services.ui import UI
+
+HEADERS = [("ID", 8, UI.B_CYAN), ("STATUS", 5, ""), ("DESCRIPTION", 12, "")]
+
+
+def _rows(n):
+    for i in range(n):
+        yield [(f"port{i}", UI.BLUE), (UI.status_pill("o", True), ""), ("A rather long description", UI.RESET)]
+
+
+class TestStreamTable:
+    def test_stream_matches_render_table(self):
+        out = io.StringIO()
+        assert UI.stream_table(HEADERS, _rows(3), out) == 3
+        assert out.getvalue() == UI.render_table(HEADERS, list(_rows(3))) + "\n"
+
+    def test_rows_are_written_before_the_generator_finishes(self):
+        out = io.StringIO()
+        seen = []
+
+        def rows():
+            for row in _rows(3):
+                seen.append(out.getvalue().count("\n"))
+                yield row
+
+        UI.stream_table(HEADERS, rows(), out)
+        # Header (2 lines) appears with row 1; each later row is already flushed
+        assert seen == [0, 3, 4]
+
+    def test_empty_table_prints_nothing(self):
+        out = io.StringIO()
+        assert UI.stream_table(HEADERS, iter(()), out) == 0
+        assert out.getvalue() == ""
+
+    def test_no_color_mode(self):
+        try:
+            UI.set_color(False)
+            out = io.StringIO()
+            UI.stream_table([("ID", 8, UI.B_CYAN), ("STATUS", 5, "")],
+                            [[("kos", UI.BLUE), (UI.status_pill("o", True), "")]], out)
+            assert "\033" not in out.getvalue()
+            assert "[✓*]" in out.getvalue()
+        finally:
+            UI.set_color(True)
+        assert UI.RESET == "\033[0m"
+
+    def test_no_color_lasts_one_request(self, fake_tree, monkeypatch):
+        import main
+
+        monkeypatch.delenv("NO_COLOR", raising=False)
+        assert "\033" not in main.run_captured(["search", "kos", "--no-color"])[1]
+        assert "\033[1;33m" in main.run_captured(["render_alert", "Title", "line", "--type", "alert"])[1]
+
+
+class TestWidth:
+    SAMPLES = ["plain", "", "\033[1;32m[✓]\033[0m", "⚠️ alert", "ℹ️ info", "café", "日本語のテキスト",
+               "é", "\033[0;90mgray\033[0m text", "✅ done ✅",
+               "Port 12 ✅ with a description long enough ⚠️ to be cut", "ascii only but quite a long line here"]
+
+    def test_matches_reference_implementation(self):
+        from bench.ui_width import LegacyUI
+        for s in self.SAMPLES:
+            assert UI.visual_len(s) == LegacyUI.visual_len(s), s
+            for width in (3, 5, 8, 12, 40):
+                assert UI.truncate(s, width) == LegacyUI.truncate(s, width), (s, width)
+                assert UI.fit(s, width) == LegacyUI.pad(LegacyUI.truncate(s, width), width), (s, width)
+
+    def test_render_table_is_byte_identical(self):
+        from bench.ui_width import HEADERS, LegacyUI, sample_rows
+        rows = sample_rows(50)
+        assert UI.render_table(HEADERS, rows) == LegacyUI.render_table(HEADERS, rows)
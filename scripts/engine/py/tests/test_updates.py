@@ -0,0 +1,62 @@
+import main
+from services.updates import UpdatePlanner
+
+
+def _git_port(fake_tree, name, version, branch="master"):
+    path = fake_tree.add_port(name, version=version)
+    path.write_text(path.read_text() + f"GIT_REPOSITORY = https://example.com/{name}.git\n"
+                                       f"GIT_BRANCH = {branch}\n")
+
+
+class TestUpdatePlanner:
+    def _tree(self, fake_tree):
+        fake_tree.add_port("zlib", version="1.3")
+        fake_tree.add_port("libpng", version="1.6", deps=("zlib",))
+        fake_tree.add_port("SDL", version="2.0", deps=("libpng",))
+        _git_port(fake_tree, "pinned", "1.0")
+        _git_port(fake_tree, "nightly", "git", branch="dev")
+        fake_tree.add_port("unused")
+        fake_tree.mark_installed("SDL", version="2.0")
+        fake_tree.mark_installed("libpng", version="1.5")
+        fake_tree.mark_installed("zlib", version="1.3")
+        fake_tree.mark_installed("pinned", version="1.0")
+        fake_tree.mark_installed("nightly", version="git")
+        fake_tree.mark_installed("gone", version="0.1")
+        (fake_tree.ports_dir / "lib" / ".kos-ports" / "pinned.hash").write_text("abc123\n")
+
+    def test_ports_classified_in_dependency_order(self, fake_tree):
+        self._tree(fake_tree)
+        plan = [(i.id, i.state, i.detail) for i in UpdatePlanner.plan_ports()]
+        ids = [p[0] for p in plan]
+        assert "unused" not in ids
+        assert ids.index("zlib") < ids.index("libpng") < ids.index("SDL")
+        states = {p[0]: p[1:] for p in plan}
+        assert states["libpng"] == ("bump", "1.5 -> 1.6")
+        assert states["SDL"][0] == states["zlib"][0] == "ok"
+        assert states["pinned"] == ("ok", "1.0")
+        assert states["nightly"] == ("check", "git dev")
+        assert states["gone"][0] == "broken"
+
+    def test_tools_sdk_first_and_broken(self, fake_tree):
+        for tool_id in ("alpha", "kos", "zeta"):
+            fake_tree.add_tool(tool_id)
+        (fake_tree.sdk_root / "kos" / "lib" / "dreamcast").mkdir(parents=True)
+        (fake_tree.sdk_root / "kos" / "lib" / "dreamcast" / "libkallisti.a").write_text("")
+        states = fake_tree.kosaio_dir / "data" / "states"
+        for state, tool_id in (("container", "alpha"), ("broken", "zeta")):
+            (states / state).mkdir(exist_ok=True)
+            (states / state / tool_id).write_text("")
+
+        plan = [(i.id, i.state) for i in UpdatePlanner.plan_tools()]
+        assert plan == [("kos", "check"), ("alpha", "check"), ("zeta", "broken")]
+
+    def test_command_output(self, fake_tree):
+        self._tree(fake_tree)
+        code, out, _ = main.run_captured(["update_plan", "--kind", "ports"])
+        lines = out.splitlines()
+        assert code == 0
+        assert "BUMP port libpng 1.5 -> 1.6" in lines
+        assert not any(line.startswith("OK ") for line in lines)
+
+        _, out, _ = main.run_captured(["update_plan", "--kind", "ports", "--all"])
+        assert "OK port pinned 1.0" in out.splitlines()
@@ -161,7 +161,7 @@ _kosaio_build_v2() {
 	log_info --draw-line "Building Toolchain Target (v2): ${target:-standard (SH4+GDB)}..."
 	mkdir -p "${dc_chain}"
 	cp "${KOSAIO_DIR}/configs/kos-v2-dreamcast.cfg" "${dc_chain}/Makefile.cfg"
-	(cd "${dc_chain}" && make -j$(nproc) ${target})
+	(cd "${dc_chain}" && kosaio_timed "${ID}" tool make -j$(nproc) ${target})
 }
 
 # --- v3 build (utils/kos-chain/) ---
@@ -201,20 +201,20 @@ _kosaio_build_v3() {
 	if [ "$build_sh" = true ]; then
 		log_info --draw-line "Building SH4 toolchain (v3, platform=dreamcast)..."
 		(cd "${kos_chain}" && make platform=dreamcast distclean 2>/dev/null; true)
-		(cd "${kos_chain}" && make -j$(nproc) platform=dreamcast build) || return 1
+		(cd "${kos_chain}" && kosaio_timed "${ID}" tool make -j$(nproc) platform=dreamcast build) || return 1
 	fi
 
 	# Build GDB (needs SH4 toolchain)
 	if [ "$build_gdb" = true ]; then
 		log_info --draw-line "Building SH4 GDB (v3)..."
-		(cd "${kos_chain}" && make platform=dreamcast gdb) || return 1
+		(cd "${kos_chain}" && kosaio_timed "${ID}" tool make platform=dreamcast gdb) || return 1
 	fi
 
 	# Build aica (ARM) toolchain
 	if [ "$build_arm" = true ]; then
 		log_info --draw-line "Building ARM toolchain (v3, platform=aica)..."
 		(cd "${kos_chain}" && make platform=aica distclean 2>/dev/null; true)
-		(cd "${kos_chain}" && make -j$(nproc) platform=aica build) || return 1
+		(cd "${kos_chain}" && kosaio_timed "${ID}" tool make -j$(nproc) platform=aica build) || return 1
 	fi
 }
 
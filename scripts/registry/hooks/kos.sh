@@ -150,7 +150,7 @@ kosaio_tool_build() {
 	fi
 
 	cd "${tool_dir}"
-	make -j$(nproc)
+	kosaio_timed "${ID}" tool make -j$(nproc)
 }
 
 kosaio_tool_apply() {
@@ -140,15 +140,15 @@ function kosaio_reg_build() {
 	case "${KOSAIO_TOOL_BUILD_SYSTEM}" in
 		cmake)
 			cd "${tool_dir}/${KOSAIO_TOOL_BUILD_DIR:-build}"
-			make -j$(nproc)
+			kosaio_timed "${ID}" tool make -j$(nproc)
 			;;
 		make)
 			cd "${tool_dir}/${KOSAIO_TOOL_BUILD_SUBDIR:-.}"
-			make -j$(nproc) ${KOSAIO_TOOL_BUILD_TARGET:-} "$@"
+			kosaio_timed "${ID}" tool make -j$(nproc) ${KOSAIO_TOOL_BUILD_TARGET:-} "$@"
 			;;
 		configure)
 			cd "${tool_dir}/${KOSAIO_TOOL_BUILD_SUBDIR:-.}"
-			make -j$(nproc)
+			kosaio_timed "${ID}" tool make -j$(nproc)
 			;;
 		meson)
 			kosaio_meson_build "$@"
@@ -158,7 +158,7 @@ function kosaio_reg_build() {
 			;;
 		zig)
 			cd "$tool_dir"
-			zig build --release=fast "${KOSAIO_TOOL_ARGS[@]}"
+			kosaio_timed "${ID}" tool zig build --release=fast "${KOSAIO_TOOL_ARGS[@]}"
 			;;
 	esac
 }
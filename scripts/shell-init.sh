@@ -38,6 +38,11 @@ export PATH="${KOSAIO_DIR}/scripts:$PATH"
 [ -f "${KOSAIO_DIR}/scripts/common/completions.sh" ] && source "${KOSAIO_DIR}/scripts/common/completions.sh"
 [ -f "${KOSAIO_DIR}/scripts/common/update_check.sh" ] && source "${KOSAIO_DIR}/scripts/common/update_check.sh"
 
+# Opt-in resident engine: keeps the catalog warm for every main.py call
+if [ "${KOSAIO_ENGINE_DAEMON:-0}" = "1" ]; then
+	python3 "${KOSAIO_DIR}/scripts/engine/py/main.py" daemon start >/dev/null 2>&1 || true
+fi
+
 # Ensure aliases are expanded
 shopt -s expand_aliases
 kosaio_kos_pivot >/dev/null 2>&1